@@ -0,0 +1,239 @@
+"""Benchmarks on deterministic synthetic market data
+
+Run with `python -m benchmarks.bench --tickers 2 --bars 20000 --output bench.json` and pass
+`--baseline` a previous output to fail (exit code 1) on throughput or memory regressions.
+"""
+
+import argparse
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from typing import Any, Callable, Optional
+import numpy as np
+
+from tiny_backtester.data_store import MarketStore
+from tiny_backtester.engine import Engine
+from tiny_backtester.ledger import OrderLog
+from tiny_backtester.strategy import SignalStrategy, Strategy
+from tiny_backtester.utils.backtester_types import ExecutedOrder, MarketData, Order
+from tiny_backtester.utils.math_utils import process_df
+from tiny_backtester.utils.synthetic import synthetic_market
+
+
+class TrivialStrategy(Strategy):
+    columnar = True
+
+    def __init__(self, tickers: set[str]):
+        super().__init__()
+        self.tickers = tickers
+
+    def precalc(self, data: MarketData):
+        pass
+
+    def run(self, data):
+        return None
+
+
+class MovingAverageCrossover(SignalStrategy):
+    """Columnar version of examples/moving_average_crossover.py over every ticker"""
+
+    def __init__(self, tickers: set[str], fast: int = 10, slow: int = 60):
+        super().__init__()
+        self.tickers = tickers
+        self.funds = np.float64(1e12)
+        self.fast = fast
+        self.slow = slow
+
+    def precalc(self, data: MarketData):
+        for t in self.tickers:
+            df = data[t]
+            df["mean"] = df[["high", "low"]].mean(axis=1)
+            df["fast"] = df["mean"].rolling(self.fast, closed="both").mean()
+            df["slow"] = df["mean"].rolling(self.slow, closed="both").mean()
+
+    def signals(self, data: MarketStore):
+        return {
+            t: np.sign(np.nan_to_num(data[t].columns["fast"] - data[t].columns["slow"])).astype(
+                np.int64
+            )
+            for t in self.tickers
+        }
+
+
+def fresh_engine(processed: MarketData) -> Engine:
+    engine = Engine()
+    engine.market_data = {t: df.copy(deep=False) for t, df in processed.items()}
+    return engine
+
+
+def bars(market: MarketData) -> int:
+    return sum(len(df) for df in market.values())
+
+
+# each benchmark does its setup and returns the timed callable, which returns the bars processed
+Benchmark = Callable[[MarketData, MarketData], Callable[[], int]]
+
+
+def bench_process_df(raw: MarketData, processed: MarketData) -> Callable[[], int]:
+    def run() -> int:
+        for df in raw.values():
+            process_df(df.copy())
+        return bars(raw)
+
+    return run
+
+
+def bench_load_ts(raw: MarketData, processed: MarketData) -> Callable[[], int]:
+    def run() -> int:
+        engine = Engine()
+        for t, df in raw.items():
+            engine.load_ts(t, df.copy())
+        return bars(raw)
+
+    return run
+
+
+def bench_run_trivial(raw: MarketData, processed: MarketData) -> Callable[[], int]:
+    engine = fresh_engine(processed)
+    return lambda: (engine.run(TrivialStrategy(set(processed))), bars(processed))[1]
+
+
+def bench_run_ma_crossover(raw: MarketData, processed: MarketData) -> Callable[[], int]:
+    engine = fresh_engine(processed)
+    return lambda: (engine.run(MovingAverageCrossover(set(processed))), bars(processed))[1]
+
+
+def bench_run_signals_ma_crossover(raw: MarketData, processed: MarketData) -> Callable[[], int]:
+    engine = fresh_engine(processed)
+    return lambda: (engine.run_signals(MovingAverageCrossover(set(processed))), bars(processed))[1]
+
+
+def bench_execute_order(raw: MarketData, processed: MarketData) -> Callable[[], int]:
+    engine = fresh_engine(processed)
+    store = MarketStore.from_frames(engine.market_data)
+    strat = TrivialStrategy(set(processed))
+    strat.funds = np.float64(1e12)
+    n = min(len(data) for data in store.values())
+    views = [store.view(i) for i in range(1, n + 1)]
+    orders = [Order(t, "buy", 1) for t in sorted(processed)]
+
+    def run() -> int:
+        for view in views:
+            engine.execute_orders(strat, orders, view)
+        return len(views) * len(orders)
+
+    return run
+
+
+def bench_results(raw: MarketData, processed: MarketData) -> Callable[[], int]:
+    # materialise a run's worth of orders, as Engine.run does at the end of a run
+    engine = fresh_engine(processed)
+    results = engine.run_signals(MovingAverageCrossover(set(processed)))
+    order_log = OrderLog()
+    order_log.extend(ExecutedOrder(*row) for row in results["orders"].itertuples(index=False))
+
+    def run() -> int:
+        order_log.to_frame()
+        return len(order_log)
+
+    return run
+
+
+BENCHMARKS: dict[str, Benchmark] = {
+    "process_df": bench_process_df,
+    "load_ts": bench_load_ts,
+    "run_trivial": bench_run_trivial,
+    "run_ma_crossover": bench_run_ma_crossover,
+    "run_signals_ma_crossover": bench_run_signals_ma_crossover,
+    "execute_order": bench_execute_order,
+    "results": bench_results,
+}
+
+
+def measure(benchmark: Benchmark, raw: MarketData, processed: MarketData, repeat: int):
+    best = float("inf")
+    for _ in range(repeat):
+        run = benchmark(raw, processed)
+        start = time.perf_counter()
+        n = run()
+        best = min(best, time.perf_counter() - start)
+    # memory is traced in a separate pass so tracing overhead doesn't skew the timings
+    run = benchmark(raw, processed)
+    tracemalloc.start()
+    run()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {"seconds": best, "bars": n, "bars_per_sec": n / best, "peak_memory_bytes": peak}
+
+
+def run_benchmarks(
+    n_tickers: int, n_bars: int, repeat: int = 3, names: Optional[list[str]] = None
+) -> dict[str, Any]:
+    raw = synthetic_market(n_tickers, n_bars)
+    processed = {t: process_df(df.copy()) for t, df in raw.items()}
+    results = {}
+    for name in names or list(BENCHMARKS):
+        results[name] = measure(BENCHMARKS[name], raw, processed, repeat)
+        print(
+            f"{name:<28} {results[name]['bars_per_sec']:>14,.0f} bars/s"
+            f" {results[name]['peak_memory_bytes'] / 2**20:>9.1f} MiB"
+        )
+    return {
+        "config": {"tickers": n_tickers, "bars": n_bars, "repeat": repeat},
+        "machine": {"python": platform.python_version(), "platform": platform.platform()},
+        "results": results,
+    }
+
+
+def compare(current: dict[str, Any], baseline: dict[str, Any], tolerance: float) -> list[str]:
+    """Regressions of current against baseline, a benchmark regresses when its throughput drops
+    or its peak memory grows by more than tolerance"""
+    regressions = []
+    for name, base in baseline["results"].items():
+        if name not in current["results"]:
+            continue
+        cur = current["results"][name]
+        if cur["bars_per_sec"] < base["bars_per_sec"] * (1 - tolerance):
+            regressions.append(
+                f"{name}: {cur['bars_per_sec']:,.0f} bars/s, baseline {base['bars_per_sec']:,.0f}"
+            )
+        if cur["peak_memory_bytes"] > base["peak_memory_bytes"] * (1 + tolerance):
+            regressions.append(
+                f"{name}: peak memory {cur['peak_memory_bytes']:,} bytes,"
+                f" baseline {base['peak_memory_bytes']:,}"
+            )
+    return regressions
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tickers", type=int, default=2)
+    parser.add_argument("--bars", type=int, default=20_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--only", nargs="*", choices=list(BENCHMARKS))
+    parser.add_argument("--output", help="write results as json to this path")
+    parser.add_argument("--baseline", help="results json to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args(argv)
+
+    current = run_benchmarks(args.tickers, args.bars, args.repeat, args.only)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(current, f, indent=2)
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if baseline["config"] != current["config"]:
+            print(f"WARNING: baseline config {baseline['config']} differs from {current['config']}")
+        regressions = compare(current, baseline, args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}", file=sys.stderr)
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
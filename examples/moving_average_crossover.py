@@ -1,10 +1,12 @@
-from tiny_backtester.utils.backtester_types import MarketData, Order
+from tiny_backtester.utils.backtester_types import MarketData
 from tiny_backtester.engine import Engine
-from tiny_backtester.strategy import Strategy
+from tiny_backtester.strategy import SignalStrategy
+from tiny_backtester.data_store import MarketStore
+import numpy as np
 import pandas as pd
 import cProfile
 
-class MovingAverageCrossover(Strategy):
+class MovingAverageCrossover(SignalStrategy):
 
     def __init__(self, ticker: str):
         super().__init__()
@@ -16,12 +18,10 @@ class MovingAverageCrossover(Strategy):
         df["Moving Average 10"] = df["mean"].rolling(10, closed="both").mean()
         df["Moving Average 60"] = df["mean"].rolling(60, closed="both").mean()
 
-    def run(self, data: MarketData):
-        latest = data["TSLA"].iloc[-1]
-        if latest["Moving Average 10"] > latest["Moving Average 60"]:
-            return [Order("TSLA", "buy", 1)]
-        elif latest["Moving Average 10"] < latest["Moving Average 60"]:
-            return [Order("TSLA", "sell", 1)]
+    def signals(self, data: MarketStore):
+        # buy 1 while the fast average is above the slow one, sell 1 while below
+        diff = data["TSLA"].columns["Moving Average 10"] - data["TSLA"].columns["Moving Average 60"]
+        return {"TSLA": np.sign(np.nan_to_num(diff)).astype(np.int64)}
 
 
 if __name__ == "__main__":
@@ -33,6 +33,6 @@ if __name__ == "__main__":
     with cProfile.Profile() as pr:
         engine = Engine()
         engine.load_ts("TSLA", df)
-        results = engine.run(mac)
+        results = engine.run_signals(mac)
         pr.print_stats()
         pr.dump_stats("mac.prof")
@@ -16,7 +16,3 @@ if not logger.handlers:
     logger.setLevel(logging.DEBUG if debug_mode else logging.INFO)
 
 __all__ = ["logger"]
-
-
-logger.debug("debug logging enabled")
-logger.info("logger loaded")
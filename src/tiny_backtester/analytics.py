@@ -0,0 +1,216 @@
+from typing import Any, NamedTuple, Optional, Sequence
+import numpy as np
+import pandas as pd
+
+from tiny_backtester.equity import Trades
+from tiny_backtester.utils.backtester_exception import BacktesterException
+from tiny_backtester.utils.backtester_types import RunResults
+
+YEAR = pd.Timedelta(days=365.25).value
+NAT = np.iinfo(np.int64).min
+
+
+class RoundTrips(NamedTuple):
+    """Closed lots matched first in first out, opening lots without a fill have a NaN entry"""
+
+    group: np.ndarray  # int64 index of the lot's group, by default its ticker in sorted order
+    entry_time: np.ndarray  # int64 nanoseconds
+    exit_time: np.ndarray  # int64 nanoseconds
+    quantity: np.ndarray  # int64
+    entry_price: np.ndarray  # float64
+    exit_price: np.ndarray  # float64
+    pnl: np.ndarray  # float64
+
+
+def get_trades(orders: pd.DataFrame) -> Trades:
+    """Filled orders of a run's order frame"""
+    if not len(orders):
+        return Trades(
+            np.empty(0, np.int64), np.empty(0, object), np.empty(0, np.int64), np.empty(0)
+        )
+    filled = orders[orders["status"] == "filled"]
+    quantity = filled["quantity"].to_numpy(np.int64)
+    return Trades(
+        pd.DatetimeIndex(filled["time"]).as_unit("ns").to_numpy("i8"),
+        filled["ticker"].to_numpy(object),
+        np.where(filled["type"].to_numpy() == "buy", quantity, -quantity),
+        filled["price"].to_numpy(np.float64),
+    )
+
+
+def get_returns(equity: np.ndarray) -> np.ndarray:
+    """Simple returns between consecutive bars along the last axis"""
+    return equity[..., 1:] / equity[..., :-1] - 1
+
+
+def get_periods_per_year(times: np.ndarray) -> float:
+    """Average number of bars per year of sorted int64 nanosecond bar times"""
+    if len(times) < 2 or times[-1] == times[0]:
+        return np.nan
+    return (len(times) - 1) * YEAR / (times[-1] - times[0])
+
+
+def sharpe_ratio(returns: np.ndarray, periods: float, risk_free: float = 0.0) -> np.ndarray:
+    """Annualised Sharpe ratio along the last axis, NaN without variance"""
+    excess = returns - risk_free / periods
+    std = excess.std(axis=-1, ddof=1) if returns.shape[-1] > 1 else np.nan
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(std > 0, excess.mean(axis=-1) / std * np.sqrt(periods), np.nan)
+
+
+def sortino_ratio(returns: np.ndarray, periods: float, risk_free: float = 0.0) -> np.ndarray:
+    """Annualised Sortino ratio along the last axis, NaN without downside"""
+    excess = returns - risk_free / periods
+    downside = np.sqrt(np.mean(np.minimum(excess, 0) ** 2, axis=-1))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(downside > 0, excess.mean(axis=-1) / downside * np.sqrt(periods), np.nan)
+
+
+def drawdowns(equity: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Maximum drawdown as a fraction of the running peak and the most bars spent below a peak"""
+    peak = np.maximum.accumulate(equity, axis=-1)
+    bars = np.arange(equity.shape[-1])
+    last_peak = np.maximum.accumulate(np.where(equity >= peak, bars, 0), axis=-1)
+    return (1 - equity / peak).max(axis=-1), (bars - last_peak).max(axis=-1)
+
+
+def round_trips(
+    trades: Trades, groups: Optional[np.ndarray] = None, opening: Optional[np.ndarray] = None
+) -> RoundTrips:
+    """Match sells against earlier buys of the same group first in first out
+
+    Groups default to the trades' tickers. opening holds each group's quantity held before the
+    first trade, matched first as lots without an entry. Holdings are long only, as the engine
+    rejects sells of more than is held.
+    """
+    if groups is None:
+        _, groups = np.unique(trades.ticker.astype(str), return_inverse=True)
+    n_groups = int(groups.max()) + 1 if len(groups) else 0
+    if opening is not None:
+        n_groups = max(n_groups, len(opening))
+        held = np.flatnonzero(opening > 0)
+        groups = np.concatenate((held, groups))
+        trades = Trades(
+            np.concatenate((np.full(len(held), NAT), trades.time)),
+            np.concatenate((np.empty(len(held), object), trades.ticker)),
+            np.concatenate((opening[held], trades.quantity)),
+            np.concatenate((np.full(len(held), np.nan), trades.price)),
+        )
+    order = np.argsort(groups, kind="stable")
+    groups, trades = groups[order], Trades(*(a[order] for a in trades))
+    buy, sell = trades.quantity > 0, trades.quantity < 0
+    bought = np.bincount(groups[buy], trades.quantity[buy], n_groups).astype(np.int64)
+    sold = np.bincount(groups[sell], -trades.quantity[sell], n_groups).astype(np.int64)
+    matched = np.minimum(bought, sold)
+    base = np.cumsum(bought) - bought
+
+    # lots and sells laid end to end on one axis of bought quantity, each group from its base
+    buy_end = np.cumsum(trades.quantity[buy])
+    sell_group = groups[sell]
+    sell_cum = np.cumsum(-trades.quantity[sell])
+    sell_cum -= (np.cumsum(sold) - sold)[sell_group]
+    sell_end = base[sell_group] + np.minimum(sell_cum, bought[sell_group])
+    points = np.unique(np.concatenate(([0], buy_end, sell_end)))
+    start, stop = points[:-1], points[1:]
+    lot = np.searchsorted(buy_end, start, "right")
+    keep = start < (base + matched)[groups[buy][lot]] if len(lot) else np.empty(0, bool)
+    start, stop, lot = start[keep], stop[keep], lot[keep]
+    fill = np.searchsorted(sell_end, start, "right")
+
+    quantity = stop - start
+    entry_price, exit_price = trades.price[buy][lot], trades.price[sell][fill]
+    return RoundTrips(
+        groups[buy][lot],
+        trades.time[buy][lot],
+        trades.time[sell][fill],
+        quantity,
+        entry_price,
+        exit_price,
+        quantity * (exit_price - entry_price),
+    )
+
+
+def opening_holdings(results: RunResults, tickers: Sequence[str]) -> np.ndarray:
+    """Quantity of each ticker held before a run, its final position less its net fills"""
+    trades = get_trades(results["orders"])
+    positions = results["positions"]
+    final = np.array([positions[t]["quantity"].iloc[-1] if t in positions else 0 for t in tickers])
+    net = np.array([trades.quantity[trades.ticker == t].sum() for t in tickers])
+    return (final - net).astype(np.int64)
+
+
+def equity_metrics(equity: np.ndarray, exposure: np.ndarray, periods: float) -> dict[str, Any]:
+    """Metrics of equal length equity curves, one per row"""
+    returns = get_returns(equity)
+    max_drawdown, duration = drawdowns(equity)
+    return {
+        "total_return": equity[:, -1] / equity[:, 0] - 1,
+        "volatility": (
+            returns.std(axis=1, ddof=1) * np.sqrt(periods)
+            if returns.shape[1] > 1
+            else np.full(len(equity), np.nan)
+        ),
+        "sharpe": sharpe_ratio(returns, periods),
+        "sortino": sortino_ratio(returns, periods),
+        "max_drawdown": max_drawdown,
+        "max_drawdown_bars": duration,
+        "exposure": np.mean(np.abs(exposure) / equity, axis=1),
+        "time_in_market": np.mean(exposure != 0, axis=1),
+    }
+
+
+def score_many(results: Sequence[RunResults], periods: Optional[float] = None) -> pd.DataFrame:
+    """Metrics of many runs at once, one row per run
+
+    Equity curves of equal length are scored together as one 2-D array, trades of every run are
+    matched into round trips in a single pass. periods is the number of bars per year, by default
+    inferred from each run's equity index.
+    """
+    if any("equity" not in r for r in results):
+        raise BacktesterException("results have no equity curve to score")
+    n = len(results)
+    if not n:
+        return pd.DataFrame()
+    rows: dict[str, np.ndarray] = {}
+    lengths = np.array([len(r["equity"]) for r in results])
+    for length in np.unique(lengths):
+        runs = np.flatnonzero(lengths == length)
+        if not length:
+            continue
+        frames = [results[int(i)]["equity"] for i in runs]
+        equity = np.stack([f["equity"].to_numpy() for f in frames])
+        exposure = np.stack([f["exposure"].to_numpy() for f in frames])
+        times = pd.DatetimeIndex(frames[0].index).as_unit("ns").to_numpy("i8")
+        bars_per_year = periods if periods is not None else get_periods_per_year(times)
+        for name, values in equity_metrics(equity, exposure, bars_per_year).items():
+            rows.setdefault(name, np.full(n, np.nan))[runs] = values
+
+    # every (run, ticker) pair is a group of the combined trades
+    trades = [get_trades(r["orders"]) for r in results]
+    tickers = [sorted(set(r["positions"]) | set(t.ticker)) for r, t in zip(results, trades)]
+    offsets = np.cumsum([0] + [len(t) for t in tickers])
+    groups, traded, opening = [], np.zeros(n), []
+    for i, (r, t, names) in enumerate(zip(results, trades, tickers)):
+        codes = {name: offsets[i] + j for j, name in enumerate(names)}
+        groups.append(np.array([codes[x] for x in t.ticker], dtype=np.int64))
+        traded[i] = np.abs(t.quantity * t.price).sum()
+        opening.append(opening_holdings(r, names))
+    combined = Trades(*(np.concatenate(a) for a in zip(*trades)))
+    trips = round_trips(combined, np.concatenate(groups), np.concatenate(opening))
+    run_of = np.repeat(np.arange(n), np.diff(offsets))
+    closed = ~np.isnan(trips.pnl)
+    run = run_of[trips.group[closed]]
+    pnl = trips.pnl[closed]
+    n_trades = np.bincount(run, minlength=n)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rows["turnover"] = traded / np.array([r["equity"]["equity"].mean() for r in results])
+        rows["round_trips"] = n_trades
+        rows["hit_rate"] = np.bincount(run, pnl > 0, n) / n_trades
+        rows["average_trade_pnl"] = np.bincount(run, pnl, n) / n_trades
+        rows["realised_pnl"] = np.bincount(run, pnl, n)
+    return pd.DataFrame(rows)
+
+
+def score(results: RunResults, periods: Optional[float] = None) -> dict[str, Any]:
+    """Metrics of a single run"""
+    return {str(k): v for k, v in score_many([results], periods).iloc[0].items()}
@@ -0,0 +1,130 @@
+import functools
+import hashlib
+import json
+import logging
+import os
+import shutil
+from pathlib import Path
+from typing import Optional
+import numpy as np
+import pandas as pd
+
+from tiny_backtester.data_store import to_datetime_index
+from tiny_backtester.utils import math_utils
+from tiny_backtester.utils.backtester_types import CalendarType
+from tiny_backtester.utils.storage import MANIFEST, write_entry
+
+logger = logging.getLogger("tiny_backtester")
+
+
+@functools.cache
+def get_version() -> str:
+    # importlib.metadata is slow to import and to query, only look the version up when needed
+    from importlib import metadata
+
+    try:
+        return metadata.version("tiny-backtester")
+    except metadata.PackageNotFoundError:
+        return "unknown"
+
+
+class TimeSeriesCache:
+    """On-disk cache of processed time series, one .npy file per column memory mapped on load
+
+    Entries are keyed by a hash of the raw frame, the processing arguments and the library
+    version. When max_bytes is set the least recently used entries are evicted to stay under it.
+    """
+
+    def __init__(self, directory: str | os.PathLike, max_bytes: Optional[int] = None):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+
+    @staticmethod
+    def key(
+        df: pd.DataFrame,
+        cal: Optional[CalendarType] = None,
+        resample_freq: Optional[str] = None,
+    ) -> str:
+        h = hashlib.sha256()
+        h.update(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+        h.update(repr([(str(c), str(d)) for c, d in df.dtypes.items()]).encode())
+        h.update(repr((str(df.index.dtype), cal, resample_freq, math_utils.k)).encode())
+        h.update(get_version().encode())
+        return h.hexdigest()
+
+    def get(self, key: str) -> Optional[pd.DataFrame]:
+        path = self.directory / key
+        try:
+            with open(path / MANIFEST) as f:
+                manifest = json.load(f)
+            os.utime(path / MANIFEST)  # marks the entry as recently used
+            # plain ndarray views keep the data memory mapped without leaking np.memmap into pandas
+            index = np.load(path / "index.npy", mmap_mode="r").view(np.ndarray)
+            columns = {
+                c: np.load(path / f"{i}.npy", mmap_mode="r").view(np.ndarray)
+                for i, c in enumerate(manifest["columns"])
+            }
+        except FileNotFoundError:
+            # never stored, or evicted by another process while reading it
+            return None
+        logger.debug(f"cache hit {key}")
+        return pd.DataFrame(
+            columns,
+            index=to_datetime_index(index, manifest["tz"], manifest["index_name"]),
+            copy=False,
+        )
+
+    def put(self, key: str, df: pd.DataFrame) -> bool:
+        if any(df[c].dtype.kind not in "biuf" for c in df.columns):
+            logger.debug(f"not caching {key}, all columns must be numeric")
+            return False
+        idx = pd.DatetimeIndex(df.index).as_unit("ns")
+        columns = {
+            "index": idx.to_numpy("i8"),
+            **{str(i): df[c].to_numpy() for i, c in enumerate(df.columns)},
+        }
+        manifest = {
+            "columns": [str(c) for c in df.columns],
+            "tz": str(idx.tz) if idx.tz else None,
+            "index_name": idx.name,
+        }
+        try:
+            if not write_entry(self.directory, key, columns, manifest):
+                return False  # another process already stored this key
+        except OSError as e:
+            logger.debug(f"not caching {key}: {e}")
+            return False
+        logger.debug(f"cached {key}")
+        self.evict(keep=key)
+        return True
+
+    def entries(self) -> list[tuple[str, float, int]]:
+        """(key, last used time, size in bytes) of every entry, least recently used first"""
+        entries = []
+        for path in self.directory.iterdir():
+            if path.name.startswith(".") or not (path / MANIFEST).exists():
+                continue
+            size = sum(f.stat().st_size for f in path.iterdir())
+            entries.append((path.name, (path / MANIFEST).stat().st_mtime, size))
+        return sorted(entries, key=lambda e: e[1])
+
+    def evict(self, keep: Optional[str] = None):
+        """Removes least recently used entries, apart from keep, until under max_bytes"""
+        if self.max_bytes is None:
+            return
+        entries = self.entries()
+        total = sum(e[2] for e in entries)
+        for key, _, size in entries:
+            if total <= self.max_bytes:
+                break
+            if key != keep:
+                self.invalidate(key)
+                total -= size
+
+    def invalidate(self, key: Optional[str] = None):
+        """Remove a single entry, or every entry when key is None"""
+        keys = [key] if key else [e[0] for e in self.entries()]
+        for k in keys:
+            shutil.rmtree(self.directory / k, ignore_errors=True)
+            logger.debug(f"invalidated cache entry {k}")
@@ -0,0 +1,308 @@
+from typing import Any, Iterable, Iterator, Mapping, Optional
+import numpy as np
+import pandas as pd
+
+from tiny_backtester.utils.backtester_types import MarketData
+
+
+def _readonly(arr: np.ndarray) -> np.ndarray:
+    arr = np.ascontiguousarray(arr)
+    arr.flags.writeable = False
+    return arr
+
+
+def read_only(df: pd.DataFrame) -> pd.DataFrame:
+    """Frame over contiguous read-only columns, shared zero-copy by every overlay of it"""
+    columns = {c: _readonly(df[c].to_numpy()) for c in df.columns}
+    return pd.DataFrame(columns, index=df.index, copy=False)
+
+
+def overlay(market_data: MarketData, tickers: Optional[Iterable[str]] = None) -> MarketData:
+    """Private layer of shallow copies, columns added or replaced in it never reach market_data"""
+    tickers = market_data.keys() if tickers is None else tickers
+    return {t: market_data[t].copy(deep=False) for t in tickers}
+
+
+def to_datetime_index(
+    ns: np.ndarray, tz: Any = None, name: Optional[str] = None
+) -> pd.DatetimeIndex:
+    idx = pd.DatetimeIndex(ns.view("datetime64[ns]"), name=name)
+    return idx.tz_localize("UTC").tz_convert(tz) if tz else idx
+
+
+def window_start(end: int, lookback: Optional[int]) -> int:
+    """First bar of the last lookback bars (None for all) before end"""
+    return 0 if lookback is None else max(end - lookback, 0)
+
+
+class TickerData:
+    """Contiguous, read-only numpy columns for a single ticker"""
+
+    __slots__ = ("index", "columns", "tz", "index_name")
+
+    def __init__(
+        self,
+        index: np.ndarray,
+        columns: dict[str, np.ndarray],
+        tz: Any = None,
+        index_name: Optional[str] = None,
+    ):
+        self.index = index  # int64 nanoseconds since epoch (UTC)
+        self.columns = columns
+        self.tz = tz
+        self.index_name = index_name
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> "TickerData":
+        idx = pd.DatetimeIndex(df.index).as_unit("ns")
+        columns = {c: _readonly(df[c].to_numpy()) for c in df.columns}
+        name = None if idx.name is None else str(idx.name)
+        return cls(_readonly(idx.to_numpy("i8")), columns, idx.tz, name)
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def timestamp(self, i: int) -> pd.Timestamp:
+        return pd.Timestamp(int(self.index[i]), tz=self.tz)
+
+    def datetime_index(self, end: Optional[int] = None, start: int = 0) -> pd.DatetimeIndex:
+        return to_datetime_index(self.index[start:end], self.tz, self.index_name)
+
+    def to_frame(self, end: Optional[int] = None, start: int = 0) -> pd.DataFrame:
+        return pd.DataFrame(
+            {c: a[start:end] for c, a in self.columns.items()},
+            index=self.datetime_index(end, start),
+        )
+
+    def view(self, end: int, start: int = 0) -> "TickerView":
+        return TickerView(self, end, start)
+
+
+class Bar:
+    """Single row of a ticker, supports the same read access as a pd.Series row"""
+
+    __slots__ = ("_data", "_i")
+
+    def __init__(self, data: TickerData, i: int):
+        self._data = data
+        self._i = i
+
+    def __getitem__(self, column: str) -> Any:
+        return self._data.columns[column][self._i]
+
+    def __contains__(self, column: object) -> bool:
+        return column in self._data.columns
+
+    @property
+    def name(self) -> pd.Timestamp:
+        return self._data.timestamp(self._i)
+
+
+class TickerView:
+    """Read-only view of a ticker's columns for epochs [start, end)"""
+
+    __slots__ = ("_data", "_start", "_end")
+
+    def __init__(self, data: TickerData, end: int, start: int = 0):
+        self._data = data
+        self._start = start
+        self._end = end
+
+    def __len__(self) -> int:
+        return self._end - self._start
+
+    def __getitem__(self, column: str) -> np.ndarray:
+        return self._data.columns[column][self._start : self._end]
+
+    def __contains__(self, column: object) -> bool:
+        return column in self._data.columns
+
+    @property
+    def data(self) -> TickerData:
+        return self._data
+
+    @property
+    def columns(self) -> list[str]:
+        return list(self._data.columns)
+
+    @property
+    def end(self) -> int:
+        return self._end
+
+    @property
+    def index(self) -> np.ndarray:
+        return self._data.index[self._start : self._end]
+
+    @property
+    def time(self) -> pd.Timestamp:
+        return self._data.timestamp(self._end - 1)
+
+    def latest(self, column: str) -> Any:
+        return self._data.columns[column][self._end - 1]
+
+    def bar(self, i: int = -1) -> Bar:
+        return Bar(self._data, self._start + (i % len(self) if i < 0 else i))
+
+    def history(self) -> "TickerView":
+        """View of every bar up to the end of this one"""
+        return TickerView(self._data, self._end)
+
+    def to_frame(self) -> pd.DataFrame:
+        return self._data.to_frame(self._end, self._start)
+
+
+class MarketView(Mapping[str, TickerView]):
+    """Per epoch view over the last lookback bars (None for all) of every ticker in a MarketStore
+
+    Tickers are zero-copy windows of the columns, so their size doesn't grow with the epoch.
+    """
+
+    __slots__ = ("_store", "_end", "_start")
+
+    def __init__(self, store: "MarketStore", end: int, lookback: Optional[int] = None):
+        self._store = store
+        self._end = end
+        self._start = window_start(end, lookback)
+
+    @property
+    def store(self) -> "MarketStore":
+        return self._store
+
+    @property
+    def end(self) -> int:
+        return self._end
+
+    def __getitem__(self, ticker: str) -> TickerView:
+        return TickerView(self._store[ticker], self._end, self._start)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._store)
+
+    def __len__(self) -> int:
+        return len(self._store)
+
+
+class MarketStore(dict[str, TickerData]):
+    """Columnar market data, one TickerData per ticker"""
+
+    @classmethod
+    def from_frames(
+        cls, market_data: MarketData, tickers: Optional[Iterable[str]] = None
+    ) -> "MarketStore":
+        tickers = market_data.keys() if tickers is None else tickers
+        return cls({t: TickerData.from_frame(market_data[t]) for t in tickers})
+
+    def view(self, end: int, lookback: Optional[int] = None) -> MarketView:
+        return MarketView(self, end, lookback)
+
+
+class FrameView(Mapping[str, pd.DataFrame]):
+    """Compatibility adapter giving DataFrame strategies lazily sliced frames of the last lookback
+    bars (None for all) before end"""
+
+    __slots__ = ("_frames", "_end", "_lookback", "_cache")
+
+    def __init__(
+        self, frames: Mapping[str, pd.DataFrame], end: int, lookback: Optional[int] = None
+    ):
+        self._frames = frames
+        self._end = end
+        self._lookback = lookback
+        self._cache: MarketData = {}
+
+    def end_of(self, ticker: str) -> int:
+        return self._end
+
+    def __getitem__(self, ticker: str) -> pd.DataFrame:
+        if ticker not in self._cache:
+            end = self.end_of(ticker)
+            start = window_start(end, self._lookback)
+            self._cache[ticker] = self._frames[ticker].iloc[start:end]
+        return self._cache[ticker]
+
+    def history(self, ticker: str) -> pd.DataFrame:
+        """Every bar of the ticker up to now, whatever the lookback"""
+        return self._frames[ticker].iloc[: self.end_of(ticker)]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._frames)
+
+    def __len__(self) -> int:
+        return len(self._frames)
+
+
+class AsOfView(Mapping[str, TickerView]):
+    """View of a merged timeline event, every ticker that has started at its last known bar
+
+    ends is shared with the engine and advanced in place, so the view is only valid for the
+    event it was handed out for.
+    """
+
+    __slots__ = ("_store", "_codes", "_ends", "_lookback", "time", "updated")
+
+    def __init__(
+        self,
+        store: "MarketStore",
+        codes: dict[str, int],
+        ends: list[int],
+        time: pd.Timestamp,
+        updated: list[str],
+        lookback: Optional[int] = None,
+    ):
+        self._store = store
+        self._codes = codes
+        self._ends = ends
+        self._lookback = lookback  # tickers are windows of their last lookback bars
+        self.time = time
+        self.updated = updated  # tickers with a new bar at this event
+
+    @property
+    def store(self) -> "MarketStore":
+        return self._store
+
+    def end_of(self, ticker: str) -> int:
+        return self._ends[self._codes[ticker]]
+
+    def window(self, lookback: Optional[int]) -> "AsOfView":
+        """The same event with tickers limited to their last lookback bars"""
+        return AsOfView(self._store, self._codes, self._ends, self.time, self.updated, lookback)
+
+    def __getitem__(self, ticker: str) -> TickerView:
+        end = self._ends[self._codes[ticker]]
+        if not end:
+            raise KeyError(ticker)
+        return TickerView(self._store[ticker], end, window_start(end, self._lookback))
+
+    def __iter__(self) -> Iterator[str]:
+        return (t for t, c in self._codes.items() if self._ends[c])
+
+    def __len__(self) -> int:
+        return sum(1 for end in self._ends if end)
+
+
+class AsOfFrameView(FrameView):
+    """FrameView of a merged timeline event for DataFrame strategies"""
+
+    __slots__ = ("_view",)
+
+    def __init__(
+        self, frames: Mapping[str, pd.DataFrame], view: AsOfView, lookback: Optional[int] = None
+    ):
+        super().__init__(frames, 0, lookback)
+        self._view = view
+
+    def end_of(self, ticker: str) -> int:
+        end = self._view.end_of(ticker)
+        if not end:
+            raise KeyError(ticker)
+        return end
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._view)
+
+    def __len__(self) -> int:
+        return len(self._view)
+
+
+def latest_bar(data: pd.DataFrame | TickerView) -> pd.Series | Bar:
+    return data.bar() if isinstance(data, TickerView) else data.iloc[-1]
@@ -1,11 +1,41 @@
 import logging
-from typing import Optional
+from time import perf_counter
+from typing import TYPE_CHECKING, Any, Hashable, Iterable, Mapping, NamedTuple, Optional, Sequence
 import pandas as pd
 import numpy as np
-import pandera.pandas as pa
-import pandera.typing as pat
 
-from tiny_backtester.strategy import Strategy
+from tiny_backtester.cache import TimeSeriesCache
+from tiny_backtester.data_store import (
+    AsOfFrameView,
+    AsOfView,
+    Bar,
+    FrameView,
+    MarketStore,
+    MarketView,
+    TickerData,
+    TickerView,
+    overlay,
+    read_only,
+    to_datetime_index,
+)
+from tiny_backtester.equity import EquityCurve, Trades
+from tiny_backtester.execution import ExecutionModel, TickerCosts
+from tiny_backtester.indicators import push_indicators, reset_indicators
+from tiny_backtester.instrumentation import Instrumentation
+from tiny_backtester.ledger import OrderLog, PositionLog
+from tiny_backtester.order_book import OrderBook, RestingOrder
+from tiny_backtester.strategy import SignalStrategy, Strategy
+from tiny_backtester.streaming import iter_windows
+from tiny_backtester.timeline import build_timeline
+from tiny_backtester.utils.accounting import (
+    fill_orders,
+    fill_orders_compiled,
+    fill_orders_vectorized,
+    get_backend,
+    get_order_intents,
+    track_positions,
+    track_positions_compiled,
+)
 from tiny_backtester.utils.backtester_exception import BacktesterException
 from tiny_backtester.utils.backtester_types import (
     CalendarType,
@@ -15,78 +45,695 @@ from tiny_backtester.utils.backtester_types import (
     OrderStatus,
     Position,
     RunResults,
-    TimeSeries,
-)
-from tiny_backtester.utils.math_utils import (
-    get_average_entry_price,
-    get_execution_price,
-    process_df,
 )
+from tiny_backtester.utils.math_utils import get_average_entry_price, process_df
+from tiny_backtester.utils.validation import DEFAULT_VALIDATION, trust, validate_ts
+
+if TYPE_CHECKING:
+    from concurrent.futures import ThreadPoolExecutor
+
+    from tiny_backtester.universe import Universe
 
 logger = logging.getLogger("tiny_backtester")
 
 
+class Account(NamedTuple):
+    """State of one strategy in a run_many pass"""
+
+    strat: Strategy
+    source: int  # index of the precalc the strategy reads
+    n_epochs: int
+    book: OrderBook
+    order_log: OrderLog
+    pos_info: dict[str, PositionLog]
+    equity: EquityCurve
+
+
 class Engine:
 
-    def __init__(self, options: Optional[dict] = None):
+    def __init__(
+        self,
+        options: Optional[dict] = None,
+        cache: Optional[TimeSeriesCache] = None,
+        instrumentation: Optional[Instrumentation] = None,
+    ):
         self.market_data: MarketData = {}
         self.options = options if options else dict()
+        self.cache = cache
+        self.instrumentation = instrumentation
+        self.book = OrderBook()
+        self.execution: ExecutionModel = self.options.get("execution") or ExecutionModel(
+            self.options.get("slippage", False)
+        )
+        self.costs: dict[int, TickerCosts] = {}
+        # accounting kernels of run_signals, numba compiled when it's installed
+        self.backend = get_backend(self.options.get("backend"))
 
-    def run(self, strat: Strategy, n_epochs: Optional[int] = None) -> RunResults:
+    def validate(
+        self, strat: Strategy, data: Optional[Mapping[str, Any]] = None, live: bool = False
+    ):
+        """Checks strat can run on data, by default the engine's market data
+
+        Live runs get their data as it arrives, so only the strategy is checked.
+        """
+        data = self.market_data if data is None else data
         if not strat.funds or strat.funds <= 0:
             raise BacktesterException("strategy funds must be greater than 0")
-        if not self.market_data or len(self.market_data) == 0:
+        if strat.lookback is not None and strat.lookback < 1:
+            raise BacktesterException("strategy lookback must be at least 1 bar")
+        if not live and (not data or len(data) == 0):
             raise BacktesterException("must provide data for backtesting")
         if not strat.tickers or len(strat.tickers) == 0:
             raise BacktesterException("strategy must have tickers to run strategy on")
-        if not strat.tickers.issubset(set(self.market_data.keys())):
+        if not live and not strat.tickers.issubset(set(data.keys())):
             raise BacktesterException(
-                "data for tickers not found: " + str(strat.tickers - set(self.market_data.keys()))
+                "data for tickers not found: " + str(strat.tickers - set(data.keys()))
             )
-        strat.precalc(self.market_data)
-        min_data_length = min(len(self.market_data[t]) for t in strat.tickers)
+
+    def reset(self):
+        """Clears the state of a previous run"""
+        self.book.reset()
+        self.costs.clear()
+        if self.instrumentation:
+            self.instrumentation.reset()
+
+    def precalc(self, strat: Strategy, tickers: Optional[Iterable[str]] = None) -> MarketData:
+        """Runs precalc on a private overlay of the tickers (default the strategy's), returns it"""
+        frames = overlay(self.market_data, strat.tickers if tickers is None else tickers)
+        if self.instrumentation:
+            self.instrumentation.timed("precalc", strat.precalc, frames)
+        else:
+            strat.precalc(frames)
+        return frames
+
+    def price_bars(self, store: MarketStore, tickers: Iterable[str]):
+        """Precomputes the execution costs of every bar of the tickers, fills look them up"""
+        for t in tickers:
+            self.costs[id(store[t])] = self.execution.costs(t, store[t])
+
+    def ticker_costs(
+        self, ticker: str, data: TickerData, start: int = 0, stop: Optional[int] = None
+    ) -> TickerCosts:
+        """Precomputed costs of a ticker's data, else the costs of bars start to stop"""
+        costs = self.costs.get(id(data))
+        stop = len(data) if stop is None else stop
+        if costs is not None and costs.data is data and costs.covers(start, stop):
+            return costs
+        return self.execution.costs(ticker, data, start, stop)
+
+    def price_bar(self, ticker: str, data: TickerData, i: int) -> TickerCosts:
+        """Costs of bar i of a ticker, cached for the fills on it as live trading adds bars"""
+        costs = self.costs[id(data)] = self.execution.costs(ticker, data, i, i + 1)
+        return costs
+
+    def strategy_data(
+        self, strat: Strategy, frames: MarketData, cur_data: MarketView | AsOfView
+    ) -> Mapping[str, pd.DataFrame] | MarketView | AsOfView:
+        """What the strategy's run gets of the epoch, windows of its last lookback bars
+
+        The windows are zero-copy slices, so they cost the same at every epoch.
+        """
+        lookback = strat.lookback
+        if isinstance(cur_data, AsOfView):
+            if not strat.columnar:
+                return AsOfFrameView(frames, cur_data, lookback)
+            return cur_data if lookback is None else cur_data.window(lookback)
+        if not strat.columnar:
+            return FrameView(frames, cur_data.end, lookback)
+        return cur_data if lookback is None else cur_data.store.view(cur_data.end, lookback)
+
+    def make_results(
+        self, order_log: OrderLog, pos_info: dict[str, PositionLog], equity: EquityCurve
+    ) -> RunResults:
+        return self.with_stats(
+            {
+                "orders": order_log.to_frame(),
+                "positions": {t: log.to_frame() for t, log in pos_info.items()},
+                "equity": equity.to_frame(),
+            }
+        )
+
+    def mark_to_market(
+        self,
+        equity: EquityCurve,
+        store: MarketStore,
+        tickers: Iterable[str],
+        times: np.ndarray,
+        trades: Trades,
+    ):
+        """Adds the equity of the bar times to the curve, marked at sell side execution prices"""
+        bars = {t: (store[t].index, self.ticker_costs(t, store[t]).bid) for t in tickers}
+        equity.update(times, bars, trades, store[min(tickers)].tz)
+
+    def with_stats(self, results: RunResults) -> RunResults:
+        if self.instrumentation:
+            results["instrumentation"] = self.instrumentation.export()
+        return results
+
+    def run(
+        self,
+        strat: Strategy,
+        n_epochs: Optional[int] = None,
+        start: int = 0,
+        precalc: bool = True,
+    ) -> RunResults:
+        """Run epochs start + 1 to n_epochs, the first start bars are only history
+
+        precalc=False runs on market data the strategy's precalc has already been applied to.
+        """
+        self.validate(strat)
+        self.reset()
+        frames = self.precalc(strat) if precalc else overlay(self.market_data, strat.tickers)
+        reset_indicators(strat.indicators or {})
+        store = MarketStore.from_frames(frames)
+        self.price_bars(store, strat.tickers)
+        min_data_length = min(len(store[t]) for t in strat.tickers)
         n_epochs = min_data_length if not n_epochs else min(min_data_length, n_epochs)
-        order_log: list[ExecutedOrder] = []
-        pos_info = {t: [Position()] for t in strat.tickers}
-        for i in range(1, n_epochs + 1):
-            cur_data = {t: self.market_data[t].iloc[:i] for t in strat.tickers}
-            executed_orders = self.execute_orders(strat, strat.run(cur_data) or [], cur_data)
-            for o in executed_orders:
-                if o.status == "filled":
-                    pos_info[o.ticker].append(
-                        self.get_position(pos_info[o.ticker][-1], o, cur_data[o.ticker].iloc[-1])
-                    )
-            order_log.extend(executed_orders)
+        order_log = OrderLog()
+        pos_info = {t: PositionLog() for t in strat.tickers}
+        equity = EquityCurve(strat.funds, {t: strat.portfolio.get(t, 0) for t in strat.tickers})
+        for i in range(1, start + 1):
+            push_indicators(strat.indicators or {}, store.view(i))
+        inst = self.instrumentation
+        for i in range(start + 1, n_epochs + 1):
+            began = perf_counter() if inst else 0.0
+            cur_data = store.view(i)
+            strat_data = self.strategy_data(strat, frames, cur_data)
+            if inst:
+                inst.add("data_view", perf_counter() - began)
+            self.step(strat, cur_data, strat_data, order_log, pos_info)
+
+        times = np.unique(np.concatenate([store[t].index[start:n_epochs] for t in strat.tickers]))
+        self.mark_to_market(equity, store, strat.tickers, times, order_log.trades())
+        return self.make_results(order_log, pos_info, equity)
+
+    def run_many(
+        self,
+        strategies: Sequence[Strategy],
+        n_epochs: Optional[int] = None,
+        threads: int = 0,
+        processes: int = 0,
+    ) -> list[RunResults]:
+        """Run every strategy in a single pass over the epochs, with the results run gives each
+
+        Strategies with an equal precalc_key share one precalc and one data view per epoch, each
+        keeps its own funds, portfolio, order book and ledgers. threads calls the strategies' run
+        on a thread pool every epoch, for runs that release the GIL. processes splits the
+        strategies between worker processes attached to one shared copy of the market data, the
+        strategies passed in are then left as they were.
+        """
+        for strat in strategies:
+            self.validate(strat)
+        if not strategies:
+            return []
+        if processes:
+            from tiny_backtester.sweep import run_many_pool
+
+            return run_many_pool(self, strategies, n_epochs, threads, processes)
+        self.reset()
+        book = self.book
+        sources: dict[Hashable, int] = {}
+        precalcs: list[MarketData] = []
+        strategy_sources = []
+        for strat in strategies:
+            key = strat.precalc_key()
+            if key is None or key not in sources:
+                if key is not None:
+                    sources[key] = len(precalcs)
+                precalcs.append(self.precalc(strat))
+            else:
+                # a strategy may only precalc its own tickers, the ones the key lacks are added
+                frames = precalcs[sources[key]]
+                missing = strat.tickers - frames.keys()
+                if missing:
+                    frames.update((t, df) for t, df in self.precalc(strat).items() if t in missing)
+            strategy_sources.append(len(precalcs) - 1 if key is None else sources[key])
+        data = [(frames, MarketStore.from_frames(frames)) for frames in precalcs]
+        for frames, store in data:
+            self.price_bars(store, frames)
+        accounts = []
+        for strat, source in zip(strategies, strategy_sources):
+            store = data[source][1]
+            n = min(len(store[t]) for t in strat.tickers)
+            reset_indicators(strat.indicators or {})
+            accounts.append(
+                Account(
+                    strat,
+                    source,
+                    n if not n_epochs else min(n, n_epochs),
+                    OrderBook(),
+                    OrderLog(),
+                    {t: PositionLog() for t in strat.tickers},
+                    EquityCurve(strat.funds, {t: strat.portfolio.get(t, 0) for t in strat.tickers}),
+                )
+            )
+
+        inst = self.instrumentation
+        pool: Optional["ThreadPoolExecutor"] = None
+        if threads:
+            from concurrent.futures import ThreadPoolExecutor
+
+            pool = ThreadPoolExecutor(threads)
+        try:
+            for i in range(1, max(a.n_epochs for a in accounts) + 1):
+                began = perf_counter() if inst else 0.0
+                views = [store.view(i) for _, store in data]
+                active = [a for a in accounts if i <= a.n_epochs]
+                if inst:
+                    inst.add("data_view", perf_counter() - began)
+                strat_data = [
+                    self.strategy_data(a.strat, data[a.source][0], views[a.source]) for a in active
+                ]
+                if pool is None:
+                    for a, d in zip(active, strat_data):
+                        self.book = a.book
+                        self.step(a.strat, views[a.source], d, a.order_log, a.pos_info)
+                    continue
+                matched = []
+                for a in active:
+                    self.book = a.book
+                    matched.append(self.match_step(a.strat, views[a.source]))
+                runs = pool.map(lambda a, d: a.strat.run(d) or [], active, strat_data)
+                for a, m, orders in zip(active, matched, runs):
+                    self.book = a.book
+                    self.order_step(a.strat, m, orders, views[a.source], a.order_log, a.pos_info)
+        finally:
+            self.book = book
+            if pool is not None:
+                pool.shutdown()
+
+        results = []
+        for a in accounts:
+            store = data[a.source][1]
+            tickers = a.strat.tickers
+            times = np.unique(np.concatenate([store[t].index[: a.n_epochs] for t in tickers]))
+            self.mark_to_market(a.equity, store, tickers, times, a.order_log.trades())
+            results.append(self.make_results(a.order_log, a.pos_info, a.equity))
+        return results
+
+    def run_events(self, strat: Strategy, n_events: Optional[int] = None) -> RunResults:
+        """Run on the merged timeline of the tickers, for data that isn't aligned bar by bar
+
+        The strategy is called once per distinct timestamp with every started ticker at its last
+        known bar, data.updated lists the tickers that have a new bar.
+        """
+        self.validate(strat)
+        self.reset()
+        frames = self.precalc(strat)
+        reset_indicators(strat.indicators or {})
+        tickers = sorted(strat.tickers)
+        store = MarketStore.from_frames(frames, tickers)
+        self.price_bars(store, tickers)
+        timeline = build_timeline([store[t].index for t in tickers])
+        starts, codes, positions = (a.tolist() for a in timeline[1:])
+        ticker_codes = {t: c for c, t in enumerate(tickers)}
+        ends = [0] * len(tickers)
+        tz = store[tickers[0]].tz
+        n_events = len(timeline) if not n_events else min(len(timeline), n_events)
+        order_log = OrderLog()
+        pos_info = {t: PositionLog() for t in strat.tickers}
+        equity = EquityCurve(strat.funds, {t: strat.portfolio.get(t, 0) for t in tickers})
+        inst = self.instrumentation
+        for e in range(n_events):
+            start = perf_counter() if inst else 0.0
+            updated = []
+            for j in range(starts[e], starts[e + 1]):
+                ends[codes[j]] = positions[j] + 1
+                updated.append(tickers[codes[j]])
+            time = pd.Timestamp(int(timeline.times[e]), tz=tz)
+            cur_data = AsOfView(store, ticker_codes, ends, time, updated)
+            strat_data = self.strategy_data(strat, frames, cur_data)
+            if inst:
+                inst.add("data_view", perf_counter() - start)
+            self.step(strat, cur_data, strat_data, order_log, pos_info, updated)
+
+        times = timeline.times[:n_events]
+        self.mark_to_market(equity, store, tickers, times, order_log.trades())
+        return self.make_results(order_log, pos_info, equity)
+
+    def run_stream(
+        self,
+        strat: Strategy,
+        streams: Mapping[str, Iterable[pd.DataFrame]],
+        window: int = 10_000,
+        n_epochs: Optional[int] = None,
+    ) -> RunResults:
+        """Run on chunked streams (see streaming.stream_ts)
+
+        At most window + lookback bars of each ticker are held at once.
+        """
+        self.validate(strat, streams)
+        order_log = OrderLog()
+        pos_info = {t: PositionLog() for t in strat.tickers}
+        equity = EquityCurve(strat.funds, {t: strat.portfolio.get(t, 0) for t in strat.tickers})
+        epochs = 0
+        reset_indicators(strat.indicators or {})
+        self.reset()
+        inst = self.instrumentation
+        for frames, first in iter_windows(streams, strat, window):
+            if n_epochs and epochs >= n_epochs:
+                break
+            store = MarketStore.from_frames(frames, strat.tickers)
+            self.costs.clear()
+            self.price_bars(store, strat.tickers)
+            stop = min(len(store[t]) for t in strat.tickers)
+            if n_epochs:
+                stop = min(stop, first + n_epochs - epochs)
+            logged = len(order_log)
+            for i in range(first + 1, stop + 1):
+                start = perf_counter() if inst else 0.0
+                cur_data = store.view(i)
+                strat_data = self.strategy_data(strat, frames, cur_data)
+                if inst:
+                    inst.add("data_view", perf_counter() - start)
+                self.step(strat, cur_data, strat_data, order_log, pos_info)
+                epochs += 1
+            # the window's new bars, the ones before first were marked with the last window
+            times = np.unique(np.concatenate([store[t].index[first:stop] for t in strat.tickers]))
+            self.mark_to_market(equity, store, strat.tickers, times, order_log.trades(logged))
+        return self.make_results(order_log, pos_info, equity)
+
+    def step(
+        self,
+        strat: Strategy,
+        cur_data: MarketView | AsOfView,
+        strat_data: Mapping[str, pd.DataFrame] | MarketView | AsOfView,
+        order_log: OrderLog,
+        pos_info: dict[str, PositionLog],
+        updated: Optional[Iterable[str]] = None,
+    ):
+        matched = self.match_step(strat, cur_data, updated)
+        orders = self.strategy_run(strat, strat_data)
+        self.order_step(strat, matched, orders, cur_data, order_log, pos_info)
+
+    def match_step(
+        self,
+        strat: Strategy,
+        cur_data: MarketView | AsOfView,
+        updated: Optional[Iterable[str]] = None,
+    ) -> list[ExecutedOrder]:
+        """Advances indicators and the order book to the new bars, returns the matched orders"""
+        if strat.indicators:
+            push_indicators(strat.indicators, cur_data, updated)
+        self.book.epoch += 1
+        if not self.book:
+            return []
+        if self.instrumentation:
+            return self.instrumentation.timed(
+                "match_orders", self.match_orders, strat, cur_data, updated
+            )
+        return self.match_orders(strat, cur_data, updated)
+
+    def strategy_run(
+        self, strat: Strategy, strat_data: Mapping[str, pd.DataFrame] | MarketView | AsOfView
+    ) -> list[Order]:
+        if self.instrumentation:
+            return self.instrumentation.timed("strategy_run", strat.run, strat_data) or []
+        return strat.run(strat_data) or []
+
+    def order_step(
+        self,
+        strat: Strategy,
+        matched: list[ExecutedOrder],
+        orders: list[Order],
+        cur_data: MarketView | AsOfView,
+        order_log: OrderLog,
+        pos_info: dict[str, PositionLog],
+    ):
+        """Executes the strategy's orders and records them after the matched resting orders"""
+        inst = self.instrumentation
+        if not inst:
+            executed_orders = self.execute_orders(strat, orders, cur_data)
+            self.record(matched + executed_orders, cur_data, order_log, pos_info)
             logger.debug(f"filled {len(executed_orders)}")
+            return
+        # every phase timed, kept apart so uninstrumented runs pay nothing
+        executed_orders = inst.timed("execute_orders", self.execute_orders, strat, orders, cur_data)
+        inst.timed(
+            "get_position", self.record, matched + executed_orders, cur_data, order_log, pos_info
+        )
+        inst.count("epochs")
+        inst.count("orders_submitted", len(orders))
+        for o in matched + executed_orders:
+            inst.count(f"orders_{o.status}")
+        logger.debug(f"filled {len(executed_orders)}")
+
+    def record(
+        self,
+        executed_orders: list[ExecutedOrder],
+        cur_data: MarketView | AsOfView,
+        order_log: OrderLog,
+        pos_info: dict[str, PositionLog],
+    ):
+        for o in executed_orders:
+            if o.status == "filled":
+                pos_info[o.ticker].append(
+                    self.get_position(pos_info[o.ticker].last, o, cur_data[o.ticker].bar())
+                )
+        order_log.extend(executed_orders)
+
+    def match_orders(
+        self,
+        strat: Strategy,
+        cur_data: MarketView | AsOfView,
+        updated: Optional[Iterable[str]] = None,
+    ) -> list[ExecutedOrder]:
+        """Fills and expires resting orders on the new bars of the updated tickers (default all)"""
+        executed = []
+        for t in self.book.tickers(updated):
+            view = cur_data[t]
+            bar, i = view.bar(), view.end - 1
+            time = int(view.data.index[i])
+            costs = self.ticker_costs(t, view.data, i, i + 1)
+            for resting in self.book.match(t, bar["high"], bar["low"]):
+                price = resting.fill_price(bar["open"])
+                if price is None:
+                    self.book.push(resting._replace(triggered=True))
+                    continue
+                order = resting.order
+                quantity = costs.cap(order.quantity, i, self.book.used(t, time))
+                if quantity:
+                    filled = order._replace(quantity=quantity)
+                    done = self.settle(strat, filled, np.float64(price), bar.name)
+                    if done.status == "filled":
+                        self.book.record_fill(t, time, quantity)
+                    executed.append(done)
+                if quantity < order.quantity:
+                    # as in execute_orders, the rest of an order capped by the bar's volume
+                    rest = order.quantity - quantity
+                    executed.append(
+                        ExecutedOrder(bar.name, t, order.type, rest, np.float64(price), "cancelled")
+                    )
+        for resting in self.book.expire():
+            executed.append(self.closed(resting, cur_data, "expired"))
+        return executed
+
+    def closed(
+        self,
+        resting: RestingOrder,
+        cur_data: MarketData | MarketView | AsOfView,
+        status: OrderStatus,
+    ) -> ExecutedOrder:
+        o = resting.order
+        view = cur_data[o.ticker]
+        time = view.bar().name if isinstance(view, TickerView) else pd.Timestamp(view.index[-1])
+        return ExecutedOrder(time, o.ticker, o.type, o.quantity, np.float64(resting.price), status)
 
-        return {
-            "orders": pd.DataFrame(data=order_log),
-            "positions": {t: pd.DataFrame(data=d) for t, d in pos_info.items()},
-        }
+    def run_signals(self, strat: SignalStrategy, n_epochs: Optional[int] = None) -> RunResults:
+        """Vectorized equivalent of run for strategies expressed as signal arrays"""
+        self.validate(strat)
+        if self.execution.quantity_dependent:
+            raise BacktesterException(
+                "run_signals needs a price per share, run strategies with impact, participation"
+                " caps or commissions with run"
+            )
+        self.reset()
+        frames = self.precalc(strat)
+        tickers = sorted(strat.tickers)
+        store = MarketStore.from_frames(frames, tickers)
+        min_data_length = min(len(store[t]) for t in tickers)
+        n_epochs = min_data_length if not n_epochs else min(min_data_length, n_epochs)
+        inst = self.instrumentation
+        signals = inst.timed("signals", strat.signals, store) if inst else strat.signals(store)
+        for t in tickers:
+            if t not in signals or len(signals[t]) < n_epochs:
+                raise BacktesterException(f"strategy must provide a signal for every bar of {t}")
+            if not np.issubdtype(np.asarray(signals[t]).dtype, np.integer):
+                raise BacktesterException(f"signal for {t} must be an integer array")
+
+        sig = np.stack([np.asarray(signals[t][:n_epochs], dtype=np.int64) for t in tickers])
+        self.price_bars(store, tickers)
+        buy = np.stack([self.ticker_costs(t, store[t]).ask[:n_epochs] for t in tickers])
+        sell = np.stack([self.ticker_costs(t, store[t]).bid[:n_epochs] for t in tickers])
+        holdings = np.array([strat.portfolio.get(t, 0) for t in tickers], dtype=np.int64)
+        equity = EquityCurve(strat.funds, dict(zip(tickers, holdings.tolist())))
+        target = strat.signal_type == "target"
+        compiled = self.backend == "numba"
+        start = perf_counter() if inst else 0.0
+        if compiled:
+            fills = fill_orders_compiled(sig, buy, sell, float(strat.funds), holdings, target)
+        else:
+            intents = get_order_intents(sig, holdings, target)
+            vectorized = fill_orders_vectorized(intents, buy, sell, float(strat.funds), holdings)
+            if vectorized is None:
+                logger.debug("signal run has rejected orders, using sequential fills")
+                fills = fill_orders(sig, buy, sell, float(strat.funds), holdings, target)
+            else:
+                fills = vectorized
+        if inst:
+            inst.add("fill_orders", perf_counter() - start)
+            inst.count("epochs", n_epochs)
+            inst.count("orders_submitted", len(fills.filled))
+            inst.count("orders_filled", int(fills.filled.sum()))
+            inst.count("orders_rejected", int(len(fills.filled) - fills.filled.sum()))
+        strat.funds = np.float64(fills.funds)
+        for t, held in zip(tickers, fills.holdings.tolist()):
+            if strat.portfolio.get(t, 0) != held:
+                strat.portfolio[t] = held
+        logger.debug(f"filled {fills.filled.sum()} of {len(fills.filled)} signal orders")
+
+        tz = store[tickers[0]].tz
+        times = np.stack([store[t].index[:n_epochs] for t in tickers])
+        orders = pd.DataFrame()
+        if len(fills.epoch):
+            orders = pd.DataFrame(
+                {
+                    "time": to_datetime_index(times[fills.code, fills.epoch], tz),
+                    "ticker": np.array(tickers, dtype=object)[fills.code],
+                    "type": np.where(fills.quantity > 0, "buy", "sell").astype(object),
+                    "quantity": np.abs(fills.quantity),
+                    "price": fills.price,
+                    "status": np.where(fills.filled, "filled", "rejected").astype(object),
+                }
+            )
+        positions = {}
+        for k, t in enumerate(tickers):
+            mask = fills.filled & (fills.code == k)
+            epoch = fills.epoch[mask]
+            quantity, entry_price, realised_pnl = (
+                track_positions_compiled if compiled else track_positions
+            )(fills.quantity[mask], fills.price[mask])
+            first = Position()
+            positions[t] = pd.DataFrame(
+                {
+                    "time": to_datetime_index(times[k, epoch], tz).insert(0, first.time),
+                    "quantity": np.insert(quantity, 0, first.quantity),
+                    "entry_price": np.insert(entry_price, 0, first.entry_price),
+                    "fill_price": np.insert(fills.price[mask], 0, first.fill_price),
+                    "unrealised_pnl": np.insert(quantity * sell[k, epoch], 0, first.unrealised_pnl),
+                    "realised_pnl": np.insert(realised_pnl, 0, first.realised_pnl),
+                }
+            )
+        filled = fills.filled
+        trades = Trades(
+            times[fills.code[filled], fills.epoch[filled]],
+            np.array(tickers, dtype=object)[fills.code[filled]],
+            fills.quantity[filled],
+            fills.price[filled],
+        )
+        bars = {t: (times[k], sell[k]) for k, t in enumerate(tickers)}
+        equity.update(np.unique(times), bars, trades, tz)
+        return self.with_stats(
+            {"orders": orders, "positions": positions, "equity": equity.to_frame()}
+        )
 
-    @pa.check_types
     def load_ts(
         self,
         ticker: str,
-        df: pat.DataFrame[TimeSeries],
+        df: pd.DataFrame,
         cal: Optional[CalendarType] = None,
         resample_freq: Optional[str] = None,
     ):
-        self.market_data[ticker] = process_df(df, cal, resample_freq)
+        # validation happens in process_df, so a cache hit skips it along with the processing
+        validation = self.options.get("validation", DEFAULT_VALIDATION)
+        if self.cache is None:
+            processed = process_df(df, cal, resample_freq, validation=validation)
+        else:
+            key = self.cache.key(df, cal, resample_freq)
+            cached = self.cache.get(key)
+            if cached is None:
+                cached = process_df(df, cal, resample_freq, validation=validation)
+                self.cache.put(key, cached)
+            processed = cached
+        # stored read-only so runs share the columns, precalc writes to an overlay of them
+        stored = read_only(processed)
+        self.market_data[ticker] = trust(stored) if validation == "once" else stored
         logger.debug(f"added ticker data {ticker} of dims {df.shape}")
 
+    def load_universe(self, universe: "Universe"):
+        """Adds every ticker of a universe loaded by load_universe, sharing its columns"""
+        validation = self.options.get("validation", DEFAULT_VALIDATION)
+        for ticker in universe:
+            df = universe.frame(ticker)
+            if validation == "once":
+                # only tickers load_universe validated are trusted, the rest are checked here
+                df = trust(df) if universe.validation != "off" else validate_ts(df, validation)
+            self.market_data[ticker] = df
+        logger.debug(f"added universe of {len(universe)} tickers")
+
     def execute_orders(
-        self, strat: Strategy, orders: list[Order], cur_data: MarketData
+        self, strat: Strategy, orders: list[Order], cur_data: MarketData | MarketView | AsOfView
     ) -> list[ExecutedOrder]:
-        return [self.execute_order(strat, order, cur_data) for order in orders]
+        executed: list[ExecutedOrder] = []
+        for order in orders:
+            if order.type == "cancel":
+                cancelled = self.book.cancel(order.ticker)
+                executed.extend(self.closed(r, cur_data, "cancelled") for r in cancelled)
+            else:
+                done = self.execute_order(strat, order, cur_data)
+                executed.append(done)
+                if done.quantity < order.quantity:
+                    # the rest of an order capped by the bar's volume isn't filled
+                    rest = order.quantity - done.quantity
+                    executed.append(done._replace(quantity=rest, status="cancelled"))
+        return executed
+
+    def execute_order(
+        self, strat: Strategy, order: Order, cur_data: MarketData | MarketView | AsOfView
+    ) -> ExecutedOrder:
+        """Executes an order on the ticker's latest bar, up to the quantity the bar can fill"""
+        view = cur_data[order.ticker]
+        if isinstance(view, TickerView):
+            data, i = view.data, view.end - 1
+        else:
+            data, i = TickerData.from_frame(view), len(view) - 1
+        costs = self.ticker_costs(order.ticker, data, i, i + 1)
+        used = self.book.used(order.ticker, int(data.index[i]))
+        quantity, price = costs.fill(order.type, order.quantity, i, used)
+        time = data.timestamp(i)
+        if order.type not in ("buy", "sell"):
+            logger.debug(f"unsupported order: {order}")
+            return ExecutedOrder(
+                time, order.ticker, order.type, order.quantity, price, "unsupported"
+            )
+        buy = order.type == "buy"
+        stop, limit = order.stop_price, order.limit_price
+        if (stop is not None and (price < stop if buy else price > stop)) or (
+            limit and (limit < price if buy else limit > price)
+        ):
+            status: OrderStatus = "rejected"
+            if order.good_for != 0:
+                self.book.add(order)
+                status = "pending"
+            return ExecutedOrder(time, order.ticker, order.type, order.quantity, price, status)
+        if quantity == 0:
+            return ExecutedOrder(time, order.ticker, order.type, order.quantity, price, "cancelled")
+        done = self.settle(strat, order._replace(quantity=quantity), price, time)
+        if done.status == "filled":
+            self.book.record_fill(order.ticker, int(data.index[i]), quantity)
+        return done
 
-    def execute_order(self, strat: Strategy, order: Order, cur_data: MarketData) -> ExecutedOrder:
-        latest = cur_data[order.ticker].iloc[-1]
-        price = get_execution_price(order.type, latest, self.options.get("slippage", False))
+    def settle(
+        self, strat: Strategy, order: Order, price: np.float64, time: pd.Timestamp
+    ) -> ExecutedOrder:
+        """Fills an order at price plus commission if the strategy has the funds or holdings"""
+        price = self.execution.commission_of(order.ticker).net_price(
+            order.type, order.quantity, price
+        )
 
         def make_executed_order(status: OrderStatus) -> ExecutedOrder:
             return ExecutedOrder(
-                latest.name,
+                time,
                 order.ticker,
                 order.type,
                 order.quantity,
@@ -96,32 +743,27 @@ class Engine:
 
         total_order_price = price * order.quantity
         if order.type == "buy":
-            if total_order_price > strat.funds or (order.limit_price and order.limit_price < price):
+            if total_order_price > strat.funds:
                 return make_executed_order("rejected")
             strat.funds -= total_order_price
             strat.portfolio[order.ticker] += order.quantity
             logger.debug(f"filled buy order: {order.quantity} x {order.ticker} @ {price}")
             return make_executed_order("filled")
-        elif order.type == "sell":
-            if strat.portfolio[order.ticker] < order.quantity or (
-                order.limit_price and order.limit_price > price
-            ):
-                return make_executed_order("rejected")
-            strat.funds += total_order_price
-            strat.portfolio[order.ticker] -= order.quantity
-            logger.debug(f"filled sell order: {order.quantity} x {order.ticker} @ {price}")
-            return make_executed_order("filled")
-        logger.debug(f"unsupported order: {order}")
-        return make_executed_order("unsupported")
+        if strat.portfolio[order.ticker] < order.quantity:
+            return make_executed_order("rejected")
+        strat.funds += total_order_price
+        strat.portfolio[order.ticker] -= order.quantity
+        logger.debug(f"filled sell order: {order.quantity} x {order.ticker} @ {price}")
+        return make_executed_order("filled")
 
-    def get_position(self, last_pos: Position, order: ExecutedOrder, latest: pd.Series) -> Position:
+    def get_position(
+        self, last_pos: Position, order: ExecutedOrder, latest: pd.Series | Bar
+    ) -> Position:
         quantity_change = order.quantity if order.type == "buy" else -order.quantity
         quantity = last_pos.quantity + quantity_change
         entry_price = np.float64(0)
         realised_pnl = np.float64(last_pos.realised_pnl)
-        unrealised_pnl = quantity * get_execution_price(
-            "sell", latest, self.options.get("slippage", False)
-        )
+        unrealised_pnl = quantity * self.execution.price("sell", latest)
         if order.type == "buy":
             entry_price = get_average_entry_price(
                 last_pos.entry_price, order.price, last_pos.quantity, order.quantity
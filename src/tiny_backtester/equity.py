@@ -0,0 +1,73 @@
+from typing import Any, Mapping, NamedTuple, Optional
+import numpy as np
+import pandas as pd
+
+from tiny_backtester.data_store import to_datetime_index
+
+
+class Trades(NamedTuple):
+    """Filled orders in execution order"""
+
+    time: np.ndarray  # int64 nanoseconds
+    ticker: np.ndarray  # object
+    quantity: np.ndarray  # int64, positive for buys and negative for sells
+    price: np.ndarray  # float64
+
+
+class EquityCurve:
+    """Per bar mark-to-market cash, exposure and equity of a portfolio
+
+    Each update covers a chunk of bars (a whole run, a streaming window or a single live bar):
+    holdings are forward filled from the trades over the chunk's bar times and marked at each
+    ticker's last sell side execution price, carrying cash, holdings and prices between chunks.
+    """
+
+    def __init__(self, funds: float, holdings: Optional[Mapping[str, int]] = None):
+        self.cash = float(funds)
+        self.holdings: dict[str, int] = dict(holdings or {})
+        self.prices: dict[str, float] = {}
+        self.chunks: list[tuple[np.ndarray, np.ndarray, np.ndarray]] = []
+        self.tz: Any = None
+
+    def update(
+        self,
+        times: np.ndarray,
+        bars: Mapping[str, tuple[np.ndarray, np.ndarray]],
+        trades: Trades,
+        tz: Any = None,
+    ):
+        """Marks the bar times (sorted int64 nanoseconds) given each ticker's bar times and sell
+        prices, which may extend before the chunk, and the chunk's trades"""
+        self.tz = tz
+        n = len(times)
+        if n == 0:
+            return
+        at = np.searchsorted(times, trades.time)
+        cash = self.cash + np.cumsum(np.bincount(at, -trades.quantity * trades.price, n))
+        exposure = np.zeros(n)
+        for t in sorted(set(bars) | set(self.holdings)):
+            mine = trades.ticker == t
+            held = self.holdings.get(t, 0) + np.cumsum(
+                np.bincount(at[mine], trades.quantity[mine], n)
+            ).astype(np.int64)
+            if t in bars:
+                index, sell = bars[t]
+                last = np.searchsorted(index, times, "right") - 1
+                price = np.where(last >= 0, sell[np.maximum(last, 0)], self.prices.get(t, 0.0))
+            else:
+                price = np.full(n, self.prices.get(t, 0.0))
+            exposure += held * price
+            self.holdings[t] = int(held[-1])
+            self.prices[t] = float(price[-1])
+        self.cash = float(cash[-1])
+        self.chunks.append((times, cash, exposure))
+
+    def to_frame(self) -> pd.DataFrame:
+        if self.chunks:
+            times, cash, exposure = (np.concatenate(c) for c in zip(*self.chunks))
+        else:
+            times, cash, exposure = np.empty(0, dtype=np.int64), np.empty(0), np.empty(0)
+        return pd.DataFrame(
+            {"cash": cash, "exposure": exposure, "equity": cash + exposure},
+            index=to_datetime_index(times, self.tz, "datetime"),
+        )
@@ -0,0 +1,158 @@
+from typing import Mapping, NamedTuple, Optional
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+from tiny_backtester.data_store import Bar, TickerData
+from tiny_backtester.utils.backtester_exception import BacktesterException
+from tiny_backtester.utils.backtester_types import OrderType
+from tiny_backtester.utils.math_utils import get_execution_price, get_execution_prices
+
+
+class Commission(NamedTuple):
+    """Fee of a fill, per_share * quantity plus rate * notional, at least minimum"""
+
+    per_share: float = 0.0
+    rate: float = 0.0
+    minimum: float = 0.0
+
+    def fee(self, quantity: int, price: float) -> float:
+        return max(self.minimum, self.per_share * quantity + self.rate * quantity * price)
+
+    def net_price(self, type: OrderType, quantity: int, price: np.float64) -> np.float64:
+        """Price per share with the fee paid on buys and deducted from sells
+
+        A fee above a sell's notional takes all of it, a sell never costs cash.
+        """
+        fee = self.fee(quantity, float(price))
+        if not fee:
+            return price
+        if type == "buy":
+            return np.float64((price * quantity + fee) / quantity)
+        return np.float64(max(price * quantity - fee, 0.0) / quantity)
+
+
+class TickerCosts(NamedTuple):
+    """Execution costs of bars start to start + len(bid) of a ticker's data"""
+
+    data: TickerData
+    start: int
+    bid: np.ndarray
+    ask: np.ndarray
+    impact: Optional[np.ndarray]  # fraction of the price moved per square root share
+    capacity: Optional[np.ndarray]  # most shares an order can fill on the bar
+    commission: Commission
+
+    def covers(self, start: int, stop: int) -> bool:
+        return self.start <= start and stop <= self.start + len(self.bid)
+
+    def cap(self, quantity: int, i: int, used: int = 0) -> int:
+        """Shares of an order the volume of bar i can fill, after the used shares filled on it"""
+        if self.capacity is None:
+            return quantity
+        return min(quantity, max(int(self.capacity[i - self.start]) - used, 0))
+
+    def fill(self, type: OrderType, quantity: int, i: int, used: int = 0) -> tuple[int, np.float64]:
+        """Shares filled of an order on bar i and their price before commission"""
+        j = i - self.start
+        quantity = self.cap(quantity, i, used)
+        if type == "buy":
+            price = self.ask[j]
+        elif type == "sell":
+            price = self.bid[j]
+        else:
+            return quantity, np.float64(np.nan)
+        if self.impact is not None and quantity > 0:
+            move = self.impact[j] * np.sqrt(quantity)
+            price = price * (1 + move) if type == "buy" else price * (1 - move)
+        return quantity, np.float64(price)
+
+
+def rolling_volatility(close: np.ndarray, window: int) -> np.ndarray:
+    """Standard deviation of the last window log returns of each bar, 0 until there are two"""
+    returns = np.diff(np.log(close.astype(np.float64)))
+    volatility = np.zeros(len(close), dtype=np.float64)
+    for n in range(2, min(window, len(returns) + 1)):
+        volatility[n] = returns[:n].std(ddof=1)
+    if len(returns) >= window:
+        volatility[window:] = sliding_window_view(returns, window).std(axis=1, ddof=1)
+    return volatility
+
+
+class ExecutionModel:
+    """Fill prices and quantities of market orders
+
+    Orders cross the spread, midpoint -/+ half the spread, moved by the slippage column when
+    slippage is set. impact adds square-root market impact, the price moves
+    impact * volatility * sqrt(quantity / volume) against the order, with the volatility of
+    the last volatility_window log returns. participation caps the orders filled on a bar at
+    that fraction of its volume between them, resting orders included, the rest of an order is
+    cancelled. Commissions are charged per ticker, falling back to commission, and fill prices
+    include them. Resting orders fill at their trigger price, or the open if the bar gapped
+    through it, so the spread, slippage and impact don't apply to them.
+    """
+
+    def __init__(
+        self,
+        slippage: bool = False,
+        impact: float = 0.0,
+        volatility_window: int = 20,
+        participation: Optional[float] = None,
+        commission: Commission = Commission(),
+        commissions: Optional[Mapping[str, Commission]] = None,
+    ):
+        if impact < 0:
+            raise BacktesterException("impact must not be negative")
+        if volatility_window < 2:
+            raise BacktesterException("volatility window must be at least 2 returns")
+        if participation is not None and not 0 < participation <= 1:
+            raise BacktesterException("participation must be greater than 0 and at most 1")
+        self.slippage = slippage
+        self.impact = impact
+        self.volatility_window = volatility_window
+        self.participation = participation
+        self.commission = commission
+        self.commissions = dict(commissions) if commissions else {}
+
+    @property
+    def quantity_dependent(self) -> bool:
+        """Whether fills depend on the order's quantity, beyond a price per share"""
+        commissions = (self.commission, *self.commissions.values())
+        return bool(self.impact) or self.participation is not None or any(map(any, commissions))
+
+    def commission_of(self, ticker: str) -> Commission:
+        return self.commissions.get(ticker, self.commission)
+
+    def price(self, type: OrderType, row: "pd.Series | Bar") -> np.float64:
+        """Price per share of a single share, used to mark positions"""
+        return get_execution_price(type, row, self.slippage)
+
+    def costs(
+        self, ticker: str, data: TickerData, start: int = 0, stop: Optional[int] = None
+    ) -> TickerCosts:
+        """Costs of every bar start to stop (default the last) of a ticker in one pass"""
+        stop = len(data) if stop is None else stop
+        columns = {c: a[start:stop] for c, a in data.columns.items()}
+        impact = capacity = None
+        if self.impact or self.participation is not None:
+            if "volume" not in data.columns:
+                raise BacktesterException(f"{ticker} has no volume to model execution against")
+            volume = columns["volume"].astype(np.float64)
+        if self.impact:
+            first = max(start - self.volatility_window, 0)
+            close = data.columns["close"][first:stop]
+            volatility = rolling_volatility(close, self.volatility_window)[start - first :]
+            # bars without volume have no impact, participation caps their fills at 0
+            depth = np.sqrt(np.where(volume > 0, volume, np.inf))
+            impact = self.impact * volatility / depth
+        if self.participation is not None:
+            capacity = np.floor(self.participation * volume).astype(np.int64)
+        return TickerCosts(
+            data,
+            start,
+            get_execution_prices("sell", columns, self.slippage),
+            get_execution_prices("buy", columns, self.slippage),
+            impact,
+            capacity,
+            self.commission_of(ticker),
+        )
@@ -0,0 +1,360 @@
+import math
+from abc import ABC, abstractmethod
+from array import array
+from collections import deque
+from typing import Any, Iterable, Mapping, Optional
+import numpy as np
+import pandas as pd
+
+from tiny_backtester.utils.backtester_types import MarketData
+from tiny_backtester.utils.math_utils import RollSpread
+
+nan = float("nan")
+
+
+class Indicator(ABC):
+    """Online indicator updated in O(1) per bar, with a vectorized batch path for precalc
+
+    update and batch agree numerically: after updating with the first i bars value equals
+    batch(...)[i - 1].
+    """
+
+    __slots__ = ("value",)
+    inputs: tuple[str, ...] = ("close",)
+
+    def __init__(self):
+        self.reset()
+
+    @abstractmethod
+    def reset(self):
+        """Clear all state"""
+
+    # subclasses take one argument per input column, so the signatures here accept any
+    @abstractmethod
+    def update(self, *values: Any, **kwargs: Any) -> float:
+        """Advance by one bar of the input columns, returns the new value"""
+
+    @abstractmethod
+    def batch(self, *columns: Any, **kwargs: Any) -> np.ndarray:
+        """Indicator value at every bar of the input columns"""
+
+    def push(self, bar: Any) -> float:
+        return self.update(*(float(bar[c]) for c in self.inputs))
+
+    def compute(self, df: pd.DataFrame) -> np.ndarray:
+        return self.batch(*(df[c].to_numpy(dtype=np.float64) for c in self.inputs))
+
+
+class RingBuffer:
+    """Fixed size float buffer, returns the value pushed out when full"""
+
+    __slots__ = ("data", "size", "pos", "count")
+
+    def __init__(self, size: int):
+        self.data = array("d", bytes(8 * size))
+        self.size = size
+        self.pos = 0
+        self.count = 0
+
+    def push(self, x: float) -> Optional[float]:
+        old = self.data[self.pos] if self.count == self.size else None
+        self.data[self.pos] = x
+        self.pos = (self.pos + 1) % self.size
+        self.count = min(self.count + 1, self.size)
+        return old
+
+    @property
+    def full(self) -> bool:
+        return self.count == self.size
+
+
+def rolling_sum(x: np.ndarray, window: int) -> np.ndarray:
+    out = np.full(len(x), np.nan)
+    if len(x) >= window:
+        c = np.cumsum(x)
+        out[window - 1 :] = c[window - 1 :] - np.concatenate(([0.0], c[:-window]))
+    return out
+
+
+class SMA(Indicator):
+    __slots__ = ("window", "buffer", "total")
+
+    def __init__(self, window: int):
+        self.window = window
+        super().__init__()
+
+    def reset(self):
+        self.buffer = RingBuffer(self.window)
+        self.total = 0.0
+        self.value = nan
+
+    def update(self, x: float) -> float:
+        old = self.buffer.push(x)
+        self.total += x - (old or 0.0)
+        self.value = self.total / self.window if self.buffer.full else nan
+        return self.value
+
+    def batch(self, x: np.ndarray) -> np.ndarray:
+        return rolling_sum(x, self.window) / self.window
+
+
+class EMA(Indicator):
+    """Exponential moving average, equal to ewm(span=window, adjust=False)"""
+
+    __slots__ = ("alpha",)
+
+    def __init__(self, window: Optional[int] = None, alpha: Optional[float] = None):
+        self.alpha = alpha if alpha is not None else 2 / (window + 1)  # type: ignore[operator]
+        super().__init__()
+
+    def reset(self):
+        self.value = nan
+
+    def update(self, x: float) -> float:
+        self.value = x if math.isnan(self.value) else self.value + self.alpha * (x - self.value)
+        return self.value
+
+    def batch(self, x: np.ndarray) -> np.ndarray:
+        return pd.Series(x).ewm(alpha=self.alpha, adjust=False).mean().to_numpy()
+
+
+class RollingStd(Indicator):
+    """Windowed standard deviation using Welford add/remove updates"""
+
+    __slots__ = ("window", "ddof", "buffer", "mean", "m2")
+
+    def __init__(self, window: int, ddof: int = 1):
+        self.window = window
+        self.ddof = ddof
+        super().__init__()
+
+    def reset(self):
+        self.buffer = RingBuffer(self.window)
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.value = nan
+
+    def update(self, x: float) -> float:
+        old = self.buffer.push(x)
+        if old is None:
+            d = x - self.mean
+            self.mean += d / self.buffer.count
+            self.m2 += d * (x - self.mean)
+        else:
+            d = x - old
+            old_mean = self.mean
+            self.mean += d / self.window
+            self.m2 += d * (x - self.mean + old - old_mean)
+        if self.buffer.full and self.window > self.ddof:
+            self.value = math.sqrt(max(self.m2, 0.0) / (self.window - self.ddof))
+        else:
+            self.value = nan
+        return self.value
+
+    def batch(self, x: np.ndarray) -> np.ndarray:
+        return pd.Series(x).rolling(self.window).std(ddof=self.ddof).to_numpy()
+
+
+class RollingMax(Indicator):
+    """Windowed maximum from a monotonic deque, amortised O(1)"""
+
+    __slots__ = ("window", "deque", "i")
+    sign = 1.0
+
+    def __init__(self, window: int):
+        self.window = window
+        super().__init__()
+
+    def reset(self):
+        self.deque: deque[tuple[int, float]] = deque()
+        self.i = 0
+        self.value = nan
+
+    def update(self, x: float) -> float:
+        key = self.sign * x
+        while self.deque and self.sign * self.deque[-1][1] <= key:
+            self.deque.pop()
+        self.deque.append((self.i, x))
+        if self.deque[0][0] <= self.i - self.window:
+            self.deque.popleft()
+        self.i += 1
+        self.value = self.deque[0][1] if self.i >= self.window else nan
+        return self.value
+
+    def batch(self, x: np.ndarray) -> np.ndarray:
+        return pd.Series(x).rolling(self.window).max().to_numpy()
+
+
+class RollingMin(RollingMax):
+    __slots__ = ()
+    sign = -1.0
+
+    def batch(self, x: np.ndarray) -> np.ndarray:
+        return pd.Series(x).rolling(self.window).min().to_numpy()
+
+
+class VWAP(Indicator):
+    """Volume weighted typical price, cumulative or over the last window bars"""
+
+    __slots__ = ("window", "pv", "v", "pv_buffer", "v_buffer")
+    inputs = ("high", "low", "close", "volume")
+
+    def __init__(self, window: Optional[int] = None):
+        self.window = window
+        super().__init__()
+
+    def reset(self):
+        self.pv = 0.0
+        self.v = 0.0
+        self.pv_buffer = RingBuffer(self.window) if self.window else None
+        self.v_buffer = RingBuffer(self.window) if self.window else None
+        self.value = nan
+
+    def update(self, high: float, low: float, close: float, volume: float) -> float:
+        pv = (high + low + close) / 3 * volume
+        self.pv += pv
+        self.v += volume
+        if self.pv_buffer is not None and self.v_buffer is not None:
+            self.pv -= self.pv_buffer.push(pv) or 0.0
+            self.v -= self.v_buffer.push(volume) or 0.0
+            if not self.v_buffer.full:
+                self.value = nan
+                return self.value
+        self.value = self.pv / self.v if self.v else nan
+        return self.value
+
+    def batch(
+        self, high: np.ndarray, low: np.ndarray, close: np.ndarray, volume: np.ndarray
+    ) -> np.ndarray:
+        pv = (high + low + close) / 3 * volume
+        if self.window:
+            pv_sum, v_sum = rolling_sum(pv, self.window), rolling_sum(volume, self.window)
+        else:
+            pv_sum, v_sum = np.cumsum(pv), np.cumsum(volume)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(v_sum != 0, pv_sum / v_sum, np.nan)
+
+
+class ATR(Indicator):
+    """Average true range with Wilder smoothing"""
+
+    __slots__ = ("ema", "prev_close")
+    inputs = ("high", "low", "close")
+
+    def __init__(self, window: int):
+        self.ema = EMA(alpha=1 / window)
+        super().__init__()
+
+    def reset(self):
+        self.ema.reset()
+        self.prev_close = nan
+        self.value = nan
+
+    def update(self, high: float, low: float, close: float) -> float:
+        tr = high - low
+        if not math.isnan(self.prev_close):
+            tr = max(tr, abs(high - self.prev_close), abs(low - self.prev_close))
+        self.prev_close = close
+        self.value = self.ema.update(tr)
+        return self.value
+
+    def batch(self, high: np.ndarray, low: np.ndarray, close: np.ndarray) -> np.ndarray:
+        prev_close = np.concatenate(([np.nan], close[:-1]))
+        tr = np.fmax(high - low, np.fmax(np.abs(high - prev_close), np.abs(low - prev_close)))
+        return self.ema.batch(tr)
+
+
+class RSI(Indicator):
+    """Relative strength index with Wilder smoothing"""
+
+    __slots__ = ("gain", "loss", "prev_close")
+
+    def __init__(self, window: int = 14):
+        self.gain = EMA(alpha=1 / window)
+        self.loss = EMA(alpha=1 / window)
+        super().__init__()
+
+    def reset(self):
+        self.gain.reset()
+        self.loss.reset()
+        self.prev_close = nan
+        self.value = nan
+
+    def update(self, close: float) -> float:
+        if not math.isnan(self.prev_close):
+            delta = close - self.prev_close
+            gain, loss = self.gain.update(max(delta, 0.0)), self.loss.update(max(-delta, 0.0))
+            if loss:
+                self.value = 100 - 100 / (1 + gain / loss)
+            else:
+                self.value = 100.0 if gain else nan
+        self.prev_close = close
+        return self.value
+
+    def batch(self, close: np.ndarray) -> np.ndarray:
+        delta = np.diff(close, prepend=np.nan)
+        gain = self.gain.batch(np.where(delta > 0, delta, np.where(np.isnan(delta), np.nan, 0.0)))
+        loss = self.loss.batch(np.where(delta < 0, -delta, np.where(np.isnan(delta), np.nan, 0.0)))
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return 100 - 100 / (1 + gain / loss)
+
+
+class Spread(Indicator):
+    """Expanding Roll spread (see calculate_spread), equal to it once every close is seen"""
+
+    __slots__ = ("roll",)
+
+    def reset(self):
+        self.roll = RollSpread()
+        self.value = nan
+
+    def update(self, close: float) -> float:
+        roll = self.roll.push(close)
+        if roll.n > 1:
+            self.value = float(roll.value)
+        return self.value
+
+    def batch(self, close: np.ndarray) -> np.ndarray:
+        out = np.full(len(close), np.nan)
+        delta = np.diff(close)
+        x, y = delta[:-1], delta[1:]
+        if len(x) < 2:
+            return out
+        # expanding covariance of the pairs, shifted around their mean for stability
+        x, y = x - x[0], y - y[0]
+        m = np.arange(1, len(x) + 1)
+        sx, sy, sxy = np.cumsum(x), np.cumsum(y), np.cumsum(x * y)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            cov = (sxy - sx * sy / m) / (m - 1)
+        spread = np.where(cov < 0, 2 * np.sqrt(np.abs(cov)), 0.0)
+        out[3:] = spread[1:]
+        return out
+
+
+Indicators = Mapping[str, Mapping[str, Indicator]]
+
+
+def add_indicators(data: MarketData, indicators: Indicators):
+    """Batch path for precalc, adds a column per indicator name to each ticker's frame"""
+    for t, named in indicators.items():
+        df = data[t]
+        for name, indicator in named.items():
+            df[name] = indicator.compute(df)
+
+
+def reset_indicators(indicators: Indicators):
+    for named in indicators.values():
+        for indicator in named.values():
+            indicator.reset()
+
+
+def push_indicators(
+    indicators: Indicators, data: Mapping[str, Any], tickers: Optional[Iterable[str]] = None
+):
+    """Online path, advances the indicators of tickers (default all) with their latest bar"""
+    for t in indicators if tickers is None else tickers:
+        if t not in indicators:
+            continue
+        bar = data[t].bar()
+        for indicator in indicators[t].values():
+            indicator.push(bar)
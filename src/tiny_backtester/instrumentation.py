@@ -0,0 +1,75 @@
+import logging
+from abc import ABC, abstractmethod
+from collections import defaultdict
+from time import perf_counter
+from typing import Any, Callable, Iterable, TypeVar
+
+from tiny_backtester.utils.backtester_types import RunStats
+
+logger = logging.getLogger("tiny_backtester")
+
+T = TypeVar("T")
+
+
+class InstrumentationHook(ABC):
+    """Receives the stats of every instrumented run"""
+
+    @abstractmethod
+    def export(self, stats: RunStats) -> None:
+        """Called once at the end of each run"""
+
+
+class LoggingHook(InstrumentationHook):
+    def __init__(self, level: int = logging.INFO):
+        self.level = level
+
+    def export(self, stats: RunStats) -> None:
+        timers = ", ".join(f"{name} {seconds:.4f}s" for name, seconds in stats["timers"].items())
+        counters = ", ".join(f"{name} {n}" for name, n in stats["counters"].items())
+        logger.log(self.level, f"run timers: {timers}")
+        logger.log(self.level, f"run counters: {counters}")
+
+
+class Instrumentation:
+    """Per-phase timers and counters for engine runs
+
+    Timers: precalc, data_view, strategy_run, execute_orders, get_position (plus signals and
+    fill_orders for run_signals). Counters: epochs, orders_submitted and orders_<status>.
+    """
+
+    __slots__ = ("timers", "calls", "counters", "hooks")
+
+    def __init__(self, hooks: Iterable[InstrumentationHook] = ()):
+        self.hooks = list(hooks)
+        self.reset()
+
+    def reset(self):
+        self.timers: defaultdict[str, float] = defaultdict(float)
+        self.calls: defaultdict[str, int] = defaultdict(int)
+        self.counters: defaultdict[str, int] = defaultdict(int)
+
+    def add(self, timer: str, seconds: float):
+        self.timers[timer] += seconds
+        self.calls[timer] += 1
+
+    def count(self, counter: str, n: int = 1):
+        self.counters[counter] += n
+
+    def timed(self, timer: str, fn: Callable[..., T], *args: Any) -> T:
+        start = perf_counter()
+        result = fn(*args)
+        self.add(timer, perf_counter() - start)
+        return result
+
+    def stats(self) -> RunStats:
+        return {
+            "timers": dict(self.timers),
+            "calls": dict(self.calls),
+            "counters": dict(self.counters),
+        }
+
+    def export(self) -> RunStats:
+        stats = self.stats()
+        for hook in self.hooks:
+            hook.export(stats)
+        return stats
@@ -0,0 +1,162 @@
+from typing import Any, Iterable, Optional
+import numpy as np
+import pandas as pd
+
+from tiny_backtester.data_store import to_datetime_index
+from tiny_backtester.equity import Trades
+from tiny_backtester.utils.backtester_types import ExecutedOrder, Position
+
+
+class Ledger:
+    """Growable structured array, appended to row by row and doubled in size when full"""
+
+    __slots__ = ("data", "size")
+
+    def __init__(self, dtype: np.dtype, capacity: int = 1024):
+        self.data = np.empty(max(capacity, 1), dtype=dtype)
+        self.size = 0
+
+    def __len__(self) -> int:
+        return self.size
+
+    def append_row(self, row: tuple):
+        if self.size == len(self.data):
+            grown = np.empty(2 * len(self.data), dtype=self.data.dtype)
+            grown[: self.size] = self.data
+            self.data = grown
+        self.data[self.size] = row
+        self.size += 1
+
+    @property
+    def rows(self) -> np.ndarray:
+        return self.data[: self.size]
+
+
+class Categories(dict[Any, int]):
+    """Category codes in order of first appearance"""
+
+    def code(self, value: Any) -> int:
+        code = self.get(value)
+        if code is None:
+            code = self[value] = len(self)
+        return code
+
+    def decode(self, codes: np.ndarray) -> np.ndarray:
+        return np.array(list(self), dtype=object)[codes]
+
+
+ORDER_DTYPE = np.dtype(
+    [
+        ("time", np.int64),
+        ("ticker", np.int32),
+        ("type", np.int8),
+        ("quantity", np.int64),
+        ("price", np.float64),
+        ("status", np.int8),
+    ]
+)
+
+POSITION_DTYPE = np.dtype(
+    [
+        ("time", np.int64),
+        ("quantity", np.int64),
+        ("entry_price", np.float64),
+        ("fill_price", np.float64),
+        ("unrealised_pnl", np.float64),
+        ("realised_pnl", np.float64),
+    ]
+)
+POSITION_COLUMNS = Position._fields[1:]  # the POSITION_DTYPE fields after time
+
+
+class OrderLog(Ledger):
+    """Executed orders as int64 nanosecond times, category codes and float64 prices"""
+
+    __slots__ = ("tickers", "types", "statuses", "tz")
+
+    def __init__(self, capacity: int = 1024):
+        super().__init__(ORDER_DTYPE, capacity)
+        self.tickers = Categories()
+        self.types = Categories()
+        self.statuses = Categories()
+        self.tz: Any = None
+
+    def append(self, order: ExecutedOrder):
+        if not self.size:
+            self.tz = order.time.tz
+        self.append_row(
+            (
+                order.time.value,
+                self.tickers.code(order.ticker),
+                self.types.code(order.type),
+                order.quantity,
+                order.price,
+                self.statuses.code(order.status),
+            )
+        )
+
+    def extend(self, orders: Iterable[ExecutedOrder]):
+        for order in orders:
+            self.append(order)
+
+    def trades(self, start: int = 0) -> Trades:
+        """Filled orders from row start on"""
+        rows = self.rows[start:]
+        rows = rows[rows["status"] == self.statuses.get("filled", -1)]
+        sign = np.where(rows["type"] == self.types.get("buy", -1), 1, -1)
+        return Trades(
+            rows["time"],
+            self.tickers.decode(rows["ticker"]),
+            sign * rows["quantity"],
+            rows["price"],
+        )
+
+    def to_frame(self) -> pd.DataFrame:
+        """Equal to pd.DataFrame(data=[ExecutedOrder, ...])"""
+        if not self.size:
+            return pd.DataFrame()
+        rows = self.rows
+        return pd.DataFrame(
+            {
+                "time": to_datetime_index(rows["time"], self.tz),
+                "ticker": self.tickers.decode(rows["ticker"]),
+                "type": self.types.decode(rows["type"]),
+                "quantity": rows["quantity"],
+                "price": rows["price"],
+                "status": self.statuses.decode(rows["status"]),
+            }
+        )
+
+
+class PositionLog(Ledger):
+    """Position history of a ticker, starting from an initial position"""
+
+    __slots__ = ("first", "last", "tz")
+
+    def __init__(self, first: Optional[Position] = None, capacity: int = 64):
+        super().__init__(POSITION_DTYPE, capacity)
+        self.first = first if first is not None else Position()
+        self.last = self.first
+        self.tz: Any = None
+        self.append_row(self.row(self.first))
+
+    @staticmethod
+    def row(position: Position) -> tuple:
+        return (position.time.value, *position[1:])
+
+    def append(self, position: Position):
+        if self.size == 1:
+            self.tz = position.time.tz
+        self.append_row(self.row(position))
+        self.last = position
+
+    def to_frame(self) -> pd.DataFrame:
+        """Equal to pd.DataFrame(data=[first, Position, ...])"""
+        rows = self.rows
+        times = to_datetime_index(rows["time"][1:], self.tz).insert(0, self.first.time)
+        return pd.DataFrame(
+            {
+                "time": times,
+                **{name: rows[name] for name in POSITION_COLUMNS},
+            }
+        )
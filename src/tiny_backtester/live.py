@@ -0,0 +1,301 @@
+import asyncio
+import logging
+import os
+from abc import ABC, abstractmethod
+from typing import Any, AsyncIterator, Iterator, Mapping, NamedTuple, Optional
+import numpy as np
+import pandas as pd
+
+from tiny_backtester.data_store import (
+    AsOfFrameView,
+    AsOfView,
+    MarketStore,
+    TickerData,
+    window_start,
+)
+from tiny_backtester.engine import Engine
+from tiny_backtester.equity import EquityCurve
+from tiny_backtester.ledger import Ledger, OrderLog, PositionLog
+from tiny_backtester.indicators import push_indicators, reset_indicators
+from tiny_backtester.strategy import Strategy
+from tiny_backtester.streaming import read_chunks
+from tiny_backtester.timeline import build_timeline
+from tiny_backtester.utils.backtester_types import ExecutedOrder, MarketData, Order, RunResults
+from tiny_backtester.utils.math_utils import RollSpread, k
+
+logger = logging.getLogger("tiny_backtester")
+
+
+class LiveBars(NamedTuple):
+    """New bars of every ticker updated at a time, raw or already processed"""
+
+    time: pd.Timestamp
+    bars: dict[str, dict[str, Any]]
+
+
+class BarSource(ABC):
+    """Async stream of LiveBars in time order"""
+
+    @abstractmethod
+    def __aiter__(self) -> AsyncIterator[LiveBars]:
+        """Yields bars as they arrive"""
+
+
+class ReplaySource(BarSource):
+    """Replays frames on their merged timeline, sleeping delay seconds between times"""
+
+    def __init__(self, market_data: MarketData, delay: float = 0.0):
+        self.market_data = market_data
+        self.delay = delay
+
+    @classmethod
+    def from_files(
+        cls, paths: Mapping[str, str | os.PathLike], delay: float = 0.0
+    ) -> "ReplaySource":
+        """Replays the raw bars of csv or parquet files, one per ticker"""
+        return cls({t: pd.concat(read_chunks(path)) for t, path in paths.items()}, delay)
+
+    def events(self) -> Iterator[LiveBars]:
+        tickers = list(self.market_data)
+        stores = [TickerData.from_frame(self.market_data[t]) for t in tickers]
+        timeline = build_timeline([s.index for s in stores])
+        for e, time in enumerate(timeline.times):
+            bars = {}
+            for j in range(timeline.starts[e], timeline.starts[e + 1]):
+                data, i = stores[timeline.codes[j]], timeline.positions[j]
+                bars[tickers[timeline.codes[j]]] = {c: a[i] for c, a in data.columns.items()}
+            yield LiveBars(pd.Timestamp(int(time), tz=stores[0].tz), bars)
+
+    async def __aiter__(self) -> AsyncIterator[LiveBars]:
+        for bars in self.events():
+            yield bars
+            await asyncio.sleep(self.delay)
+
+
+class QueueSource(BarSource):
+    """Bars put on a queue by a producer, such as a socket reader, until close"""
+
+    def __init__(self, maxsize: int = 0):
+        self.queue: asyncio.Queue[Optional[LiveBars]] = asyncio.Queue(maxsize)
+
+    async def put(self, bars: LiveBars):
+        await self.queue.put(bars)
+
+    async def close(self):
+        await self.queue.put(None)
+
+    async def __aiter__(self) -> AsyncIterator[LiveBars]:
+        while (bars := await self.queue.get()) is not None:
+            yield bars
+
+
+class Broker(ABC):
+    """Async execution venue, fills it returns have been settled on the strategy"""
+
+    async def on_bars(
+        self, strat: Strategy, data: AsOfView, updated: list[str]
+    ) -> list[ExecutedOrder]:
+        """Orders resting at the broker that filled or expired on the new bars"""
+        return []
+
+    @abstractmethod
+    async def submit(
+        self, strat: Strategy, orders: list[Order], data: AsOfView
+    ) -> list[ExecutedOrder]:
+        """Executes the strategy's orders of the latest bars"""
+
+
+class PaperBroker(Broker):
+    """Simulated fills at the engine's execution prices, resting orders in its order book"""
+
+    def __init__(self, engine: Engine):
+        self.engine = engine
+
+    async def on_bars(
+        self, strat: Strategy, data: AsOfView, updated: list[str]
+    ) -> list[ExecutedOrder]:
+        self.engine.book.epoch += 1
+        if not self.engine.book:
+            return []
+        return self.engine.match_orders(strat, data, updated)
+
+    async def submit(
+        self, strat: Strategy, orders: list[Order], data: AsOfView
+    ) -> list[ExecutedOrder]:
+        return self.engine.execute_orders(strat, orders, data)
+
+
+class LiveTicker(Ledger):
+    """Appendable bars of a ticker, exposed as a TickerData over the bars so far
+
+    The TickerData is advanced in place, so it stays the same object from bar to bar.
+    """
+
+    __slots__ = ("ticker_data",)
+
+    def __init__(self, values: Mapping[str, Any], tz: Any, capacity: int = 1024):
+        fields = [(c, np.asarray(v).dtype) for c, v in values.items()]
+        super().__init__(np.dtype([("time", np.int64), *fields]), capacity)
+        self.ticker_data = TickerData(np.empty(0, np.int64), {}, tz, "datetime")
+
+    def append(self, time: int, values: Mapping[str, Any]) -> TickerData:
+        names = self.data.dtype.names[1:]
+        self.append_row((time, *(values[c] for c in names)))
+        rows = self.rows
+        columns = {}
+        for c in names:
+            columns[c] = rows[c]
+            columns[c].flags.writeable = False
+        self.ticker_data.index = rows["time"]
+        self.ticker_data.columns = columns
+        return self.ticker_data
+
+
+class LiveHistory(Mapping[str, pd.DataFrame]):
+    """Frames of every bar so far of the tickers of a live store, kept until their next bar
+
+    The columns are zero-copy views of the store, only the index is rebuilt after a new bar.
+    """
+
+    __slots__ = ("_store", "_frames")
+
+    def __init__(self, store: MarketStore):
+        self._store = store
+        self._frames: MarketData = {}
+
+    def __getitem__(self, ticker: str) -> pd.DataFrame:
+        data = self._store[ticker]
+        frame = self._frames.get(ticker)
+        if frame is None or len(frame) != len(data):
+            frame = pd.DataFrame(data.columns, index=data.datetime_index(), copy=False)
+            self._frames[ticker] = frame
+        return frame
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._store)
+
+    def __len__(self) -> int:
+        return len(self._store)
+
+
+class LiveFrames(AsOfFrameView):
+    """DataFrames of the last lookback bars (None for all) of every started ticker
+
+    Windows are built from the store on first use, whole histories come from LiveHistory.
+    """
+
+    __slots__ = ()
+
+    def __getitem__(self, ticker: str) -> pd.DataFrame:
+        if ticker not in self._cache:
+            end = self.end_of(ticker)
+            if self._lookback is None:
+                self._cache[ticker] = self._frames[ticker]
+            else:
+                data = self._view.store[ticker]
+                self._cache[ticker] = data.to_frame(end, window_start(end, self._lookback))
+        return self._cache[ticker]
+
+
+def process_bar(values: Mapping[str, Any], spread: RollSpread) -> dict[str, Any]:
+    """Incremental process_df of a single bar, with the Roll spread of the closes so far"""
+    values = {c.lower(): v for c, v in values.items()}
+    if "midpoint" not in values:
+        values["midpoint"] = (values["high"] + values["low"]) / 2
+    if "slippage" not in values:
+        values["slippage"] = k / values["volume"]
+    if "spread" not in values:
+        values["spread"] = spread.update(np.array([values["close"]])).value
+    return values
+
+
+class LiveTrader:
+    """Runs a strategy on a bar source, one event per time as Engine.run_events does
+
+    Bars are appended to a columnar store and the strategy gets an AsOfView of it, DataFrame
+    strategies get frames of their last lookback bars, so the work per bar doesn't grow with
+    the history. precalc needs the whole history and isn't called, use indicators instead.
+    Orders go to the broker, by default a PaperBroker simulating fills like a backtest.
+    """
+
+    def __init__(
+        self,
+        strat: Strategy,
+        source: BarSource,
+        broker: Optional[Broker] = None,
+        engine: Optional[Engine] = None,
+    ):
+        self.engine = engine if engine is not None else Engine()
+        self.engine.validate(strat, live=True)
+        self.strat = strat
+        self.source = source
+        self.broker = broker if broker is not None else PaperBroker(self.engine)
+        self.tickers = sorted(strat.tickers)
+        self.codes = {t: c for c, t in enumerate(self.tickers)}
+        self.ends = [0] * len(self.tickers)
+        self.store = MarketStore()
+        self.live: dict[str, LiveTicker] = {}
+        self.history = LiveHistory(self.store)
+        self.spreads = {t: RollSpread() for t in self.tickers}
+        self.order_log = OrderLog()
+        self.pos_info = {t: PositionLog() for t in strat.tickers}
+        self.equity = EquityCurve(
+            strat.funds, {t: strat.portfolio.get(t, 0) for t in strat.tickers}
+        )
+
+    def push(self, bars: LiveBars) -> list[str]:
+        """Appends the new bars of the strategy's tickers, returns the updated tickers"""
+        updated = []
+        for t, values in bars.bars.items():
+            if t not in self.codes:
+                continue
+            values = process_bar(values, self.spreads[t])
+            if t not in self.live:
+                self.live[t] = LiveTicker(values, bars.time.tz)
+            self.store[t] = self.live[t].append(bars.time.value, values)
+            self.ends[self.codes[t]] += 1
+            updated.append(t)
+        return sorted(updated, key=self.codes.__getitem__)
+
+    async def on_bars(self, bars: LiveBars):
+        updated = self.push(bars)
+        if not updated:
+            return
+        strat, engine = self.strat, self.engine
+        cur_data = AsOfView(self.store, self.codes, self.ends, bars.time, updated)
+        strat_data: AsOfView | LiveFrames
+        if strat.columnar:
+            strat_data = cur_data if strat.lookback is None else cur_data.window(strat.lookback)
+        else:
+            strat_data = LiveFrames(self.history, cur_data, strat.lookback)
+        # fills and marks on the new bars share their costs through the engine's cache
+        costs = {
+            t: engine.price_bar(t, self.store[t], self.ends[self.codes[t]] - 1) for t in updated
+        }
+        if strat.indicators:
+            push_indicators(strat.indicators, cur_data, updated)
+        matched = await self.broker.on_bars(strat, cur_data, updated)
+        orders = engine.strategy_run(strat, strat_data)
+        executed = await self.broker.submit(strat, orders, cur_data)
+        logged = len(self.order_log)
+        engine.record(matched + executed, cur_data, self.order_log, self.pos_info)
+
+        marks = {t: (self.store[t].index[-1:], costs[t].bid) for t in updated}
+        times = np.array([bars.time.value])
+        self.equity.update(times, marks, self.order_log.trades(logged), bars.time.tz)
+
+    async def run(self, n_events: Optional[int] = None) -> RunResults:
+        """Trades until the source ends or after n_events times, returns the results so far"""
+        self.engine.reset()
+        reset_indicators(self.strat.indicators or {})
+        events = 0
+        async for bars in self.source:
+            await self.on_bars(bars)
+            events += 1
+            if n_events and events >= n_events:
+                break
+        logger.debug(f"live run of {events} events ended")
+        return self.results()
+
+    def results(self) -> RunResults:
+        return self.engine.make_results(self.order_log, self.pos_info, self.equity)
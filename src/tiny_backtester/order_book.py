@@ -0,0 +1,123 @@
+import heapq
+from typing import Iterable, Iterator, NamedTuple, Optional
+
+from tiny_backtester.utils.backtester_types import Order
+
+# (order type, trigger) -> heap sign and the bar column that triggers it, an order with trigger
+# price p triggers on a bar when sign * p <= sign * bar[column]
+TRIGGERS = {
+    ("buy", "limit"): (-1.0, "low"),
+    ("sell", "limit"): (1.0, "high"),
+    ("buy", "stop"): (1.0, "high"),
+    ("sell", "stop"): (-1.0, "low"),
+}
+
+
+class RestingOrder(NamedTuple):
+    seq: int
+    order: Order
+    expiry: Optional[int]  # last epoch the order is matched on, None until cancelled
+    triggered: bool = False  # stop limit orders turn into limit orders once their stop triggers
+
+    @property
+    def trigger(self) -> str:
+        return "stop" if self.order.stop_price is not None and not self.triggered else "limit"
+
+    @property
+    def price(self) -> float:
+        price = self.order.stop_price if self.trigger == "stop" else self.order.limit_price
+        return float(price)  # type: ignore[arg-type]
+
+    def fill_price(self, open: float) -> Optional[float]:
+        """Trigger price, or the open if the bar gapped through it, None if a triggered stop
+        limit order's limit isn't met"""
+        buy = self.order.type == "buy"
+        price = (max if buy == (self.trigger == "stop") else min)(self.price, open)
+        limit = self.order.limit_price
+        if (
+            self.trigger == "stop"
+            and limit is not None
+            and (price > limit if buy else price < limit)
+        ):
+            return None
+        return price
+
+
+class OrderBook:
+    """Resting limit and stop orders, matched in bulk against each new bar's high and low
+
+    Every ticker has a heap per order type and trigger keyed by trigger price, so matching a bar
+    only pops the orders it triggers and costs O(k log n) for k triggered of n resting orders.
+    Filled, cancelled and expired orders are dropped from the heaps lazily.
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.epoch = 0
+        self.seq = 0
+        self.live: dict[int, RestingOrder] = {}
+        self.heaps: dict[str, dict[tuple[str, str], list[tuple[float, int]]]] = {}
+        self.expiries: list[tuple[int, int]] = []
+        # ticker -> time of the bar of its last fill and the shares filled on it
+        self.filled: dict[str, tuple[int, int]] = {}
+
+    def __len__(self) -> int:
+        return len(self.live)
+
+    def tickers(self, updated: Optional[Iterable[str]] = None) -> list[str]:
+        """Tickers with resting orders, out of updated if given"""
+        return list(self.heaps) if updated is None else [t for t in updated if t in self.heaps]
+
+    def used(self, ticker: str, time: int) -> int:
+        """Shares of the ticker already filled on its bar at time, for the participation cap"""
+        bar, shares = self.filled.get(ticker, (time, 0))
+        return shares if bar == time else 0
+
+    def record_fill(self, ticker: str, time: int, quantity: int):
+        self.filled[ticker] = (time, self.used(ticker, time) + quantity)
+
+    def add(self, order: Order) -> RestingOrder:
+        expiry = None if order.good_for is None else self.epoch + order.good_for
+        resting = RestingOrder(self.seq, order, expiry)
+        self.seq += 1
+        self.push(resting)
+        if expiry is not None:
+            heapq.heappush(self.expiries, (expiry, resting.seq))
+        return resting
+
+    def push(self, resting: RestingOrder):
+        self.live[resting.seq] = resting
+        key = (resting.order.type, resting.trigger)
+        heap = self.heaps.setdefault(resting.order.ticker, {}).setdefault(key, [])
+        heapq.heappush(heap, (TRIGGERS[key][0] * resting.price, resting.seq))
+
+    def cancel(self, ticker: str) -> list[RestingOrder]:
+        heaps = self.heaps.pop(ticker, {})
+        seqs = sorted({seq for heap in heaps.values() for _, seq in heap})
+        return [self.live.pop(seq) for seq in seqs if seq in self.live]
+
+    def match(self, ticker: str, high: float, low: float) -> list[RestingOrder]:
+        """Removes and returns the ticker's orders triggered by a bar, in order of submission"""
+        bar = {"high": high, "low": low}
+        triggered = []
+        for key, heap in self.heaps.get(ticker, {}).items():
+            sign, column = TRIGGERS[key]
+            bound = sign * bar[column]
+            while heap and heap[0][0] <= bound:
+                _, seq = heapq.heappop(heap)
+                resting = self.live.pop(seq, None)
+                if resting is not None:
+                    triggered.append(resting)
+        if ticker in self.heaps and not any(self.heaps[ticker].values()):
+            del self.heaps[ticker]
+        return sorted(triggered)
+
+    def expire(self) -> Iterator[RestingOrder]:
+        """Removes and yields the orders whose last epoch has been matched"""
+        while self.expiries and self.expiries[0][0] <= self.epoch:
+            _, seq = heapq.heappop(self.expiries)
+            resting = self.live.pop(seq, None)
+            if resting is not None:
+                yield resting
@@ -0,0 +1,200 @@
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Any, Iterator, Optional
+import numpy as np
+import pandas as pd
+
+from tiny_backtester.cache import get_version
+from tiny_backtester.data_store import to_datetime_index
+from tiny_backtester.utils.backtester_exception import BacktesterException
+from tiny_backtester.utils.backtester_types import RunResults, RunStats
+from tiny_backtester.utils.storage import MANIFEST, write_entry
+
+logger = logging.getLogger("tiny_backtester")
+
+COLUMNS = "columns.npz"
+ORDER_CATEGORIES = ("ticker", "type", "status")
+POSITION_COLUMNS = ("quantity", "entry_price", "fill_price", "unrealised_pnl", "realised_pnl")
+EQUITY_COLUMNS = ("cash", "exposure", "equity")
+
+
+def tz_name(tz: Any) -> Optional[str]:
+    return str(tz) if tz is not None else None
+
+
+def encode(values: np.ndarray) -> tuple[np.ndarray, list[str]]:
+    """Dictionary encoding as the smallest integer codes into sorted categories"""
+    categories, codes = np.unique(values.astype(str), return_inverse=True)
+    return codes.astype(np.min_scalar_type(max(len(categories) - 1, 0))), categories.tolist()
+
+
+def to_columns(results: RunResults) -> tuple[dict[str, np.ndarray], dict[str, Any]]:
+    """Flat name -> array columns of a run and the manifest needed to rebuild its frames"""
+    columns: dict[str, np.ndarray] = {}
+    manifest: dict[str, Any] = {"version": get_version(), "categories": {}, "positions": {}}
+
+    orders = results["orders"]
+    manifest["orders"] = len(orders) > 0
+    if len(orders):
+        times = pd.DatetimeIndex(orders["time"]).as_unit("ns")
+        manifest["orders_tz"] = tz_name(times.tz)
+        columns["orders.time"] = times.to_numpy("i8")
+        for c in ORDER_CATEGORIES:
+            columns[f"orders.{c}"], manifest["categories"][c] = encode(orders[c].to_numpy())
+        columns["orders.quantity"] = orders["quantity"].to_numpy(np.int64)
+        columns["orders.price"] = orders["price"].to_numpy(np.float64)
+
+    # positions of every ticker one after the other, the first row of each is the start position
+    start = 0
+    position_times: list[np.ndarray] = []
+    positions: list[pd.DataFrame] = []
+    for t, p in results["positions"].items():
+        first = p["time"].iloc[0]
+        rest = pd.DatetimeIndex(p["time"].iloc[1:]).as_unit("ns")
+        manifest["positions"][t] = {
+            "start": start,
+            "stop": start + len(p),
+            "first": first.value,
+            "first_tz": tz_name(first.tz),
+            "tz": tz_name(rest.tz),
+        }
+        position_times.append(np.concatenate(([first.value], rest.to_numpy("i8"))))
+        positions.append(p)
+        start += len(p)
+    if positions:
+        columns["positions.time"] = np.concatenate(position_times)
+        for c in POSITION_COLUMNS:
+            columns[f"positions.{c}"] = np.concatenate([p[c].to_numpy() for p in positions])
+
+    if "equity" in results:
+        equity = results["equity"]
+        index = pd.DatetimeIndex(equity.index).as_unit("ns")
+        index_name = None if index.name is None else str(index.name)
+        manifest["equity"] = {"tz": tz_name(index.tz), "index_name": index_name}
+        columns["equity.time"] = index.to_numpy("i8")
+        for c in EQUITY_COLUMNS:
+            columns[f"equity.{c}"] = equity[c].to_numpy(np.float64)
+    manifest["instrumentation"] = results.get("instrumentation")
+    return columns, manifest
+
+
+class StoredResults:
+    """Lazily loaded run results, columns are only read from disk when accessed"""
+
+    def __init__(self, path: Path):
+        self.path = path
+        with open(path / MANIFEST) as f:
+            self.manifest: dict[str, Any] = json.load(f)
+        self._npz: Optional[Any] = None
+
+    def column(self, name: str) -> np.ndarray:
+        """Raw stored column such as "orders.price", memory mapped unless compressed"""
+        if self.manifest["compressed"]:
+            if self._npz is None:
+                self._npz = np.load(self.path / COLUMNS)
+            return self._npz[name]
+        return np.load(self.path / f"{name}.npy", mmap_mode="r").view(np.ndarray)
+
+    @property
+    def tickers(self) -> list[str]:
+        return list(self.manifest["positions"])
+
+    @property
+    def instrumentation(self) -> Optional[RunStats]:
+        return self.manifest["instrumentation"]
+
+    def decode(self, name: str) -> np.ndarray:
+        """Dictionary encoded order column as objects"""
+        categories = np.array(self.manifest["categories"][name], dtype=object)
+        return categories[self.column(f"orders.{name}")]
+
+    @property
+    def orders(self) -> pd.DataFrame:
+        if not self.manifest["orders"]:
+            return pd.DataFrame()
+        return pd.DataFrame(
+            {
+                "time": to_datetime_index(self.column("orders.time"), self.manifest["orders_tz"]),
+                "ticker": self.decode("ticker"),
+                "type": self.decode("type"),
+                "quantity": self.column("orders.quantity"),
+                "price": self.column("orders.price"),
+                "status": self.decode("status"),
+            }
+        )
+
+    def position(self, ticker: str) -> pd.DataFrame:
+        info = self.manifest["positions"][ticker]
+        rows = slice(info["start"], info["stop"])
+        times = to_datetime_index(self.column("positions.time")[rows][1:], info["tz"])
+        first = pd.Timestamp(info["first"], tz=info["first_tz"])
+        return pd.DataFrame(
+            {
+                "time": times.insert(0, first),
+                **{c: self.column(f"positions.{c}")[rows] for c in POSITION_COLUMNS},
+            }
+        )
+
+    @property
+    def positions(self) -> dict[str, pd.DataFrame]:
+        return {t: self.position(t) for t in self.tickers}
+
+    @property
+    def equity(self) -> pd.DataFrame:
+        info = self.manifest.get("equity")
+        if info is None:
+            raise BacktesterException(f"no equity curve stored in {self.path}")
+        index = to_datetime_index(self.column("equity.time"), info["tz"], info["index_name"])
+        return pd.DataFrame({c: self.column(f"equity.{c}") for c in EQUITY_COLUMNS}, index=index)
+
+    def to_results(self) -> RunResults:
+        results: RunResults = {"orders": self.orders, "positions": self.positions}
+        if "equity" in self.manifest:
+            results["equity"] = self.equity
+        if self.instrumentation is not None:
+            results["instrumentation"] = self.instrumentation
+        return results
+
+
+class ResultsStore:
+    """Directory of run results stored as columns, one entry per run
+
+    Tickers, order types and statuses are dictionary encoded. Columns are .npy files memory
+    mapped on load, or a single compressed .npz read column by column when compress is set.
+    """
+
+    def __init__(self, directory: str | os.PathLike, compress: bool = False):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.compress = compress
+
+    def put(self, key: str, results: RunResults):
+        """Stores a run under key, replacing any run already stored under it"""
+        columns, manifest = to_columns(results)
+        manifest["compressed"] = self.compress
+        compressed = COLUMNS if self.compress else None
+        write_entry(self.directory, key, columns, manifest, compressed, replace=True)
+        logger.debug(f"stored results {key}")
+
+    def __getitem__(self, key: str) -> StoredResults:
+        if not (self.directory / key / MANIFEST).exists():
+            raise KeyError(key)
+        return StoredResults(self.directory / key)
+
+    def __contains__(self, key: str) -> bool:
+        return (self.directory / key / MANIFEST).exists()
+
+    def keys(self) -> list[str]:
+        return sorted(
+            p.name
+            for p in self.directory.iterdir()
+            if not p.name.startswith(".") and (p / MANIFEST).exists()
+        )
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.keys())
+
+    def __len__(self) -> int:
+        return len(self.keys())
@@ -1,20 +1,74 @@
 from abc import ABC, abstractmethod
 from collections import defaultdict
-from typing import Optional
+from typing import Hashable, Mapping, Optional
 
-from tiny_backtester.utils.backtester_types import Order, MarketData
+from tiny_backtester.data_store import AsOfView, MarketStore, MarketView
+from tiny_backtester.indicators import Indicators
+from tiny_backtester.utils.backtester_exception import BacktesterException
+from tiny_backtester.utils.backtester_types import Order, MarketData, SignalType
+import numpy as np
 from numpy import float64
+import pandas as pd
 
 
 class Strategy(ABC):
     tickers: set[str]
     portfolio: dict[str, int] = defaultdict(int)
     funds = float64(10000)
+    columnar: bool = False  # run receives a MarketView of numpy columns instead of DataFrames
+    # most bars of history precalc and run need, None for all. run then gets windows of the last
+    # lookback bars, the full history is data[t].history() (data.history(t) for DataFrames)
+    lookback: Optional[int] = None
+    indicators: Optional[Indicators] = None  # ticker -> name -> Indicator, advanced every epoch
+
+    def __init__(self):
+        # class level defaults are copied so mutable state is never shared between instances
+        self.portfolio = defaultdict(int, type(self).portfolio)
+        self.funds = float64(type(self).funds)
 
     @abstractmethod
     def precalc(self, data: MarketData) -> None:
         """Calculate new columns on data"""
 
     @abstractmethod
-    def run(self, data: MarketData) -> Optional[list[Order]]:
+    def run(
+        self, data: Mapping[str, pd.DataFrame] | MarketView | AsOfView
+    ) -> Optional[list[Order]]:
         """Individual strategy run on each epoch, returns a list of orders"""
+
+    def precalc_key(self) -> Optional[Hashable]:
+        """Strategies with equal keys add the same columns in precalc, whatever the window of data
+
+        Walk-forward folds of such strategies share one precalc over the whole data, None never
+        shares.
+        """
+        return None
+
+
+class SignalStrategy(Strategy):
+    """Strategy expressed as per-bar signal arrays, runs through Engine.run or Engine.run_signals"""
+
+    columnar = True
+    signal_type: SignalType = "order"
+    _signal_cache: Optional[tuple[MarketStore, dict[str, np.ndarray]]] = None
+
+    @abstractmethod
+    def signals(self, data: MarketStore) -> dict[str, np.ndarray]:
+        """Integer order quantity ("order") or target holding ("target") per bar for each ticker"""
+
+    def run(self, data: Mapping[str, pd.DataFrame] | MarketView | AsOfView) -> list[Order]:
+        if not isinstance(data, MarketView):
+            raise BacktesterException("signal strategies run on a MarketView of numpy columns")
+        if self._signal_cache is None or self._signal_cache[0] is not data.store:
+            self._signal_cache = (data.store, self.signals(data.store))
+        signals = self._signal_cache[1]
+        orders = []
+        for t in sorted(self.tickers):
+            q = int(signals[t][data.end - 1])
+            if self.signal_type == "target":
+                q -= self.portfolio[t]
+            if q > 0:
+                orders.append(Order(t, "buy", q))
+            elif q < 0:
+                orders.append(Order(t, "sell", -q))
+        return orders
@@ -0,0 +1,146 @@
+import logging
+import os
+import tempfile
+from pathlib import Path
+from typing import Iterable, Iterator, Mapping, Optional
+import pandas as pd
+
+from tiny_backtester.strategy import Strategy
+from tiny_backtester.utils.backtester_exception import BacktesterException
+from tiny_backtester.utils.backtester_types import MarketData, ValidationMode
+from tiny_backtester.utils.math_utils import RollSpread, k
+from tiny_backtester.utils.validation import DEFAULT_VALIDATION, validate_ts
+
+logger = logging.getLogger("tiny_backtester")
+
+
+def read_chunks(
+    path: str | os.PathLike,
+    chunksize: int = 100_000,
+    index_col: str = "datetime",
+    columns: Optional[list[str]] = None,
+) -> Iterator[pd.DataFrame]:
+    """Raw chunks of a csv or parquet file, never holding more than chunksize rows"""
+    path = Path(path)
+    if path.suffix == ".parquet":
+        try:
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise BacktesterException("pyarrow is required to stream parquet files") from e
+        read_columns = None if columns is None else [index_col, *columns]
+        for batch in pq.ParquetFile(path).iter_batches(chunksize, columns=read_columns):
+            yield batch.to_pandas().set_index(index_col)
+    else:
+        usecols = None if columns is None else [index_col, *columns]
+        with pd.read_csv(
+            path, index_col=index_col, usecols=usecols, parse_dates=True, chunksize=chunksize
+        ) as reader:
+            yield from reader
+
+
+def stream_spread(chunks: Iterable[pd.DataFrame]) -> float:
+    """Full sample Roll spread of a chunked series, equal to calculate_spread on the whole series"""
+    spread = RollSpread()
+    for chunk in chunks:
+        spread.update(chunk["close"].to_numpy())
+    return spread.value
+
+
+def process_chunks(
+    chunks: Iterable[pd.DataFrame], spread: float, validation: ValidationMode = DEFAULT_VALIDATION
+) -> Iterator[pd.DataFrame]:
+    """Incremental process_df, the spread has to be known up front (see stream_spread)"""
+    last = None  # the previous chunk's last timestamp, each chunk is only validated on its own
+    for chunk in chunks:
+        chunk = validate_ts(chunk.rename(columns=str.lower), validation)
+        if validation != "off" and len(chunk):
+            if last is not None and chunk.index[0] < last:
+                raise BacktesterException("index must be sorted in increasing order across chunks")
+            last = chunk.index[-1]
+        if "midpoint" not in chunk:
+            chunk = chunk.assign(midpoint=(chunk["high"] + chunk["low"]) / 2)
+        if "slippage" not in chunk:
+            chunk = chunk.assign(slippage=k / chunk["volume"])
+        if "spread" not in chunk:
+            chunk = chunk.assign(spread=spread)
+        yield chunk
+
+
+def stream_ts(
+    path: str | os.PathLike,
+    chunksize: int = 100_000,
+    spread: Optional[float] = None,
+    validation: ValidationMode = DEFAULT_VALIDATION,
+) -> Iterator[pd.DataFrame]:
+    """Processed chunks of a file, which is read once
+
+    Unless spread is given, the raw chunks are spilled to a temporary directory while the spread
+    is calculated and processed from there.
+    """
+    if spread is not None:
+        yield from process_chunks(read_chunks(path, chunksize), spread, validation)
+        return
+    with tempfile.TemporaryDirectory(prefix="tiny_backtester-") as tmp:
+        roll = RollSpread()
+        spilled = []
+        for i, chunk in enumerate(read_chunks(path, chunksize)):
+            roll.update(chunk["close"].to_numpy())
+            spilled.append(Path(tmp) / f"{i}.pkl")
+            chunk.to_pickle(spilled[-1])
+        logger.debug(f"calculated spread {roll.value} for {path}")
+        chunks = (pd.read_pickle(p) for p in spilled)
+        yield from process_chunks(chunks, roll.value, validation)
+
+
+def rechunk(chunks: Iterable[pd.DataFrame], size: int) -> Iterator[pd.DataFrame]:
+    """Regroup chunks into chunks of exactly size rows, apart from the last"""
+    # slices of the input chunks, only those spanning two chunks are concatenated
+    pending: list[pd.DataFrame] = []
+    n = 0
+    for chunk in chunks:
+        offset = 0
+        while n + len(chunk) - offset >= size:
+            end = offset + size - n
+            pending.append(chunk.iloc[offset:end])
+            yield pd.concat(pending) if len(pending) > 1 else pending[0]
+            pending, n, offset = [], 0, end
+        if offset < len(chunk):
+            pending.append(chunk.iloc[offset:])
+            n += len(chunk) - offset
+    if n:
+        yield pd.concat(pending) if len(pending) > 1 else pending[0]
+
+
+def iter_windows(
+    streams: Mapping[str, Iterable[pd.DataFrame]], strat: Strategy, window: int
+) -> Iterator[tuple[MarketData, int]]:
+    """Windows of window new bars per ticker, prefixed by the last strat.lookback bars
+
+    Yields the precalculated frames and the number of carried over bars at their start. Every
+    ticker advances in lockstep and iteration stops with the shortest stream.
+    """
+    if strat.lookback is None:
+        raise BacktesterException("strategy must declare a lookback to run on a stream")
+    chunks = {t: rechunk(streams[t], window) for t in strat.tickers}
+    carry: Optional[MarketData] = None
+    while True:
+        new: MarketData = {}
+        for t, c in chunks.items():
+            chunk = next(c, None)
+            if chunk is None:
+                return
+            new[t] = chunk
+        if carry is None:
+            frames = {t: chunk.copy() for t, chunk in new.items()}
+        else:
+            frames = {t: pd.concat([carry[t], new[t]]) for t in new}
+        base_columns = {t: chunk.columns for t, chunk in new.items()}
+        start = 0 if carry is None else min(len(c) for c in carry.values())
+        strat.precalc(frames)
+        yield frames, start
+        if any(len(chunk) < window for chunk in new.values()):
+            return
+        lookback = strat.lookback
+        carry = {
+            t: df[base_columns[t]].iloc[max(len(df) - lookback, 0) :] for t, df in frames.items()
+        }
@@ -0,0 +1,235 @@
+import itertools
+import logging
+from multiprocessing import get_context
+from multiprocessing.shared_memory import SharedMemory
+from typing import (
+    Any,
+    Callable,
+    Hashable,
+    Iterable,
+    Iterator,
+    Mapping,
+    NamedTuple,
+    Optional,
+    Sequence,
+)
+import numpy as np
+import pandas as pd
+
+from tiny_backtester.data_store import to_datetime_index
+from tiny_backtester.engine import Engine
+from tiny_backtester.strategy import Strategy
+from tiny_backtester.utils.backtester_exception import BacktesterException
+from tiny_backtester.utils.backtester_types import MarketData, RunResults
+
+logger = logging.getLogger("tiny_backtester")
+
+ALIGNMENT = 64
+
+
+class SharedColumn(NamedTuple):
+    ticker: str
+    column: Optional[str]  # None for the datetime index
+    dtype: str
+    offset: int
+    length: int
+
+
+class SharedManifest(NamedTuple):
+    """Everything a worker needs to attach to a SharedMarketData block"""
+
+    name: str
+    columns: list[SharedColumn]
+    tz: dict[str, Any]
+    index_names: dict[str, Optional[str]]
+
+
+class SharedMarketData:
+    """Read-only copy of processed market data in a single shared memory block"""
+
+    def __init__(self, market_data: MarketData):
+        arrays: list[tuple[str, Optional[str], np.ndarray]] = []
+        tz: dict[str, Any] = {}
+        index_names: dict[str, Optional[str]] = {}
+        for t, df in market_data.items():
+            idx = pd.DatetimeIndex(df.index).as_unit("ns")
+            tz[t], index_names[t] = idx.tz, None if idx.name is None else str(idx.name)
+            arrays.append((t, None, idx.to_numpy("i8")))
+            for c in df.columns:
+                arr = df[c].to_numpy()
+                if arr.dtype.kind not in "biuf":
+                    raise BacktesterException(f"column {c} of {t} can't be shared, must be numeric")
+                arrays.append((t, c, arr))
+
+        columns, size = [], 0
+        for t, column, arr in arrays:
+            columns.append(SharedColumn(t, column, arr.dtype.str, size, len(arr)))
+            size += -(-arr.nbytes // ALIGNMENT) * ALIGNMENT
+        self.shm = SharedMemory(create=True, size=max(size, 1))
+        for (_, _, arr), col in zip(arrays, columns):
+            np.ndarray(col.length, col.dtype, buffer=self.shm.buf, offset=col.offset)[:] = arr
+        self.manifest = SharedManifest(self.shm.name, columns, tz, index_names)
+        logger.debug(f"shared {len(columns)} columns in {size} bytes as {self.shm.name}")
+
+    def close(self):
+        self.shm.close()
+        self.shm.unlink()
+
+    def __enter__(self) -> "SharedMarketData":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def attach(manifest: SharedManifest) -> tuple[SharedMemory, MarketData]:
+    """Zero-copy DataFrames over a SharedMarketData block, the SharedMemory must outlive them"""
+    shm = SharedMemory(name=manifest.name)
+    index: dict[str, pd.DatetimeIndex] = {}
+    columns: dict[str, dict[str, np.ndarray]] = {}
+    for col in manifest.columns:
+        arr = np.ndarray(col.length, col.dtype, buffer=shm.buf, offset=col.offset)
+        arr.flags.writeable = False
+        if col.column is None:
+            t = col.ticker
+            index[t] = to_datetime_index(arr, manifest.tz[t], manifest.index_names[t])
+        else:
+            columns.setdefault(col.ticker, {})[col.column] = arr
+    return shm, {
+        t: pd.DataFrame(columns.get(t, {}), index=idx, copy=False) for t, idx in index.items()
+    }
+
+
+def summarise(results: RunResults, strat: Strategy) -> dict[str, Any]:
+    """Compact summary row of a single run"""
+    orders = results["orders"]
+    last = [p.iloc[-1] for p in results["positions"].values()]
+    # positions are marked at their last fill, the equity curve at the run's last bar
+    equity = results["equity"]
+    unrealised_pnl = float(equity["exposure"].iloc[-1]) if len(equity) else 0.0
+    return {
+        "funds": float(strat.funds),
+        "equity": float(strat.funds) + unrealised_pnl,
+        "orders": len(orders),
+        "filled": int((orders["status"] == "filled").sum()) if len(orders) else 0,
+        "realised_pnl": float(sum(p["realised_pnl"] for p in last)),
+        "unrealised_pnl": unrealised_pnl,
+    }
+
+
+class SweepWorker:
+    """Runs one parameter set against a private shallow copy of the market data"""
+
+    def __init__(
+        self,
+        market_data: MarketData,
+        factory: Callable[..., Strategy],
+        options: Optional[dict],
+        n_epochs: Optional[int],
+        signals: bool,
+    ):
+        self.market_data = market_data
+        self.factory = factory
+        self.options = options
+        self.n_epochs = n_epochs
+        self.signals = signals
+
+    def __call__(self, task: tuple[int, dict[str, Any]]) -> dict[str, Any]:
+        run, params = task
+        engine = Engine(self.options)
+        # columns added by precalc go to the run's overlay and stay private to it
+        engine.market_data = self.market_data
+        strat = self.factory(**params)
+        if self.signals:
+            results = engine.run_signals(strat, self.n_epochs)  # type: ignore[arg-type]
+        else:
+            results = engine.run(strat, self.n_epochs)
+        return {"run": run, **params, **summarise(results, strat)}
+
+
+_worker: Optional[SweepWorker] = None
+_worker_shm: Optional[SharedMemory] = None
+
+
+def _init_worker(manifest: SharedManifest, *args):
+    global _worker, _worker_shm
+    _worker_shm, market_data = attach(manifest)
+    _worker = SweepWorker(market_data, *args)
+
+
+def _run_task(task: tuple[int, dict[str, Any]]) -> dict[str, Any]:
+    assert _worker is not None
+    return _worker(task)
+
+
+def parameter_grid(grid: Mapping[str, Iterable]) -> list[dict[str, Any]]:
+    return [dict(zip(grid, values)) for values in itertools.product(*grid.values())]
+
+
+def sweep(
+    engine: Engine,
+    factory: Callable[..., Strategy],
+    grid: Mapping[str, Iterable],
+    processes: Optional[int] = None,
+    n_epochs: Optional[int] = None,
+    signals: bool = False,
+    chunksize: int = 1,
+) -> Iterator[dict[str, Any]]:
+    """Run factory(**params) for every combination in grid, yielding summary rows as runs finish
+
+    Workers attach to one shared read-only copy of engine.market_data. processes=0 runs
+    everything in the calling process.
+    """
+    tasks = list(enumerate(parameter_grid(grid)))
+    args = (factory, engine.options, n_epochs, signals)
+    if processes == 0:
+        yield from map(SweepWorker(engine.market_data, *args), tasks)
+        return
+    with SharedMarketData(engine.market_data) as shared:
+        with get_context().Pool(processes, _init_worker, (shared.manifest, *args)) as pool:
+            yield from pool.imap_unordered(_run_task, tasks, chunksize)
+
+
+_engine: Optional[Engine] = None
+
+
+def _init_engine(manifest: SharedManifest, options: Optional[dict]):
+    global _engine, _worker_shm
+    _worker_shm, market_data = attach(manifest)
+    _engine = Engine(options)
+    _engine.market_data = market_data
+
+
+def _run_many(task: tuple[list[Strategy], Optional[int], int]) -> list[RunResults]:
+    assert _engine is not None
+    return _engine.run_many(*task)
+
+
+def run_many_pool(
+    engine: Engine,
+    strategies: Sequence[Strategy],
+    n_epochs: Optional[int],
+    threads: int,
+    processes: int,
+) -> list[RunResults]:
+    """Engine.run_many split between processes, each making one pass over shared market data
+
+    Strategies sharing a precalc_key stay in the same process so they still share the precalc.
+    """
+    groups: dict[Hashable, list[int]] = {}
+    for i, strat in enumerate(strategies):
+        key = strat.precalc_key()
+        groups.setdefault(i if key is None else ("key", key), []).append(i)
+    chunks: list[list[int]] = [[] for _ in range(min(processes, len(groups)))]
+    for group in sorted(groups.values(), key=len, reverse=True):
+        min(chunks, key=len).extend(group)
+    tasks = [([strategies[i] for i in chunk], n_epochs, threads) for chunk in chunks]
+    results: list[Optional[RunResults]] = [None] * len(strategies)
+    with SharedMarketData(engine.market_data) as shared:
+        with get_context().Pool(
+            len(chunks), _init_engine, (shared.manifest, engine.options)
+        ) as pool:
+            for chunk, part in zip(chunks, pool.map(_run_many, tasks)):
+                for i, r in zip(chunk, part):
+                    results[i] = r
+    return results  # type: ignore[return-value]
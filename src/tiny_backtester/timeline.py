@@ -0,0 +1,32 @@
+from typing import NamedTuple
+import numpy as np
+
+
+class Timeline(NamedTuple):
+    """Union of several tickers' timestamp indexes, grouped into events by timestamp
+
+    Event e covers rows starts[e]:starts[e + 1] of codes/positions, the tickers with a bar at
+    times[e] and the position of that bar in their own index.
+    """
+
+    times: np.ndarray  # int64 nanoseconds, strictly increasing
+    starts: np.ndarray
+    codes: np.ndarray
+    positions: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.times)
+
+
+def build_timeline(indexes: list[np.ndarray]) -> Timeline:
+    """Precomputed union index, a stable sort of every ticker's sorted index"""
+    lengths = [len(idx) for idx in indexes]
+    times = np.concatenate(indexes) if indexes else np.empty(0, dtype=np.int64)
+    codes = np.repeat(np.arange(len(indexes)), lengths)
+    positions = np.concatenate([np.arange(n) for n in lengths]) if indexes else codes
+    order = np.argsort(times, kind="stable")
+    times, codes, positions = times[order], codes[order], positions[order]
+    new_event = np.flatnonzero(np.diff(times, prepend=times[:1] - 1)) if len(times) else codes
+    starts = np.append(new_event, len(times))
+    return Timeline(times[new_event], starts, codes, positions)
+
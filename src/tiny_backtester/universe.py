@@ -0,0 +1,205 @@
+import glob
+import logging
+import os
+from collections import Counter
+from multiprocessing import get_context
+from pathlib import Path
+from typing import Any, Iterable, Iterator, Mapping, NamedTuple, Optional
+import numpy as np
+import pandas as pd
+
+from tiny_backtester.data_store import MarketStore, TickerData, read_only, to_datetime_index
+from tiny_backtester.streaming import read_chunks
+from tiny_backtester.utils.backtester_exception import BacktesterException
+from tiny_backtester.utils.backtester_types import CalendarType, MarketData, ValidationMode
+from tiny_backtester.utils.math_utils import process_df
+from tiny_backtester.utils.validation import DEFAULT_VALIDATION
+
+logger = logging.getLogger("tiny_backtester")
+
+SUFFIXES = (".csv", ".parquet")
+
+
+class Universe(Mapping[str, TickerData]):
+    """Processed bars of many tickers in one set of columns, ticker after ticker
+
+    Tickers are rows offsets[code] to offsets[code + 1] of every column, the TickerData and
+    DataFrames handed out are zero-copy read-only views of them. validation is the mode the
+    tickers were validated with when they were processed.
+    """
+
+    def __init__(
+        self,
+        tickers: list[str],
+        offsets: np.ndarray,
+        index: np.ndarray,
+        columns: dict[str, np.ndarray],
+        tz: list[Any],
+        index_name: Optional[str] = None,
+        validation: ValidationMode = "off",
+    ):
+        self.tickers = tickers
+        self.codes = {t: c for c, t in enumerate(tickers)}
+        self.offsets = offsets
+        self.index = index  # int64 nanoseconds since epoch (UTC)
+        self.columns = columns
+        self.tz = tz
+        self.index_name = index_name
+        self.validation = validation
+        for a in (offsets, index, *columns.values()):
+            a.flags.writeable = False
+
+    @classmethod
+    def from_ticker_data(
+        cls, data: Mapping[str, TickerData], validation: ValidationMode = "off"
+    ) -> "Universe":
+        """Consolidates tickers that have the same columns, in the order given"""
+        tickers = list(data)
+        first = data[tickers[0]] if tickers else TickerData(np.empty(0, np.int64), {})
+        lengths = [len(data[t]) for t in tickers]
+        offsets = np.concatenate(([0], np.cumsum(lengths, dtype=np.int64)))
+        columns = {
+            c: np.concatenate([data[t].columns[c] for t in tickers]) if tickers else a[:0]
+            for c, a in first.columns.items()
+        }
+        index = np.concatenate([data[t].index for t in tickers]) if tickers else first.index
+        tz = [data[t].tz for t in tickers]
+        return cls(tickers, offsets, index, columns, tz, first.index_name, validation)
+
+    def __getitem__(self, ticker: str) -> TickerData:
+        rows = self.rows(ticker)
+        return TickerData(
+            self.index[rows],
+            {c: a[rows] for c, a in self.columns.items()},
+            self.tz[self.codes[ticker]],
+            self.index_name,
+        )
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.tickers)
+
+    def __len__(self) -> int:
+        return len(self.tickers)
+
+    def rows(self, ticker: str) -> slice:
+        code = self.codes[ticker]
+        return slice(int(self.offsets[code]), int(self.offsets[code + 1]))
+
+    def frame(self, ticker: str) -> pd.DataFrame:
+        data = self[ticker]
+        index = to_datetime_index(data.index, data.tz, self.index_name)
+        return read_only(pd.DataFrame(data.columns, index=index, copy=False))
+
+    def to_market_data(self) -> MarketData:
+        return {t: self.frame(t) for t in self.tickers}
+
+    def to_store(self) -> MarketStore:
+        return MarketStore({t: self[t] for t in self.tickers})
+
+
+class LoadedUniverse(NamedTuple):
+    universe: Universe
+    failures: dict[str, str]  # ticker -> why it wasn't loaded
+
+
+def find_files(source: str | os.PathLike) -> dict[str, Path]:
+    """csv and parquet files of a directory or glob pattern by ticker, the file's stem"""
+    path = Path(source)
+    if path.is_dir():
+        paths = [p for p in path.iterdir() if p.suffix in SUFFIXES]
+    else:
+        paths = [
+            Path(p) for p in glob.glob(str(source), recursive=True) if Path(p).suffix in SUFFIXES
+        ]
+    files: dict[str, Path] = {}
+    for p in sorted(paths):
+        if p.stem in files:
+            raise BacktesterException(f"ticker {p.stem} found in {files[p.stem]} and {p}")
+        files[p.stem] = p
+    return files
+
+
+def split_long(df: pd.DataFrame, ticker_column: str = "ticker") -> MarketData:
+    """Frames per ticker of a long format frame with a ticker column"""
+    if ticker_column not in df.columns:
+        raise BacktesterException(f"long format data has no {ticker_column} column")
+    return {
+        str(t): group.drop(columns=ticker_column)
+        for t, group in df.groupby(ticker_column, sort=True)
+    }
+
+
+class LoadTask(NamedTuple):
+    ticker: str
+    source: pd.DataFrame | Path
+    cal: Optional[CalendarType]
+    resample_freq: Optional[str]
+    validation: ValidationMode
+
+
+def load_ticker(task: LoadTask) -> tuple[str, Optional[TickerData], Optional[str]]:
+    """Reads and processes one ticker, returns its columns or why it failed"""
+    try:
+        df = task.source
+        if isinstance(df, Path):
+            df = pd.concat(read_chunks(df))
+        processed = process_df(df, task.cal, task.resample_freq, validation=task.validation)
+        return task.ticker, TickerData.from_frame(processed), None
+    except Exception as e:
+        return task.ticker, None, f"{type(e).__name__}: {e}"
+
+
+def load_universe(
+    source: str | os.PathLike | pd.DataFrame,
+    ticker_column: Optional[str] = None,
+    cal: Optional[CalendarType] = None,
+    resample_freq: Optional[str] = None,
+    processes: Optional[int] = None,
+    validation: ValidationMode = DEFAULT_VALIDATION,
+    columns: Optional[Iterable[str]] = None,
+) -> LoadedUniverse:
+    """Loads and processes every ticker of a source on a process pool into one Universe
+
+    source is a directory or glob pattern of per-ticker csv or parquet files, or with
+    ticker_column a long format file or frame of every ticker. Tickers that fail to read,
+    validate or process are reported in failures and left out, the rest still load. So are
+    tickers whose processed columns differ from columns, by default the most common set of
+    them (the first ticker's on a tie). processes=0 loads in the calling process.
+    """
+    sources: Mapping[str, pd.DataFrame | Path]
+    if ticker_column is not None:
+        if isinstance(source, pd.DataFrame):
+            sources = split_long(source, ticker_column)
+        else:
+            sources = split_long(pd.concat(read_chunks(source)), ticker_column)
+    elif isinstance(source, pd.DataFrame):
+        raise BacktesterException("a frame of bars needs the ticker_column of its tickers")
+    else:
+        sources = find_files(source)
+    tasks = [LoadTask(t, s, cal, resample_freq, validation) for t, s in sources.items()]
+
+    if processes == 0 or len(tasks) < 2:
+        loaded = list(map(load_ticker, tasks))
+    else:
+        with get_context().Pool(processes) as pool:
+            chunksize = max(len(tasks) // (4 * (processes or os.cpu_count() or 1)), 1)
+            loaded = pool.map(load_ticker, tasks, chunksize)
+
+    failures = {ticker: error or "unknown error" for ticker, data, error in loaded if data is None}
+    processed = {ticker: data for ticker, data, _ in loaded if data is not None}
+    counts = Counter(frozenset(d.columns) for d in processed.values())
+    schema: frozenset[str] | None = None
+    if columns is not None:
+        schema = frozenset(columns)
+    elif counts:
+        schema = counts.most_common(1)[0][0]
+    data: dict[str, TickerData] = {}
+    for ticker, ticker_data in processed.items():
+        if set(ticker_data.columns) != schema:
+            failures[ticker] = f"columns {sorted(ticker_data.columns)} differ from the universe"
+        else:
+            data[ticker] = ticker_data
+    logger.debug(f"loaded {len(data)} tickers, {len(failures)} failed")
+    return LoadedUniverse(
+        Universe.from_ticker_data(data, validation), dict(sorted(failures.items()))
+    )
@@ -0,0 +1,254 @@
+import functools
+import importlib.util
+from typing import Callable, NamedTuple, Optional
+import numpy as np
+
+from tiny_backtester.utils.backtester_exception import BacktesterException
+
+BACKENDS = ("python", "numba")
+
+
+class Fills(NamedTuple):
+    """Every order produced by a signal run, in execution order"""
+
+    epoch: np.ndarray  # int64 bar index
+    code: np.ndarray  # int64 ticker index
+    quantity: np.ndarray  # int64, positive for buys and negative for sells
+    price: np.ndarray  # float64 execution price
+    filled: np.ndarray  # bool, False when rejected
+    funds: float
+    holdings: np.ndarray  # int64 holdings per ticker after the run
+
+
+def get_order_intents(signals: np.ndarray, holdings: np.ndarray, target: bool) -> np.ndarray:
+    """Signed order quantity per (ticker, epoch) assuming every order fills"""
+    if not target:
+        return signals
+    return np.diff(signals, axis=1, prepend=holdings[:, None])
+
+
+def fill_orders_vectorized(
+    intents: np.ndarray,
+    buy_prices: np.ndarray,
+    sell_prices: np.ndarray,
+    funds: float,
+    holdings: np.ndarray,
+) -> Optional[Fills]:
+    """Fill every order intent in one pass, returns None if any order would have been rejected"""
+    n_tickers = intents.shape[0]
+    # orders execute epoch by epoch, tickers in code order within an epoch
+    epoch_code = np.flatnonzero(intents.T)
+    epoch, code = np.divmod(epoch_code, n_tickers)
+    quantity = intents[code, epoch]
+    is_buy = quantity > 0
+    price = np.where(is_buy, buy_prices[code, epoch], sell_prices[code, epoch])
+
+    # running holdings per ticker: cumulative sum within each ticker's orders
+    by_code = np.argsort(code, kind="stable")
+    running = np.cumsum(quantity[by_code])
+    first = np.searchsorted(code[by_code], code[by_code])
+    held_after = np.empty_like(quantity)
+    held_after[by_code] = running - np.where(first > 0, running[first - 1], 0)
+    held_after += holdings[code]
+    # cumsum over [funds, flows...] performs the same float operations as the event loop
+    cash = np.cumsum(np.concatenate(([funds], -quantity * price)))
+    if np.any(~is_buy & (held_after < 0)) or np.any(is_buy & (cash[1:] < 0)):
+        return None
+    held = holdings.copy()
+    np.add.at(held, code, quantity)
+    return Fills(
+        epoch, code, quantity, price, np.ones(len(code), dtype=bool), float(cash[-1]), held
+    )
+
+
+def fill_orders(
+    signals: np.ndarray,
+    buy_prices: np.ndarray,
+    sell_prices: np.ndarray,
+    funds: float,
+    holdings: np.ndarray,
+    target: bool,
+) -> Fills:
+    """Reference epoch by epoch implementation of the Engine.execute_order fill rules"""
+    n_tickers, n_epochs = signals.shape
+    sig, buy, sell = signals.tolist(), buy_prices.tolist(), sell_prices.tolist()
+    held = holdings.tolist()
+    epoch, code, quantity, price, filled = [], [], [], [], []
+    for i in range(n_epochs):
+        for k in range(n_tickers):
+            q = sig[k][i] - held[k] if target else sig[k][i]
+            if q == 0:
+                continue
+            if q > 0:
+                p = buy[k][i]
+                ok = not q * p > funds
+                if ok:
+                    funds -= q * p
+            else:
+                p = sell[k][i]
+                ok = held[k] >= -q
+                if ok:
+                    funds -= q * p
+            if ok:
+                held[k] += q
+            epoch.append(i)
+            code.append(k)
+            quantity.append(q)
+            price.append(p)
+            filled.append(ok)
+    return Fills(
+        np.array(epoch, dtype=np.int64),
+        np.array(code, dtype=np.int64),
+        np.array(quantity, dtype=np.int64),
+        np.array(price, dtype=np.float64),
+        np.array(filled, dtype=bool),
+        funds,
+        np.array(held, dtype=np.int64),
+    )
+
+
+def track_positions(
+    quantity: np.ndarray, price: np.ndarray
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Holdings, average entry price and realised pnl after each filled order of one ticker"""
+    held = np.cumsum(quantity)
+    entry_price = np.empty(len(quantity), dtype=np.float64)
+    realised_pnl = np.empty(len(quantity), dtype=np.float64)
+    q0, e, r = 0, 0.0, 0.0
+    for j, (q, p) in enumerate(zip(quantity.tolist(), price.tolist())):
+        if q > 0:
+            e = (e * q0 + p * q) / (q0 + q)
+        else:
+            r += (p - e) * -q
+            e = 0.0 if q0 + q == 0 else e
+        q0 += q
+        entry_price[j] = e
+        realised_pnl[j] = r
+    return held, entry_price, realised_pnl
+
+
+def numba_available() -> bool:
+    return importlib.util.find_spec("numba") is not None
+
+
+def get_backend(backend: Optional[str] = None) -> str:
+    """Accounting backend to use, numba when it's installed unless backend names one"""
+    if backend is None or backend == "auto":
+        return "numba" if numba_available() else "python"
+    if backend not in BACKENDS:
+        raise BacktesterException(f"unknown accounting backend: {backend}")
+    if backend == "numba" and not numba_available():
+        raise BacktesterException("numba accounting backend needs numba installed")
+    return backend
+
+
+@functools.cache
+def jit(kernel: Callable) -> Callable:
+    """kernel compiled by numba, which is only imported the first time a kernel is needed"""
+    import numba
+
+    return numba.njit(cache=True, nogil=True)(kernel)
+
+
+def fill_orders_kernel(
+    signals: np.ndarray,
+    buy_prices: np.ndarray,
+    sell_prices: np.ndarray,
+    funds: float,
+    held: np.ndarray,
+    target: bool,
+    epoch: np.ndarray,
+    code: np.ndarray,
+    quantity: np.ndarray,
+    price: np.ndarray,
+    filled: np.ndarray,
+) -> tuple[int, float]:
+    """fill_orders over arrays, writes the orders and holdings in place, returns the order
+    count and funds"""
+    n_tickers, n_epochs = signals.shape
+    n = 0
+    for i in range(n_epochs):
+        for k in range(n_tickers):
+            q = signals[k, i] - held[k] if target else signals[k, i]
+            if q == 0:
+                continue
+            if q > 0:
+                p = buy_prices[k, i]
+                ok = not q * p > funds
+            else:
+                p = sell_prices[k, i]
+                ok = held[k] >= -q
+            if ok:
+                funds -= q * p
+                held[k] += q
+            epoch[n] = i
+            code[n] = k
+            quantity[n] = q
+            price[n] = p
+            filled[n] = ok
+            n += 1
+    return n, funds
+
+
+def fill_orders_compiled(
+    signals: np.ndarray,
+    buy_prices: np.ndarray,
+    sell_prices: np.ndarray,
+    funds: float,
+    holdings: np.ndarray,
+    target: bool,
+    compile: bool = True,
+) -> Fills:
+    """fill_orders run by the numba compiled kernel, or by the kernel in Python if not compile"""
+    kernel = jit(fill_orders_kernel) if compile else fill_orders_kernel
+    size = signals.size
+    epoch, code, quantity = (np.empty(size, dtype=np.int64) for _ in range(3))
+    price, filled = np.empty(size, dtype=np.float64), np.empty(size, dtype=bool)
+    held = holdings.astype(np.int64)  # a copy, the kernel updates it
+    n, funds = kernel(
+        np.ascontiguousarray(signals, dtype=np.int64),
+        np.ascontiguousarray(buy_prices, dtype=np.float64),
+        np.ascontiguousarray(sell_prices, dtype=np.float64),
+        float(funds),
+        held,
+        target,
+        epoch,
+        code,
+        quantity,
+        price,
+        filled,
+    )
+    return Fills(epoch[:n], code[:n], quantity[:n], price[:n], filled[:n], float(funds), held)
+
+
+def track_positions_kernel(
+    quantity: np.ndarray, price: np.ndarray, entry_price: np.ndarray, realised_pnl: np.ndarray
+):
+    """track_positions over arrays, writes the entry prices and realised pnl in place"""
+    q0, e, r = 0, 0.0, 0.0
+    for j in range(len(quantity)):
+        q, p = quantity[j], price[j]
+        if q > 0:
+            e = (e * q0 + p * q) / (q0 + q)
+        else:
+            r += (p - e) * -q
+            e = 0.0 if q0 + q == 0 else e
+        q0 += q
+        entry_price[j] = e
+        realised_pnl[j] = r
+
+
+def track_positions_compiled(
+    quantity: np.ndarray, price: np.ndarray, compile: bool = True
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """track_positions run by the numba compiled kernel, or by the kernel in Python"""
+    kernel = jit(track_positions_kernel) if compile else track_positions_kernel
+    entry_price = np.empty(len(quantity), dtype=np.float64)
+    realised_pnl = np.empty(len(quantity), dtype=np.float64)
+    kernel(
+        np.ascontiguousarray(quantity, dtype=np.int64),
+        np.ascontiguousarray(price, dtype=np.float64),
+        entry_price,
+        realised_pnl,
+    )
+    return np.cumsum(quantity), entry_price, realised_pnl
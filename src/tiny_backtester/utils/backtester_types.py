@@ -1,23 +1,40 @@
-from typing import Literal, NamedTuple, TypedDict, Optional
+from typing import Any, Literal, NamedTuple, NotRequired, TypedDict
 from numpy import float64
 import pandas as pd
-import pandera.pandas as pa
-import pandera.typing.pandas as pat
 
-OrderType = Literal["buy", "sell"]
-OrderStatus = Literal["filled", "rejected", "unsupported"]
+OrderType = Literal["buy", "sell", "cancel"]
+OrderStatus = Literal["filled", "rejected", "unsupported", "pending", "cancelled", "expired"]
+SignalType = Literal["order", "target"]
 MarketData = dict[str, pd.DataFrame]
-RunResults = TypedDict("RunResults", {"orders": pd.DataFrame, "positions": dict[str, pd.DataFrame]})
+RunStats = TypedDict(
+    "RunStats", {"timers": dict[str, float], "calls": dict[str, int], "counters": dict[str, int]}
+)
+RunResults = TypedDict(
+    "RunResults",
+    {
+        "orders": pd.DataFrame,
+        "positions": dict[str, pd.DataFrame],
+        "equity": NotRequired[pd.DataFrame],
+        "instrumentation": NotRequired[RunStats],
+    },
+)
+ValidationMode = Literal["full", "once", "off"]
 CalendarType = Literal["exchange_hours", "extended_hours", "continous_24_5", "continuous_24_7"]
 
 
 class Order(NamedTuple):
-    """Order request"""
+    """Order request
+
+    An order that can't fill on submission rests in the order book for good_for epochs (None
+    until cancelled), 0 rejects it straight away. A cancel order cancels a ticker's resting orders.
+    """
 
     ticker: str
     type: OrderType
     quantity: int
     limit_price: float | None = None
+    stop_price: float | None = None
+    good_for: int | None = 0
 
 
 class ExecutedOrder(NamedTuple):
@@ -40,15 +57,10 @@ class Position(NamedTuple):
     realised_pnl: float64 = float64(0)
 
 
-class TimeSeries(pa.DataFrameModel):
-    """Price data for a given asset"""
+def __getattr__(name: str) -> Any:
+    # the pandera TimeSeries model is built lazily so importing the package doesn't import pandera
+    if name == "TimeSeries":
+        from tiny_backtester.utils.validation import time_series_schema
 
-    datetime: pat.Index[pd.Timestamp]
-    open: pat.Series[float]
-    high: pat.Series[float]
-    low: pat.Series[float]
-    close: pat.Series[float]
-    volume: Optional[pat.Series[int]]
-    midpoint: Optional[pat.Series[float]]
-    slippage: Optional[pat.Series[float]]
-    spread: Optional[pat.Series[float]]
+        return time_series_schema()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,203 @@
+import logging
+from typing import NamedTuple
+import numpy as np
+import pandas as pd
+from pandas.tseries.frequencies import to_offset
+from pandas.tseries.holiday import (
+    AbstractHolidayCalendar,
+    GoodFriday,
+    Holiday,
+    USLaborDay,
+    USMartinLutherKingJr,
+    USMemorialDay,
+    USPresidentsDay,
+    USThanksgivingDay,
+    nearest_workday,
+    sunday_to_monday,
+)
+from pandas.tseries.offsets import CustomBusinessDay
+
+from tiny_backtester.data_store import to_datetime_index
+from tiny_backtester.utils.backtester_exception import BacktesterException
+from tiny_backtester.utils.backtester_types import CalendarType
+
+logger = logging.getLogger("tiny_backtester")
+
+EXCHANGE = "NYSE"
+EXCHANGE_TZ = "America/New_York"
+# local session hours used when pandas_market_calendars isn't installed
+SESSION_HOURS = {"exchange_hours": ("09:30", "16:00"), "extended_hours": ("04:00", "20:00")}
+SESSION_CALENDARS = ("exchange_hours", "extended_hours", "continous_24_5")
+DAY = pd.Timedelta(days=1).value
+
+
+class NYSEHolidayCalendar(AbstractHolidayCalendar):
+    """Full day NYSE holidays, without special closures or early closes"""
+
+    rules = [
+        # the exchange stays open on the Friday before a Saturday New Year's Day
+        Holiday("New Year's Day", month=1, day=1, observance=sunday_to_monday),
+        USMartinLutherKingJr,
+        USPresidentsDay,
+        GoodFriday,
+        USMemorialDay,
+        Holiday("Juneteenth", month=6, day=19, start_date="2022-01-01", observance=nearest_workday),
+        Holiday("Independence Day", month=7, day=4, observance=nearest_workday),
+        USLaborDay,
+        USThanksgivingDay,
+        Holiday("Christmas Day", month=12, day=25, observance=nearest_workday),
+    ]
+
+
+class Sessions(NamedTuple):
+    """Session open and close times as int64 UTC nanoseconds, sorted and non-overlapping"""
+
+    opens: np.ndarray
+    closes: np.ndarray
+
+
+def market_calendar_schedule(cal: CalendarType, start: str, end: str) -> Sessions:
+    import pandas_market_calendars as mcal
+
+    extended = cal == "extended_hours"
+    kwargs = {"start": "pre", "end": "post"} if extended else {}
+    schedule = mcal.get_calendar(EXCHANGE).schedule(start, end, **kwargs)
+    open_column, close_column = ("pre", "post") if extended else ("market_open", "market_close")
+    return Sessions(
+        pd.DatetimeIndex(schedule[open_column]).tz_convert("UTC").to_numpy("i8"),
+        pd.DatetimeIndex(schedule[close_column]).tz_convert("UTC").to_numpy("i8"),
+    )
+
+
+# per process caches: calendar -> first year, last year and sessions, which only grows to the
+# years of the data, and (calendar, step) -> sessions and buckets of the MAX_BUCKETS most
+# recently used steps
+MAX_BUCKETS = 16
+_sessions: dict[CalendarType, tuple[int, int, Sessions]] = {}
+_buckets: dict[tuple[CalendarType, int], tuple[Sessions, np.ndarray, np.ndarray]] = {}
+
+
+def build_sessions(cal: CalendarType, first_year: int, last_year: int) -> Sessions:
+    """Sessions of the calendar in whole years
+
+    Exchange sessions come from pandas_market_calendars if it's installed, otherwise from the
+    NYSE holiday rules and SESSION_HOURS. continous_24_5 sessions are whole UTC weekdays.
+    """
+    start, end = f"{first_year}-01-01", f"{last_year}-12-31"
+    logger.debug(f"building {cal} sessions from {start} to {end}")
+    if cal == "continous_24_5":
+        weekdays = pd.bdate_range(start, end).to_numpy("i8")
+        return Sessions(weekdays, weekdays + DAY)
+    if cal not in SESSION_HOURS:
+        raise BacktesterException(f"unsupported calendar: {cal}")
+    try:
+        return market_calendar_schedule(cal, start, end)
+    except ImportError:
+        pass
+    days = pd.date_range(start, end, freq=CustomBusinessDay(calendar=NYSEHolidayCalendar()))
+    open_time, close_time = (pd.Timedelta(f"{t}:00") for t in SESSION_HOURS[cal])
+    return Sessions(
+        (days + open_time).tz_localize(EXCHANGE_TZ).to_numpy("i8"),
+        (days + close_time).tz_localize(EXCHANGE_TZ).to_numpy("i8"),
+    )
+
+
+def get_sessions(cal: CalendarType, first_year: int, last_year: int) -> Sessions:
+    """Cached sessions covering at least the years, only rebuilt to extend the range"""
+    cached = _sessions.get(cal)
+    if cached is not None:
+        if cached[0] <= first_year and last_year <= cached[1]:
+            return cached[2]
+        first_year, last_year = min(first_year, cached[0]), max(last_year, cached[1])
+    sessions = build_sessions(cal, first_year, last_year)
+    _sessions[cal] = (first_year, last_year, sessions)
+    return sessions
+
+
+def get_buckets(
+    cal: CalendarType, first_year: int, last_year: int, step: int
+) -> tuple[np.ndarray, np.ndarray]:
+    """Start and end of every step long bucket, each session split from its open"""
+    sessions = get_sessions(cal, first_year, last_year)
+    cached = _buckets.pop((cal, step), None)
+    if cached is not None and cached[0] is sessions:
+        _buckets[(cal, step)] = cached  # moved to the end as the most recently used
+        return cached[1], cached[2]
+    counts = -(-(sessions.closes - sessions.opens) // step)
+    first = np.cumsum(counts) - counts
+    offsets = np.arange(counts.sum()) - np.repeat(first, counts)
+    starts = np.repeat(sessions.opens, counts) + step * offsets
+    ends = np.minimum(starts + step, np.repeat(sessions.closes, counts))
+    _buckets[(cal, step)] = (sessions, starts, ends)
+    while len(_buckets) > MAX_BUCKETS:
+        del _buckets[next(iter(_buckets))]
+    return starts, ends
+
+
+def clear_session_cache():
+    _sessions.clear()
+    _buckets.clear()
+
+
+def get_step(freq: str) -> int:
+    try:
+        return pd.Timedelta(to_offset(freq).nanos).value
+    except (TypeError, ValueError) as e:
+        raise BacktesterException("Unsupported resampling operation") from e
+
+
+def aggregate(df: pd.DataFrame, groups: np.ndarray) -> dict[str, np.ndarray]:
+    """OHLCV aggregation of consecutive rows starting at groups, the mean of any other column"""
+    last = np.append(groups[1:], len(df)) - 1
+    counts = last - groups + 1
+    out: dict[str, np.ndarray] = {}
+    for c in df.columns:
+        values = df[c].to_numpy()
+        match c:
+            case "open":
+                out[c] = values[groups]
+            case "close":
+                out[c] = values[last]
+            case "high":
+                out[c] = np.maximum.reduceat(values, groups)
+            case "low":
+                out[c] = np.minimum.reduceat(values, groups)
+            case "volume":
+                out[c] = np.add.reduceat(values, groups)
+            case _:
+                out[c] = np.add.reduceat(values, groups) / counts
+    return out
+
+
+def resample_sessions(df: pd.DataFrame, cal: CalendarType, freq: str) -> pd.DataFrame:
+    """Resample onto the buckets of a calendar's sessions with searchsorted
+
+    Downsampling drops bars outside of sessions and labels buckets by their start, upsampling
+    forward fills the last bar onto every bucket in the range of the data. Naive timestamps are
+    taken to be UTC.
+    """
+    step = get_step(freq)
+    index = pd.DatetimeIndex(df.index)
+    if len(index) == 0:
+        return df
+    t = index.to_numpy("i8")
+    name = None if index.name is None else str(index.name)
+    first_year = pd.Timestamp(t[0] - DAY).year
+    last_year = pd.Timestamp(t[-1] + DAY).year
+    starts, ends = get_buckets(cal, first_year, last_year, step)
+    if len(t) > 1 and step < np.median(np.diff(t)):
+        grid = starts[np.searchsorted(starts, t[0]) : np.searchsorted(starts, t[-1], "right")]
+        rows = np.searchsorted(t, grid, "right") - 1
+        out = df.iloc[rows].copy()
+        out.index = to_datetime_index(grid, index.tz, name)
+        return out
+    bucket = np.searchsorted(starts, t, "right") - 1
+    inside = (bucket >= 0) & (t < ends[np.maximum(bucket, 0)])
+    df, bucket = df[inside], bucket[inside]
+    if len(df) == 0:
+        return df
+    groups = np.flatnonzero(np.diff(bucket, prepend=-1))
+    return pd.DataFrame(
+        aggregate(df, groups),
+        index=to_datetime_index(starts[bucket[groups]], index.tz, name),
+    )
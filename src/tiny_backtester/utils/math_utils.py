@@ -1,42 +1,68 @@
-from typing import Literal, Optional
+from typing import TYPE_CHECKING, Literal, Mapping, Optional
 import numpy as np
 import pandas as pd
-import pandera.pandas as pa
-import pandera.typing as pat
 import logging
 
 from pandas.tseries.frequencies import to_offset
 from tiny_backtester.utils.backtester_exception import BacktesterException
-from tiny_backtester.utils.backtester_types import CalendarType, OrderType, TimeSeries
+from tiny_backtester.utils.backtester_types import CalendarType, OrderType, ValidationMode
+from tiny_backtester.utils.calendars import SESSION_CALENDARS, resample_sessions
+from tiny_backtester.utils.validation import DEFAULT_VALIDATION, check_types
+
+if TYPE_CHECKING:
+    from tiny_backtester.data_store import Bar
 
 logger = logging.getLogger("tiny_backtester")
 
 # pricing parameters / options
 k: float = 0.5  # slippage sensitivity constant
 
-def get_execution_price(type: OrderType, row: pd.Series, slippage: bool = False) -> np.float64:
+def get_execution_price(
+    type: OrderType, row: "pd.Series | Bar", slippage: bool = False
+) -> np.float64:
     if type == "buy":
         slippage_mult = (1 + row["slippage"]) if slippage else 1
         return np.float64((row["midpoint"] + 0.5 * row["spread"]) * slippage_mult)
     elif type == "sell":
         slippage_mult = (1 - row["slippage"]) if slippage else 1
         return np.float64((row["midpoint"] - 0.5 * row["spread"]) * slippage_mult)
-    return np.nan
+    return np.float64(np.nan)
+
+
+def get_execution_prices(
+    type: OrderType, columns: Mapping[str, np.ndarray], slippage: bool = False
+) -> np.ndarray:
+    """Vectorized get_execution_price over every bar of a ticker's columns"""
+    if type == "buy":
+        price = columns["midpoint"] + 0.5 * columns["spread"]
+        return price * (1 + columns["slippage"]) if slippage else price
+    elif type == "sell":
+        price = columns["midpoint"] - 0.5 * columns["spread"]
+        return price * (1 - columns["slippage"]) if slippage else price
+    return np.full(len(columns["midpoint"]), np.nan)
 
 
 def get_average_entry_price(p1: np.float64, p2: np.float64, q1: int, q2: int) -> np.float64:
     return (p1 * q1 + p2 * q2) / (q1 + q2)
 
 
-def get_sampling_type(df: pat.DataFrame[TimeSeries], freq: str) -> Literal["upsample", "downsample"]:
+def get_sampling_type(df: pd.DataFrame, freq: str) -> Literal["upsample", "downsample"]:
     current_nanos = to_offset(df.index.inferred_freq)
     target_nanos = to_offset(freq)
     return "upsample" if target_nanos < current_nanos else "downsample"
 
 
-@pa.check_types
-def resample(df: pat.DataFrame[TimeSeries], cal: CalendarType, freq: str) -> pat.DataFrame[TimeSeries]:
+@check_types
+def resample(
+    df: pd.DataFrame,
+    cal: CalendarType,
+    freq: str,
+    *,
+    validation: ValidationMode = DEFAULT_VALIDATION,
+) -> pd.DataFrame:
     logger.debug(f"resampling df with calendar: {cal} frequency: {freq}")
+    if cal in SESSION_CALENDARS:
+        return resample_sessions(df, cal, freq)
     match (cal, get_sampling_type(df, freq)):
         case ("continuous_24_7", "upsample"):
             return df.resample(freq).ffill()
@@ -58,8 +84,10 @@ def resample(df: pat.DataFrame[TimeSeries], cal: CalendarType, freq: str) -> pat
     return df
 
 
-@pa.check_types
-def calculate_spread(df: pat.DataFrame[TimeSeries]) -> pat.DataFrame[TimeSeries]:
+@check_types
+def calculate_spread(
+    df: pd.DataFrame, *, validation: ValidationMode = DEFAULT_VALIDATION
+) -> pd.DataFrame:
     # implementation of "A Simple Implicit Measure of the Effective Bid-Ask Spread in an Efficient Market [1984], Roll"
     delta = np.diff(df["close"].to_numpy())
     cov = np.cov(delta[:-1], delta[1:])[0, 1]
@@ -69,18 +97,87 @@ def calculate_spread(df: pat.DataFrame[TimeSeries]) -> pat.DataFrame[TimeSeries]
     return df
 
 
-@pa.check_types
+class RollSpread:
+    """Roll spread from a running covariance of consecutive close deltas, updated chunk by chunk
+
+    After seeing every close it matches calculate_spread on the full sample.
+    """
+
+    __slots__ = ("n", "mean_x", "mean_y", "comoment", "last_close", "last_delta")
+
+    def __init__(self):
+        self.n = 0
+        self.mean_x = 0.0
+        self.mean_y = 0.0
+        self.comoment = 0.0
+        self.last_close = np.nan
+        self.last_delta = np.nan
+
+    def update(self, close: np.ndarray) -> "RollSpread":
+        close = np.asarray(close, dtype=np.float64)
+        if len(close) == 0:
+            return self
+        delta = np.diff(close, prepend=self.last_close)
+        delta = np.concatenate(([self.last_delta], delta))
+        delta = delta[~np.isnan(delta)]
+        self.last_close = close[-1]
+        self.last_delta = delta[-1] if len(delta) else np.nan
+        x, y = delta[:-1], delta[1:]
+        if len(x) == 0:
+            return self
+        mean_x, mean_y = x.mean(), y.mean()
+        self.merge(len(x), mean_x, mean_y, np.dot(x - mean_x, y - mean_y))
+        return self
+
+    def push(self, close: float) -> "RollSpread":
+        """update with a single close, without the array overhead"""
+        delta = close - self.last_close
+        if not (np.isnan(self.last_delta) or np.isnan(delta)):
+            self.merge(1, self.last_delta, delta, 0.0)
+        self.last_close = close
+        if not np.isnan(delta):
+            self.last_delta = delta
+        return self
+
+    def merge(self, n_b: int, mean_xb: float, mean_yb: float, comoment_b: float):
+        """Merges the co-moment of n_b more pairs into the running one (Chan et al.)"""
+        n = self.n + n_b
+        dx, dy = mean_xb - self.mean_x, mean_yb - self.mean_y
+        self.comoment += comoment_b + dx * dy * self.n * n_b / n
+        self.mean_x += dx * n_b / n
+        self.mean_y += dy * n_b / n
+        self.n = n
+
+    @property
+    def cov(self) -> float:
+        return self.comoment / (self.n - 1) if self.n > 1 else np.nan
+
+    @property
+    def value(self) -> float:
+        cov = self.cov
+        return 2 * np.sqrt(-cov) if cov < 0 else 0.0
+
+
+@check_types
 def process_df(
-    df: pat.DataFrame[TimeSeries],
+    df: pd.DataFrame,
     cal: Optional[CalendarType] = None,
     resample_freq: Optional[str] = None,
-) -> pat.DataFrame[TimeSeries]:
+    *,
+    validation: ValidationMode = DEFAULT_VALIDATION,
+) -> pd.DataFrame:
     if (cal is None) ^ (resample_freq is None):
         raise BacktesterException("Must provide both 'cal' and 'resample_freq' to resample")
+    # the intermediate frames are only validated again in full mode
+    inner: ValidationMode = "full" if validation == "full" else "off"
     return (
         df.rename(columns=str.lower)
         .pipe(lambda d: d.assign(midpoint=(d["high"] + d["low"]) / 2) if "midpoint" not in d else d)
         .pipe(lambda d: d.assign(slippage=k / d["volume"]) if "slippage" not in d else d)
-        .pipe(lambda d: calculate_spread(d) if "spread" not in d else d)
-        .pipe(lambda d: resample(d, cal, resample_freq) if (cal and resample_freq) else d)
+        .pipe(lambda d: calculate_spread(d, validation=inner) if "spread" not in d else d)
+        .pipe(
+            lambda d: (
+                resample(d, cal, resample_freq, validation=inner) if (cal and resample_freq) else d
+            )
+        )
     )
@@ -0,0 +1,54 @@
+import json
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Any, Mapping, Optional
+import numpy as np
+
+MANIFEST = "manifest.json"
+
+
+def write_entry(
+    directory: Path,
+    key: str,
+    columns: Mapping[str, np.ndarray],
+    manifest: dict[str, Any],
+    compressed: Optional[str] = None,
+    replace: bool = False,
+) -> bool:
+    """Writes a directory of .npy columns (or one compressed .npz) and their manifest
+
+    The entry is written to a temporary directory renamed to directory / key, so readers never
+    see a partial one. An entry already stored under key is kept, returning False, unless
+    replace is set. It is then renamed aside for the swap and only removed after it.
+    """
+    tmp = Path(tempfile.mkdtemp(dir=directory, prefix=".tmp-"))
+    target = directory / key
+    try:
+        if compressed is not None:
+            np.savez_compressed(tmp / compressed, **columns)  # type: ignore[arg-type]
+        else:
+            for name, values in columns.items():
+                np.save(tmp / f"{name}.npy", values)
+        with open(tmp / MANIFEST, "w") as f:
+            json.dump(manifest, f)
+    except OSError:
+        shutil.rmtree(tmp, ignore_errors=True)
+        raise
+    old = None
+    if replace and target.exists():
+        old = Path(tempfile.mkdtemp(dir=directory, prefix=".old-"))
+        os.replace(target, old)
+    try:
+        os.replace(tmp, target)
+    except OSError:
+        shutil.rmtree(tmp, ignore_errors=True)
+        if old is not None:
+            os.replace(old, target)
+        elif target.exists():
+            return False  # stored by another writer first
+        raise
+    if old is not None:
+        shutil.rmtree(old, ignore_errors=True)
+    return True
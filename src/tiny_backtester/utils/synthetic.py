@@ -0,0 +1,28 @@
+import numpy as np
+import pandas as pd
+
+from tiny_backtester.utils.backtester_types import MarketData
+
+
+def synthetic_ohlcv(
+    n_bars: int, seed: int = 0, start: str = "2000-01-01", freq: str = "min"
+) -> pd.DataFrame:
+    """Deterministic random walk OHLCV bars for benchmarks and tests"""
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 1e-3, n_bars)))
+    open = np.concatenate(([100.0], close[:-1]))
+    wick = np.abs(rng.normal(0, 5e-4, (2, n_bars)))
+    return pd.DataFrame(
+        data={
+            "open": open,
+            "high": np.maximum(open, close) * (1 + wick[0]),
+            "low": np.minimum(open, close) * (1 - wick[1]),
+            "close": close,
+            "volume": rng.integers(100, 10_000, n_bars),
+        },
+        index=pd.date_range(start, periods=n_bars, freq=freq, name="datetime"),
+    )
+
+
+def synthetic_market(n_tickers: int, n_bars: int, seed: int = 0) -> MarketData:
+    return {f"T{i:04d}": synthetic_ohlcv(n_bars, seed + i) for i in range(n_tickers)}
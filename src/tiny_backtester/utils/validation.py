@@ -0,0 +1,102 @@
+import functools
+import weakref
+from typing import Any, Callable, Optional, TypeVar
+import numpy as np
+import pandas as pd
+
+from tiny_backtester.utils.backtester_exception import BacktesterException
+from tiny_backtester.utils.backtester_types import ValidationMode
+
+F = TypeVar("F", bound=Callable[..., pd.DataFrame])
+
+DEFAULT_VALIDATION: ValidationMode = "full"
+REQUIRED_COLUMNS = ("open", "high", "low", "close")
+OPTIONAL_COLUMNS = ("midpoint", "slippage", "spread")
+
+# frames that passed validation, by id, held weakly so trusting a frame never keeps it alive
+_trusted: weakref.WeakValueDictionary[int, pd.DataFrame] = weakref.WeakValueDictionary()
+
+
+@functools.cache
+def time_series_schema() -> Any:
+    """The pandera TimeSeries model, pandera is only imported on first use"""
+    import pandera.pandas as pa
+    import pandera.typing.pandas as pat
+
+    class TimeSeries(pa.DataFrameModel):
+        """Price data for a given asset"""
+
+        datetime: pat.Index[pd.Timestamp]
+        open: pat.Series[float]
+        high: pat.Series[float]
+        low: pat.Series[float]
+        close: pat.Series[float]
+        volume: Optional[pat.Series[int]]
+        midpoint: Optional[pat.Series[float]]
+        slippage: Optional[pat.Series[float]]
+        spread: Optional[pat.Series[float]]
+
+    return TimeSeries
+
+
+def trust(df: pd.DataFrame) -> pd.DataFrame:
+    _trusted[id(df)] = df
+    return df
+
+
+def is_trusted(df: pd.DataFrame) -> bool:
+    return _trusted.get(id(df)) is df
+
+
+def check_time_series(df: pd.DataFrame):
+    """Direct dtype, index and NaN checks on the underlying arrays
+
+    Equivalent to the TimeSeries schema, apart from also requiring a sorted index and allowing a
+    timezone aware one.
+    """
+    if not isinstance(df.index, pd.DatetimeIndex):
+        raise BacktesterException(f"expected a DatetimeIndex, got {type(df.index).__name__}")
+    if not df.index.is_monotonic_increasing:
+        raise BacktesterException("index must be sorted in increasing order")
+    missing = [c for c in REQUIRED_COLUMNS if c not in df.columns]
+    if missing:
+        raise BacktesterException(f"columns not found: {missing}")
+    for c in (*REQUIRED_COLUMNS, *(c for c in OPTIONAL_COLUMNS if c in df.columns)):
+        values = df[c].to_numpy()
+        if values.dtype != np.float64:
+            raise BacktesterException(f"column {c} must be float64, got {values.dtype}")
+        if np.isnan(values).any():
+            raise BacktesterException(f"column {c} contains NaN values")
+    if "volume" in df.columns and df["volume"].dtype != np.int64:
+        raise BacktesterException(f"column volume must be int64, got {df['volume'].dtype}")
+
+
+def validate_ts(df: pd.DataFrame, mode: ValidationMode = DEFAULT_VALIDATION) -> pd.DataFrame:
+    """Validate a price frame
+
+    full checks against the pandera schema every time, once runs check_time_series and marks the
+    frame as trusted so it isn't checked again, off skips validation.
+    """
+    if mode == "full":
+        return time_series_schema().validate(df)
+    if mode == "once" and not is_trusted(df):
+        check_time_series(df)
+        trust(df)
+    elif mode not in ("once", "off"):
+        raise BacktesterException(f"unsupported validation mode: {mode}")
+    return df
+
+
+def check_types(fn: F) -> F:
+    """Validates the frame a function takes and returns, according to its validation argument
+
+    Replaces pa.check_types: full validates the input and output every call, once validates an
+    untrusted input and output and trusts them, off does neither.
+    """
+
+    @functools.wraps(fn)
+    def wrapper(df: pd.DataFrame, *args: Any, **kwargs: Any) -> pd.DataFrame:
+        mode = kwargs.get("validation", DEFAULT_VALIDATION)
+        return validate_ts(fn(validate_ts(df, mode), *args, **kwargs), mode)
+
+    return wrapper  # type: ignore[return-value]
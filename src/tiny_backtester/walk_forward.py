@@ -0,0 +1,178 @@
+import logging
+from multiprocessing import get_context
+from multiprocessing.shared_memory import SharedMemory
+from typing import Callable, Hashable, Iterable, NamedTuple, Optional
+import numpy as np
+import pandas as pd
+
+from tiny_backtester.data_store import overlay
+from tiny_backtester.engine import Engine
+from tiny_backtester.strategy import Strategy
+from tiny_backtester.sweep import SharedManifest, SharedMarketData, attach
+from tiny_backtester.utils.backtester_exception import BacktesterException
+from tiny_backtester.utils.backtester_types import MarketData, RunResults
+
+logger = logging.getLogger("tiny_backtester")
+
+
+class Fold(NamedTuple):
+    """Bar positions of a fold, trained on train_start to test_start and tested up to test_stop"""
+
+    train_start: int
+    test_start: int
+    test_stop: int
+
+
+class WalkForwardResults(NamedTuple):
+    folds: list[Fold]
+    results: list[RunResults]
+    equity: pd.DataFrame  # stitched out-of-sample equity of the test windows
+
+
+def make_folds(
+    n_bars: int, train: int, test: int, step: Optional[int] = None, anchored: bool = False
+) -> list[Fold]:
+    """Folds testing test bars after train bars, moving on step bars (default test) each fold
+
+    Rolling folds train on the last train bars, anchored folds on every bar from the first.
+    """
+    step = step or test
+    if train < 1 or test < 1 or step < 1:
+        raise BacktesterException("fold train, test and step lengths must be greater than 0")
+    return [
+        Fold(0 if anchored else start - train, start, min(start + test, n_bars))
+        for start in range(train, n_bars, step)
+    ]
+
+
+def window(
+    market_data: MarketData, start: int, stop: int, tickers: Optional[Iterable[str]] = None
+) -> MarketData:
+    """Zero-copy shallow copies of bars start to stop, columns added to them stay private"""
+    tickers = market_data.keys() if tickers is None else tickers
+    return {t: market_data[t].iloc[start:stop].copy(deep=False) for t in tickers}
+
+
+def stitch_equity(results: list[RunResults], funds: list[float]) -> pd.DataFrame:
+    """Compounds each fold's equity onto the last equity of the previous fold
+
+    Overlapping test windows are cut where the next fold's window starts.
+    """
+    pieces, capital = [], funds[0] if funds else 0.0
+    for i, (r, f) in enumerate(zip(results, funds)):
+        equity = r["equity"]
+        if i + 1 < len(results) and len(results[i + 1]["equity"]):
+            equity = equity[equity.index < results[i + 1]["equity"].index[0]]
+        equity = equity * (capital / f)
+        pieces.append(equity.assign(fold=i))
+        if len(equity):
+            capital = float(equity["equity"].iloc[-1])
+    if not pieces:
+        return pd.DataFrame(columns=["cash", "exposure", "equity", "fold"])
+    return pd.concat(pieces)
+
+
+def precalc_columns(base: MarketData, frames: MarketData) -> MarketData:
+    """The columns of precalculated frames that precalc added or replaced in base"""
+    columns: MarketData = {}
+    for t, df in frames.items():
+        unchanged = [
+            c
+            for c in df.columns
+            if c in base[t] and np.shares_memory(df[c].to_numpy(), base[t][c].to_numpy())
+        ]
+        columns[t] = df.drop(columns=unchanged)
+    return columns
+
+
+def with_columns(base: MarketData, columns: MarketData) -> MarketData:
+    """Zero-copy frames of base with the columns of precalc_columns added back"""
+    merged: MarketData = {}
+    for t, df in base.items():
+        arrays = {c: df[c].to_numpy() for c in df.columns}
+        arrays.update({c: columns[t][c].to_numpy() for c in columns[t].columns})
+        merged[t] = pd.DataFrame(arrays, index=df.index, copy=False)
+    return merged
+
+
+class FoldWorker:
+    """Runs a fold's strategy on a window of the base data or of a shared precalc"""
+
+    def __init__(self, data: list[MarketData], options: Optional[dict]):
+        self.data = data
+        self.options = options
+
+    def __call__(self, task: tuple[Fold, Strategy, int]) -> RunResults:
+        fold, strat, source = task
+        engine = Engine(self.options)
+        engine.market_data = window(
+            self.data[source], fold.train_start, fold.test_stop, strat.tickers
+        )
+        start = fold.test_start - fold.train_start
+        return engine.run(strat, start=start, precalc=source == 0)
+
+
+_worker: Optional[FoldWorker] = None
+_worker_shms: list[SharedMemory] = []
+
+
+def _init_worker(manifests: list[SharedManifest], options: Optional[dict]):
+    """Attaches the base data and the precalc columns of each key, the first manifest is the base"""
+    global _worker
+    data: list[MarketData] = []
+    for manifest in manifests:
+        shm, market_data = attach(manifest)
+        _worker_shms.append(shm)
+        data.append(with_columns(data[0], market_data) if data else market_data)
+    _worker = FoldWorker(data, options)
+
+
+def _run_fold(task: tuple[Fold, Strategy, int]) -> RunResults:
+    assert _worker is not None
+    return _worker(task)
+
+
+def walk_forward(
+    engine: Engine,
+    factory: Callable[[MarketData], Strategy],
+    folds: list[Fold],
+    processes: Optional[int] = None,
+) -> WalkForwardResults:
+    """Run factory(training data) on the test window of every fold
+
+    factory gets zero-copy views of the fold's training bars and mustn't modify them. Each fold
+    runs with its training bars as history, precalc runs on the fold's window unless the strategy
+    has a precalc_key, then it runs once over the whole data for each key and folds share it.
+    Folds run on a pool attached to one shared copy of the data, processes=0 runs them in the
+    calling process.
+    """
+    strategies = [factory(window(engine.market_data, f.train_start, f.test_start)) for f in folds]
+    funds = [float(s.funds) for s in strategies]
+    data, sources = [engine.market_data], {}
+    tasks = []
+    for fold, strat in zip(folds, strategies):
+        key: Optional[Hashable] = strat.precalc_key()
+        if key is not None and key not in sources:
+            sources[key] = len(data)
+            frames = overlay(engine.market_data)
+            strat.precalc(frames)
+            data.append(frames)
+        tasks.append((fold, strat, sources.get(key, 0) if key is not None else 0))
+    logger.debug(f"walk forward over {len(folds)} folds, {len(sources)} shared precalcs")
+
+    if processes == 0:
+        results = list(map(FoldWorker(data, engine.options), tasks))
+    else:
+        # the base data is shared once, each key only shares the columns its precalc added
+        shared: list[SharedMarketData] = []
+        try:
+            shared.append(SharedMarketData(engine.market_data))
+            for frames in data[1:]:
+                shared.append(SharedMarketData(precalc_columns(engine.market_data, frames)))
+            manifests = [s.manifest for s in shared]
+            with get_context().Pool(processes, _init_worker, (manifests, engine.options)) as pool:
+                results = pool.map(_run_fold, tasks)
+        finally:
+            for s in shared:
+                s.close()
+    return WalkForwardResults(folds, results, stitch_equity(results, funds))
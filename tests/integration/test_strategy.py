@@ -39,7 +39,8 @@ def test_load_and_run_strategy():
     ]
 
     results = engine.run(strat=TestStrategy())
-    assert "TEST_COLUMN" in engine.market_data["TEST"].columns
+    # precalc writes to a private overlay, the loaded data is left as it was
+    assert "TEST_COLUMN" not in engine.market_data["TEST"].columns
     assert "positions" in results
     assert "orders" in results
     assert len(results["positions"]) == 1
@@ -0,0 +1,95 @@
+import numpy as np
+import pytest
+from pandas.testing import assert_frame_equal
+from tests.test_utils import get_random_df, get_test_signal_strategy
+from tiny_backtester.engine import Engine
+from tiny_backtester.utils import accounting
+from tiny_backtester.utils.accounting import (
+    fill_orders,
+    fill_orders_compiled,
+    get_backend,
+    numba_available,
+    track_positions,
+    track_positions_compiled,
+)
+from tiny_backtester.utils.backtester_exception import BacktesterException
+
+# the kernels run as plain Python everywhere, and compiled as well where numba is installed
+COMPILE = [
+    False,
+    pytest.param(True, marks=pytest.mark.skipif(not numba_available(), reason="numba")),
+]
+
+
+def get_book(seed: int, target: bool, n_tickers: int = 3, n_epochs: int = 300):
+    rng = np.random.default_rng(seed)
+    low, high = (-2, 6) if target else (-3, 4)
+    signals = rng.integers(low, high, (n_tickers, n_epochs))
+    sell = rng.uniform(5, 50, (n_tickers, n_epochs))
+    buy = sell + rng.uniform(0, 0.5, (n_tickers, n_epochs))
+    holdings = rng.integers(0, 3, n_tickers)
+    return signals, buy, sell, float(rng.uniform(100, 5000)), holdings, target
+
+
+def assert_fills_equal(expected, actual):
+    for name, e, a in zip(expected._fields, expected, actual):
+        if isinstance(e, np.ndarray):
+            assert e.dtype == a.dtype, name
+            np.testing.assert_array_equal(e, a, err_msg=name)
+        else:
+            assert e == a, name
+
+
+@pytest.mark.parametrize("compile", COMPILE)
+@pytest.mark.parametrize("seed", range(4))
+@pytest.mark.parametrize("target", [False, True])
+def test_fill_orders_kernel_identical(compile, seed, target):
+    book = get_book(seed, target)
+    expected = fill_orders(*book)
+    assert (~expected.filled).any() and expected.filled.any()
+    assert_fills_equal(expected, fill_orders_compiled(*book, compile=compile))
+
+
+@pytest.mark.parametrize("compile", COMPILE)
+def test_track_positions_kernel_identical(compile):
+    signals, buy, sell, funds, _, _ = get_book(0, False)
+    fills = fill_orders(signals, buy, sell, funds, np.zeros(3, dtype=np.int64), False)
+    for k in range(3):
+        mask = fills.filled & (fills.code == k)
+        expected = track_positions(fills.quantity[mask], fills.price[mask])
+        actual = track_positions_compiled(fills.quantity[mask], fills.price[mask], compile)
+        for e, a in zip(expected, actual):
+            np.testing.assert_array_equal(e, a)
+
+
+@pytest.mark.parametrize("compile", COMPILE)
+def test_run_signals_backends_identical(compile, monkeypatch):
+    rng = np.random.default_rng(3)
+    signals = {"A": rng.integers(-2, 4, 200), "B": rng.integers(-3, 3, 200)}
+    if not compile:
+        monkeypatch.setattr(accounting, "jit", lambda kernel: kernel)
+    results = []
+    for backend in ("python", "numba"):
+        engine = Engine({"slippage": True})
+        engine.backend = backend
+        for i, t in enumerate(signals):
+            engine.load_ts(t, get_random_df(200, seed=i))
+        strat = get_test_signal_strategy(signals, 5e3)
+        results.append((engine.run_signals(strat), strat))
+    (expected, expected_strat), (actual, actual_strat) = results
+    assert_frame_equal(expected["orders"], actual["orders"])
+    for t in signals:
+        assert_frame_equal(expected["positions"][t], actual["positions"][t])
+    assert_frame_equal(expected["equity"], actual["equity"])
+    assert expected_strat.funds == actual_strat.funds
+    assert expected_strat.portfolio == actual_strat.portfolio
+
+
+def test_get_backend():
+    assert get_backend() == get_backend("auto") == ("numba" if numba_available() else "python")
+    assert get_backend("python") == Engine({"backend": "python"}).backend == "python"
+    with pytest.raises(BacktesterException, match="unknown accounting backend"):
+        Engine({"backend": "cython"})
+    if not numba_available():
+        with pytest.raises(BacktesterException, match="needs numba installed"):
+            get_backend("numba")
@@ -0,0 +1,110 @@
+from collections import deque
+import numpy as np
+import pandas as pd
+from tests.test_utils import get_random_df, get_test_signal_strategy
+from tiny_backtester.analytics import (
+    drawdowns,
+    get_trades,
+    round_trips,
+    score,
+    score_many,
+    sharpe_ratio,
+    sortino_ratio,
+)
+from tiny_backtester.engine import Engine
+from tiny_backtester.equity import Trades
+
+
+def brute_force_round_trips(trades: Trades, opening: dict) -> list[tuple]:
+    lots = {t: deque([[q, np.nan]]) for t, q in opening.items() if q > 0}
+    trips = []
+    for t, q, p in zip(trades.ticker, trades.quantity, trades.price):
+        if q > 0:
+            lots.setdefault(t, deque()).append([q, p])
+            continue
+        q = -q
+        while q and lots.get(t):
+            lot = lots[t][0]
+            n = min(q, lot[0])
+            trips.append((t, n, lot[1], p))
+            lot[0] -= n
+            q -= n
+            if not lot[0]:
+                lots[t].popleft()
+    return sorted(trips, key=lambda trip: trip[0])  # stable within each ticker
+
+
+def test_round_trips_fifo():
+    rng = np.random.default_rng(0)
+    n = 200
+    tickers = rng.choice(np.array(["A", "B", "C"], dtype=object), n)
+    quantity = rng.integers(1, 10, n) * rng.choice([1, -1], n)
+    opening = {"A": 4, "B": 0, "C": 7}
+    held = dict(opening)
+    for i, t in enumerate(tickers):  # sells never exceed holdings, like the engine
+        quantity[i] = max(quantity[i], -held[t])
+        held[t] += quantity[i]
+    trades = Trades(np.arange(n, dtype=np.int64), tickers, quantity, rng.uniform(5, 15, n))
+    trips = round_trips(trades, opening=np.array([4, 0, 7]))
+    expected = brute_force_round_trips(trades, opening)
+    names = np.array(["A", "B", "C"])[trips.group]
+    actual = list(zip(names, trips.quantity, trips.entry_price, trips.exit_price))
+    assert len(actual) == len(expected)
+    for a, e in zip(actual, expected):
+        assert a[:2] == e[:2]
+        np.testing.assert_equal(a[2:], e[2:])
+    closed = ~np.isnan(trips.pnl)
+    assert np.allclose(
+        trips.pnl[closed], (trips.quantity * (trips.exit_price - trips.entry_price))[closed]
+    )
+
+
+def test_equity_metrics():
+    equity = np.array([[100.0, 110, 99, 104, 121, 120], [100, 100, 100, 100, 100, 100]])
+    max_drawdown, duration = drawdowns(equity)
+    assert np.allclose(max_drawdown, [0.1, 0])
+    assert duration.tolist() == [2, 0]
+    returns = equity[:, 1:] / equity[:, :-1] - 1
+    sharpe = sharpe_ratio(returns, 252)
+    assert np.isclose(sharpe[0], returns[0].mean() / returns[0].std(ddof=1) * np.sqrt(252))
+    assert np.isnan(sharpe[1])
+    downside = np.sqrt(np.mean(np.minimum(returns[0], 0) ** 2))
+    assert np.isclose(sortino_ratio(returns, 252)[0], returns[0].mean() / downside * np.sqrt(252))
+
+
+def run_signal(seed: int) -> dict:
+    engine = Engine()
+    engine.load_ts("A", get_random_df(100, seed=1))
+    engine.load_ts("B", get_random_df(100, seed=2))
+    rng = np.random.default_rng(seed)
+    signals = {"A": rng.integers(-1, 3, 100), "B": rng.integers(-2, 2, 100)}
+    return engine.run(get_test_signal_strategy(signals, 5000))
+
+
+def test_score_run():
+    results = run_signal(0)
+    metrics = score(results, periods=252)
+    equity = results["equity"]["equity"].to_numpy()
+    returns = equity[1:] / equity[:-1] - 1
+    assert np.isclose(metrics["total_return"], equity[-1] / equity[0] - 1)
+    assert np.isclose(metrics["sharpe"], returns.mean() / returns.std(ddof=1) * np.sqrt(252))
+    assert np.isclose(metrics["max_drawdown"], np.max(1 - equity / np.maximum.accumulate(equity)))
+    trades = get_trades(results["orders"])
+    expected = brute_force_round_trips(trades, {})
+    pnl = np.array([q * (exit - entry) for _, q, entry, exit in expected])
+    assert metrics["round_trips"] == len(expected)
+    assert np.isclose(metrics["hit_rate"], np.mean(pnl > 0))
+    assert np.isclose(metrics["realised_pnl"], pnl.sum())
+    traded = np.abs(trades.quantity * trades.price).sum()
+    assert np.isclose(metrics["turnover"], traded / equity.mean())
+
+
+def test_score_many_matches_score():
+    results = [run_signal(seed) for seed in range(4)]
+    results[2]["equity"] = results[2]["equity"].iloc[:60]  # scored apart from the others
+    batch = score_many(results)
+    assert len(batch) == 4
+    for i, r in enumerate(results):
+        pd.testing.assert_series_equal(
+            batch.iloc[i], pd.Series(score(r)), check_names=False, check_dtype=False
+        )
@@ -0,0 +1,38 @@
+import json
+from pandas.testing import assert_frame_equal
+from benchmarks.bench import BENCHMARKS, compare, main, run_benchmarks
+from tiny_backtester.utils.synthetic import synthetic_market, synthetic_ohlcv
+
+
+def test_synthetic_ohlcv_deterministic():
+    assert_frame_equal(synthetic_ohlcv(100, seed=1), synthetic_ohlcv(100, seed=1))
+    df = synthetic_ohlcv(100)
+    assert (df["high"] >= df[["open", "close"]].max(axis=1)).all()
+    assert (df["low"] <= df[["open", "close"]].min(axis=1)).all()
+    assert list(synthetic_market(3, 10)) == ["T0000", "T0001", "T0002"]
+
+
+def test_run_benchmarks():
+    results = run_benchmarks(2, 200, repeat=1)
+    assert set(results["results"]) == set(BENCHMARKS)
+    for row in results["results"].values():
+        assert row["bars_per_sec"] > 0
+        assert row["peak_memory_bytes"] >= 0
+
+
+def test_compare():
+    baseline = {"results": {"a": {"bars_per_sec": 100.0, "peak_memory_bytes": 1000}}}
+    same = {"results": {"a": {"bars_per_sec": 90.0, "peak_memory_bytes": 1100}}}
+    assert compare(same, baseline, 0.2) == []
+    slower = {"results": {"a": {"bars_per_sec": 50.0, "peak_memory_bytes": 5000}}}
+    assert len(compare(slower, baseline, 0.2)) == 2
+
+
+def test_main_baseline_regression(tmp_path):
+    output = tmp_path / "bench.json"
+    args = ["--tickers", "1", "--bars", "200", "--repeat", "1", "--only", "process_df"]
+    assert main([*args, "--output", str(output)]) == 0
+    baseline = json.loads(output.read_text())
+    baseline["results"]["process_df"]["bars_per_sec"] *= 1000
+    output.write_text(json.dumps(baseline))
+    assert main([*args, "--baseline", str(output)]) == 1
@@ -0,0 +1,98 @@
+import os
+import numpy as np
+import pytest
+from pandas.testing import assert_frame_equal
+from tests.test_utils import get_df_input, get_random_df
+from tiny_backtester import engine as engine_module
+from tiny_backtester.cache import TimeSeriesCache
+from tiny_backtester.engine import Engine
+from tiny_backtester.utils.math_utils import process_df
+
+
+def test_cache_round_trip(tmp_path):
+    cache = TimeSeriesCache(tmp_path)
+    df = get_random_df(50)
+    key = cache.key(df)
+    assert cache.get(key) is None
+    processed = process_df(df)
+    assert cache.put(key, processed)
+    cached = cache.get(key)
+    assert cached is not None
+    assert_frame_equal(cached, processed, check_freq=False)
+    base = cached["close"].to_numpy()
+    while not isinstance(base, np.memmap) and isinstance(base.base, np.ndarray):
+        base = base.base
+    assert isinstance(base, np.memmap)
+    with pytest.raises(ValueError):
+        cached["close"].to_numpy()[0] = 1.0
+
+
+def test_cache_key():
+    cache_key = TimeSeriesCache.key
+    df = get_df_input()
+    assert cache_key(df) == cache_key(get_df_input())
+    assert cache_key(df) != cache_key(df, "continuous_24_7", "30min")
+    changed = get_df_input()
+    changed.iloc[0, 0] = 10.0
+    assert cache_key(df) != cache_key(changed)
+
+
+def test_cache_eviction(tmp_path):
+    cache = TimeSeriesCache(tmp_path)
+    frames = [process_df(get_random_df(100, seed=i)) for i in range(3)]
+    keys = [cache.key(df) for df in frames]
+    for i, (key, df) in enumerate(zip(keys, frames)):
+        cache.put(key, df)
+        os.utime(tmp_path / key / "manifest.json", (i, i))
+    size = max(e[2] for e in cache.entries())
+    cache.max_bytes = 2 * size
+    cache.evict()
+    assert [e[0] for e in cache.entries()] == keys[1:]
+
+
+def test_cache_keeps_new_entry(tmp_path):
+    cache = TimeSeriesCache(tmp_path, max_bytes=1)
+    frames = [process_df(get_random_df(10, seed=i)) for i in range(2)]
+    keys = [cache.key(df) for df in frames]
+    for key, df in zip(keys, frames):
+        assert cache.put(key, df)
+    assert [e[0] for e in cache.entries()] == keys[1:]
+
+
+def test_cache_entry_evicted_while_reading(tmp_path):
+    cache = TimeSeriesCache(tmp_path)
+    df = process_df(get_random_df(10))
+    key = cache.key(df)
+    cache.put(key, df)
+    os.remove(tmp_path / key / "0.npy")  # removed by another process after the manifest
+    assert cache.get(key) is None
+
+
+def test_cache_invalidate(tmp_path):
+    cache = TimeSeriesCache(tmp_path)
+    frames = [process_df(get_random_df(10, seed=i)) for i in range(2)]
+    keys = [cache.key(df) for df in frames]
+    for key, df in zip(keys, frames):
+        cache.put(key, df)
+    cache.invalidate(keys[0])
+    assert cache.get(keys[0]) is None
+    assert cache.get(keys[1]) is not None
+    cache.invalidate()
+    assert cache.entries() == []
+
+
+def test_load_ts_cached(tmp_path, monkeypatch):
+    calls = []
+
+    def counting_process_df(*args, **kwargs):
+        calls.append(args)
+        return process_df(*args, **kwargs)
+
+    monkeypatch.setattr(engine_module, "process_df", counting_process_df)
+    df = get_random_df(50)
+    cold = Engine(cache=TimeSeriesCache(tmp_path))
+    cold.load_ts("TEST", df)
+    warm = Engine(cache=TimeSeriesCache(tmp_path))
+    warm.load_ts("TEST", df)
+    assert len(calls) == 1
+    assert_frame_equal(cold.market_data["TEST"], warm.market_data["TEST"], check_freq=False)
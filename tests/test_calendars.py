@@ -0,0 +1,107 @@
+import numpy as np
+import pandas as pd
+from pandas.testing import assert_frame_equal
+from tests.test_utils import get_random_df
+from tiny_backtester.utils import calendars
+from tiny_backtester.utils.calendars import get_buckets, get_sessions, resample_sessions
+from tiny_backtester.utils.math_utils import process_df
+
+
+def get_minute_bars(start: str, periods: int, tz="America/New_York") -> pd.DataFrame:
+    df = process_df(get_random_df(periods))
+    df.index = pd.date_range(start, periods=periods, freq="min", tz=tz, name="datetime")
+    return df
+
+
+def reference_resample(df: pd.DataFrame, freq: str, offset: str) -> pd.DataFrame:
+    agg = {c: "mean" for c in df.columns}
+    agg.update(open="first", high="max", low="min", close="last", volume="sum")
+    return df.resample(freq, offset=offset).agg(agg).dropna()
+
+
+def test_exchange_sessions():
+    sessions = get_sessions("exchange_hours", 2024, 2024)
+    assert len(sessions.opens) == 252
+    opens = pd.DatetimeIndex(sessions.opens).tz_localize("UTC").tz_convert("America/New_York")
+    assert (opens.strftime("%H:%M") == "09:30").all()
+    assert pd.Timestamp("2024-03-29") not in opens.normalize().tz_localize(None)
+    assert np.all(sessions.closes - sessions.opens == pd.Timedelta("6.5h").value)
+
+
+def test_new_years_day_observance():
+    holidays = calendars.NYSEHolidayCalendar().holidays("2021-06-01", "2023-06-01")
+    assert pd.Timestamp("2021-12-31") not in holidays
+    assert pd.Timestamp("2023-01-02") in holidays
+    assert pd.Timestamp("2022-07-04") in holidays
+
+
+def test_sessions_cached():
+    calendars.clear_session_cache()
+    sessions = get_sessions("extended_hours", 2020, 2021)
+    assert get_sessions("extended_hours", 2021, 2021) is sessions
+    extended = get_sessions("extended_hours", 2022, 2022)
+    assert len(extended.opens) > len(sessions.opens)
+    starts, ends = get_buckets("extended_hours", 2020, 2022, pd.Timedelta("1h").value)
+    assert get_buckets("extended_hours", 2021, 2022, pd.Timedelta("1h").value)[0] is starts
+    assert np.all(ends - starts == pd.Timedelta("1h").value)
+
+
+def test_bucket_cache_bounded(monkeypatch):
+    calendars.clear_session_cache()
+    monkeypatch.setattr(calendars, "MAX_BUCKETS", 2)
+    hour = pd.Timedelta("1h").value
+    starts = get_buckets("exchange_hours", 2024, 2024, hour)[0]
+    for step in (2 * hour, hour, 3 * hour):
+        get_buckets("exchange_hours", 2024, 2024, step)
+    assert get_buckets("exchange_hours", 2024, 2024, hour)[0] is starts
+    assert list(calendars._buckets) == [("exchange_hours", 3 * hour), ("exchange_hours", hour)]
+
+
+def test_resample_exchange_hours_hourly():
+    # two days of minute bars from 4am, hourly buckets start at the 9:30 open
+    df = pd.concat(
+        [get_minute_bars("2024-01-02 04:00", 16 * 60), get_minute_bars("2024-01-03 04:00", 16 * 60)]
+    )
+    actual = resample_sessions(df, "exchange_hours", "1h")
+    in_session = df[
+        (df.index.strftime("%H:%M") >= "09:30") & (df.index.strftime("%H:%M") < "16:00")
+    ]
+    expected = reference_resample(in_session, "1h", "30min")
+    assert len(actual) == 14
+    assert_frame_equal(actual, expected, check_freq=False)
+
+
+def test_resample_exchange_hours_daily():
+    df = get_minute_bars("2024-07-03 09:00", 3 * 24 * 60)  # closed on the 4th of July
+    actual = resample_sessions(df, "exchange_hours", "D")
+    assert actual.index.strftime("%m-%d %H:%M").tolist() == ["07-03 09:30", "07-05 09:30"]
+    first = df.loc["2024-07-03 09:30":"2024-07-03 15:59"]
+    assert actual["open"].iloc[0] == first["open"].iloc[0]
+    assert actual["close"].iloc[0] == first["close"].iloc[-1]
+    assert actual["volume"].iloc[0] == first["volume"].sum()
+    assert np.isclose(actual["spread"].iloc[0], first["spread"].mean())
+
+
+def test_resample_24_5_drops_weekends():
+    df = get_minute_bars("2024-01-05 00:00", 4 * 24 * 60, tz=None)  # friday to monday
+    actual = process_df(df, "continous_24_5", "D")
+    assert actual.index.strftime("%a").tolist() == ["Fri", "Mon"]
+    assert actual["volume"].tolist() == [
+        df.loc["2024-01-05", "volume"].sum(),
+        df.loc["2024-01-08", "volume"].sum(),
+    ]
+
+
+def test_resample_sessions_upsample():
+    df = get_minute_bars("2024-01-02 09:30", 24 * 60)
+    hourly = resample_sessions(df, "exchange_hours", "1h")
+    actual = resample_sessions(hourly, "exchange_hours", "30min")
+    assert actual.index[0] == hourly.index[0]
+    assert actual.index[-1] == hourly.index[-1]
+    assert_frame_equal(actual.iloc[::2], hourly.iloc[: len(actual.iloc[::2])], check_freq=False)
+    assert (actual.index.strftime("%H:%M") < "16:00").all()
+
+
+def test_resample_sessions_outside():
+    df = get_minute_bars("2024-01-06 09:30", 60)  # a saturday
+    assert len(resample_sessions(df, "exchange_hours", "1h")) == 0
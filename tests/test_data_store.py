@@ -0,0 +1,103 @@
+import numpy as np
+import pandas as pd
+import pytest
+from pandas.testing import assert_frame_equal
+from tests.test_utils import get_full_df, get_test_market_data_precalc
+from tiny_backtester.data_store import FrameView, MarketStore, TickerData, latest_bar
+from tiny_backtester.engine import Engine
+from tiny_backtester.strategy import Strategy
+from tiny_backtester.utils.backtester_types import MarketData, Order
+from tiny_backtester.utils.math_utils import get_execution_price
+
+
+def test_ticker_data_round_trip():
+    df = get_full_df()
+    data = TickerData.from_frame(df)
+    assert len(data) == 4
+    assert data.index.dtype == np.int64
+    assert_frame_equal(data.to_frame(), df, check_freq=False)
+
+
+def test_ticker_data_read_only():
+    data = TickerData.from_frame(get_full_df())
+    with pytest.raises(ValueError):
+        data.columns["close"][0] = 10.0
+    with pytest.raises(ValueError):
+        data.view(2)["close"][0] = 10.0
+
+
+def test_ticker_view():
+    df = get_full_df()
+    view = MarketStore.from_frames({"TEST": df}).view(2)["TEST"]
+    assert len(view) == 2
+    np.testing.assert_array_equal(view["close"], [1.0, 2.0])
+    assert view.latest("close") == 2.0
+    assert view.time == df.index[1]
+    assert view.bar().name == df.index[1]
+    assert_frame_equal(view.to_frame(), df.iloc[:2], check_freq=False)
+
+
+def test_lookback_window():
+    df = get_full_df()
+    view = MarketStore.from_frames({"TEST": df}).view(3, lookback=2)["TEST"]
+    assert len(view) == 2 and view.end == 3
+    np.testing.assert_array_equal(view["close"], [2.0, 3.0])
+    assert view["close"].base is not None  # a view of the stored column, not a copy
+    assert view.bar(0).name == df.index[1] and view.bar().name == df.index[2]
+    assert view.latest("close") == 3.0
+    assert_frame_equal(view.to_frame(), df.iloc[1:3], check_freq=False)
+    assert len(view.history()) == 3
+    assert len(MarketStore.from_frames({"TEST": df}).view(1, lookback=2)["TEST"]) == 1
+    frames = FrameView({"TEST": df}, 3, lookback=2)
+    assert_frame_equal(frames["TEST"], df.iloc[1:3])
+    assert_frame_equal(frames.history("TEST"), df.iloc[:3])
+
+
+def test_bar_execution_price_matches_series():
+    market_data = get_test_market_data_precalc("TEST")
+    bar = MarketStore.from_frames(market_data).view(3)["TEST"].bar()
+    row = latest_bar(market_data["TEST"].iloc[:3])
+    for order_type in ("buy", "sell"):
+        for slippage in (True, False):
+            assert get_execution_price(order_type, bar, slippage) == get_execution_price(
+                order_type, row, slippage
+            )
+
+
+def test_frame_view():
+    df = get_full_df()
+    view = FrameView({"TEST": df}, 3)
+    assert list(view) == ["TEST"]
+    assert_frame_equal(view["TEST"], df.iloc[:3])
+    assert view["TEST"] is view["TEST"]
+
+
+def test_run_columnar_matches_dataframe():
+    class DataFrameStrategy(Strategy):
+        tickers = {"TEST"}
+
+        def precalc(self, data: MarketData):
+            data["TEST"]["signal"] = np.arange(len(data["TEST"])) % 2
+
+        def run(self, data):
+            if data["TEST"].iloc[-1]["signal"]:
+                return [Order("TEST", "sell", 1)]
+            return [Order("TEST", "buy", 1)]
+
+    class ColumnarStrategy(DataFrameStrategy):
+        columnar = True
+
+        def run(self, data):
+            if data["TEST"].latest("signal"):
+                return [Order("TEST", "sell", 1)]
+            return [Order("TEST", "buy", 1)]
+
+    results = []
+    for strat in (DataFrameStrategy(), ColumnarStrategy()):
+        strat.portfolio = {"TEST": 0}
+        engine = Engine()
+        engine.market_data = get_test_market_data_precalc("TEST")
+        results.append(engine.run(strat))
+    assert_frame_equal(results[0]["orders"], results[1]["orders"])
+    assert_frame_equal(results[0]["positions"]["TEST"], results[1]["positions"]["TEST"])
+    assert pd.api.types.is_datetime64_any_dtype(results[1]["orders"]["time"])
@@ -1,14 +1,18 @@
+from concurrent.futures import ThreadPoolExecutor
 import pandas as pd
 import numpy as np
 from tests.test_utils import (
     get_latest_df,
     get_df_input,
+    get_random_df,
     get_test_market_data_precalc,
+    get_test_signal_strategy,
     get_test_strategy,
 )
 from tiny_backtester.utils.backtester_exception import BacktesterException
-from tiny_backtester.utils.backtester_types import ExecutedOrder, Order, Position
+from tiny_backtester.utils.backtester_types import ExecutedOrder, MarketData, Order, Position
 from tiny_backtester.engine import Engine
+from tiny_backtester.strategy import SignalStrategy, Strategy
 from pandas.testing import assert_frame_equal
 import pytest
 
@@ -226,3 +230,275 @@ def load_ts_valid():
     assert_frame_equal(
         engine.market_data["TEST"], get_test_market_data_precalc("TEST")["TEST"], check_exact=True
     )
+
+
+def run_both(signals, funds, signal_type="order", options=None):
+    results = []
+    for run in ("run", "run_signals"):
+        engine = Engine(options)
+        for i, t in enumerate(signals):
+            engine.load_ts(t, get_random_df(len(signals[t]), seed=i))
+        strategy = get_test_signal_strategy(signals, funds, signal_type)
+        results.append((getattr(engine, run)(strategy), strategy))
+    (expected, expected_strat), (actual, actual_strat) = results
+    assert_frame_equal(expected["orders"], actual["orders"])
+    assert expected["positions"].keys() == actual["positions"].keys()
+    for t in expected["positions"]:
+        assert_frame_equal(expected["positions"][t], actual["positions"][t])
+    assert_frame_equal(expected["equity"], actual["equity"])
+    assert expected_strat.funds == actual_strat.funds
+    for t in signals:
+        assert expected_strat.portfolio[t] == actual_strat.portfolio[t]
+    return actual
+
+
+def test_run_signals_orders_matches_run():
+    rng = np.random.default_rng(1)
+    signals = {"A": rng.integers(-2, 4, 200), "B": rng.integers(-3, 3, 200)}
+    results = run_both(signals, 1e9, options={"slippage": True})
+    assert (results["orders"]["status"] == "rejected").any()  # sells without holdings
+
+
+def test_run_signals_no_rejections_matches_run():
+    signals = {"A": np.tile([1, 0, -1, 0], 50)}
+    results = run_both(signals, 1e9)
+    assert (results["orders"]["status"] == "filled").all()
+
+
+def test_run_signals_insufficient_funds_matches_run():
+    rng = np.random.default_rng(2)
+    signals = {"A": rng.integers(0, 5, 300), "B": rng.integers(-1, 3, 300)}
+    results = run_both(signals, 2000)
+    assert (results["orders"]["status"] == "rejected").any()
+
+
+def test_run_signals_target_matches_run():
+    rng = np.random.default_rng(3)
+    signals = {"A": rng.integers(0, 10, 200), "B": np.repeat(rng.integers(0, 5, 20), 10)}
+    run_both(signals, 1e9, "target")
+    run_both(signals, 3000, "target")
+
+
+def test_run_signals_unequal_lengths_matches_run():
+    rng = np.random.default_rng(4)
+    signals = {"A": rng.integers(-1, 3, 50), "B": rng.integers(-1, 3, 40)}
+    results = run_both(signals, 1e9)
+    assert results["orders"]["time"].max() <= get_random_df(40).index[-1]
+
+
+def test_run_signals_no_orders():
+    results = run_both({"A": np.zeros(10, dtype=np.int64)}, 100)
+    assert len(results["orders"]) == 0
+    assert len(results["positions"]["A"]) == 1
+
+
+def test_run_signals_invalid_signal():
+    engine = Engine()
+    engine.load_ts("A", get_random_df(10))
+    with pytest.raises(BacktesterException, match="signal for A must be an integer array"):
+        engine.run_signals(get_test_signal_strategy({"A": np.zeros(10)}, 100))
+    with pytest.raises(BacktesterException, match="must provide a signal for every bar of A"):
+        engine.run_signals(get_test_signal_strategy({"A": np.zeros(5, dtype=int)}, 100))
+
+
+class OverwritingSignal(SignalStrategy):
+    """Replaces close and adds a column in precalc, trades on the sign of its change"""
+
+    def __init__(self, scale: float):
+        super().__init__()
+        self.tickers = {"A"}
+        self.scale = scale
+
+    def precalc(self, data: MarketData):
+        df = data["A"]
+        df["close"] = df["close"] * self.scale
+        df["change"] = df["close"].diff().fillna(0)
+
+    def signals(self, data):
+        return {"A": np.sign(data["A"].columns["change"]).astype(np.int64)}
+
+
+def test_precalc_overlay_isolated():
+    engine = Engine()
+    engine.load_ts("A", get_random_df(100))
+    base = engine.market_data["A"]
+    close = base["close"].to_numpy().copy()
+    first = engine.run(OverwritingSignal(2.0))
+    second = engine.run(OverwritingSignal(2.0))
+    assert engine.market_data["A"] is base
+    assert "change" not in base
+    np.testing.assert_array_equal(base["close"], close)
+    assert_frame_equal(first["orders"], second["orders"])
+    with pytest.raises(ValueError, match="read-only"):
+        base.loc[base.index[0], "close"] = 0.0
+
+
+def test_runs_share_loaded_data_across_threads():
+    engine = Engine()
+    engine.load_ts("A", get_random_df(200))
+    expected = [engine.run(OverwritingSignal(s))["orders"] for s in (1.0, -1.0)]
+
+    def run(scale: float) -> pd.DataFrame:
+        worker = Engine()
+        worker.market_data = engine.market_data  # shared, not copied
+        return worker.run(OverwritingSignal(scale))["orders"]
+
+    with ThreadPoolExecutor(4) as pool:
+        actual = list(pool.map(run, [1.0, -1.0] * 4))
+    for i, orders in enumerate(actual):
+        assert_frame_equal(orders, expected[i % 2])
+    assert list(engine.market_data["A"].columns) == list(get_random_df(1).columns) + [
+        "midpoint",
+        "slippage",
+        "spread",
+    ]
+
+
+class RestingDipBuyer(Strategy):
+    """Rests limit buys under the close and sells its holding every seventh bar"""
+
+    columnar = False
+
+    def __init__(self, ticker: str, dip: float, shared: bool = False):
+        super().__init__()
+        self.tickers = {ticker}
+        self.dip = dip
+        self.shared = shared
+
+    def precalc(self, data: MarketData):
+        for df in data.values():
+            df["dip"] = df["close"] - self.dip
+
+    def precalc_key(self):
+        return ("dip", self.dip) if self.shared else None
+
+    def run(self, data: MarketData):
+        (t,) = self.tickers
+        df = data[t]
+        orders = [Order(t, "buy", 1, limit_price=df["dip"].iloc[-1], good_for=5)]
+        if len(df) % 7 == 0 and self.portfolio[t]:
+            orders.append(Order(t, "sell", self.portfolio[t]))
+        return orders
+
+
+def get_many_strategies() -> list[Strategy]:
+    return [
+        OverwritingSignal(1.0),
+        OverwritingSignal(-1.0),
+        RestingDipBuyer("A", 0.5, shared=True),
+        RestingDipBuyer("B", 0.5, shared=True),
+        RestingDipBuyer("B", 1.0),
+    ]
+
+
+class TickerMovingAverage(Strategy):
+    """Buys its ticker above a moving average its precalc only adds to its own tickers"""
+
+    columnar = False
+
+    def __init__(self, ticker: str, window: int):
+        super().__init__()
+        self.tickers = {ticker}
+        self.window = window
+
+    def precalc(self, data: MarketData):
+        for t in self.tickers:
+            data[t]["ma"] = data[t]["close"].rolling(self.window).mean()
+
+    def precalc_key(self):
+        return ("ma", self.window)
+
+    def run(self, data: MarketData):
+        (t,) = self.tickers
+        row = data[t].iloc[-1]
+        return [Order(t, "buy", 1)] if row["close"] > row["ma"] else []
+
+
+def test_run_many_precalc_key_with_different_tickers():
+    engine = Engine()
+    engine.load_ts("A", get_random_df(60, seed=1))
+    engine.load_ts("B", get_random_df(60, seed=2))
+    expected = [engine.run(TickerMovingAverage(t, 5)) for t in ("A", "B")]
+    actual = engine.run_many([TickerMovingAverage("A", 5), TickerMovingAverage("B", 5)])
+    for e, a in zip(expected, actual):
+        assert_frame_equal(e["orders"], a["orders"])
+        assert_frame_equal(e["equity"], a["equity"])
+    assert (actual[1]["orders"]["status"] == "filled").any()
+
+
+@pytest.mark.parametrize("threads, processes", [(0, 0), (3, 0), (0, 2)])
+def test_run_many_matches_run(threads, processes):
+    engine = Engine()
+    engine.load_ts("A", get_random_df(120, seed=1))
+    engine.load_ts("B", get_random_df(100, seed=2))
+    expected = [(engine.run(s), s) for s in get_many_strategies()]
+    strategies = get_many_strategies()
+    actual = engine.run_many(strategies, threads=threads, processes=processes)
+    assert len(actual) == len(expected)
+    for (e, e_strat), a, a_strat in zip(expected, actual, strategies):
+        assert_frame_equal(e["orders"], a["orders"])
+        for t in e["positions"]:
+            assert_frame_equal(e["positions"][t], a["positions"][t])
+        assert_frame_equal(e["equity"], a["equity"])
+        if not processes:
+            assert e_strat.funds == a_strat.funds
+            assert e_strat.portfolio == a_strat.portfolio
+    assert (expected[2][0]["orders"]["status"] == "filled").any()
+    assert "dip" not in engine.market_data["A"]
+    assert engine.run_many(get_many_strategies()[:1], n_epochs=10)[0]["equity"].shape[0] == 10
+
+
+class RecentMean(Strategy):
+    """Buys below and sells above the mean of the last n closes, recording the bars it gets"""
+
+    def __init__(self, n: int, columnar: bool, lookback: bool):
+        super().__init__()
+        self.tickers = {"A", "B"}
+        self.n = n
+        self.columnar = columnar
+        self.lookback = n if lookback else None
+        self.seen: list[int] = []
+
+    def precalc(self, data: MarketData):
+        pass
+
+    def run(self, data):
+        orders = []
+        for t in sorted(data):
+            close = data[t]["close"]
+            self.seen.append(len(close))
+            recent = np.asarray(close)[-self.n :]
+            if recent[-1] < recent.mean():
+                orders.append(Order(t, "buy", 1))
+            elif self.portfolio[t]:
+                orders.append(Order(t, "sell", 1))
+        return orders
+
+
+@pytest.mark.parametrize("columnar", [False, True])
+@pytest.mark.parametrize("mode", ["run", "run_events", "run_many"])
+def test_lookback_windows_match_full_history(columnar, mode):
+    engine = Engine()
+    engine.load_ts("A", get_random_df(80, seed=1))
+    b = get_random_df(60, seed=2)
+    b.index = b.index + pd.Timedelta("30min")
+    engine.load_ts("B", b)
+    results = []
+    for lookback in (False, True):
+        strat = RecentMean(8, columnar, lookback)
+        if mode == "run_many":
+            results.append(engine.run_many([strat])[0])
+        else:
+            results.append(getattr(engine, mode)(strat))
+        assert max(strat.seen) == (8 if lookback else 80 if mode == "run_events" else 60)
+    assert_frame_equal(results[0]["orders"], results[1]["orders"])
+    assert_frame_equal(results[0]["equity"], results[1]["equity"])
+
+
+def test_lookback_validated():
+    engine = Engine()
+    engine.load_ts("A", get_random_df(10))
+    strat = RecentMean(0, True, True)
+    strat.tickers = {"A"}
+    with pytest.raises(BacktesterException, match="lookback must be at least 1 bar"):
+        engine.run(strat)
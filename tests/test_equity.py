@@ -0,0 +1,105 @@
+import numpy as np
+import pandas as pd
+from pandas.testing import assert_frame_equal
+from tests.test_utils import get_random_df, get_test_signal_strategy
+from tiny_backtester.engine import Engine
+from tiny_backtester.equity import EquityCurve, Trades
+from tiny_backtester.strategy import Strategy
+from tiny_backtester.utils.backtester_types import MarketData, Order
+
+
+def get_engine(n: int = 100) -> Engine:
+    engine = Engine()
+    engine.load_ts("A", get_random_df(n, seed=1))
+    engine.load_ts("B", get_random_df(n, seed=2))
+    return engine
+
+
+def brute_force_equity(engine: Engine, results, funds: float) -> pd.DataFrame:
+    orders = results["orders"]
+    filled = orders[orders["status"] == "filled"]
+    index = engine.market_data["A"].index
+    rows = []
+    cash, held = funds, {"A": 0, "B": 0}
+    for time in index:
+        exposure = 0.0
+        for o in filled[filled["time"] == time].itertuples():
+            q = o.quantity if o.type == "buy" else -o.quantity
+            cash -= q * o.price
+            held[o.ticker] += q
+        for t, q in held.items():
+            bar = engine.market_data[t].loc[time]
+            exposure += q * (bar["midpoint"] - 0.5 * bar["spread"])
+        rows.append((cash, exposure, cash + exposure))
+    return pd.DataFrame(rows, columns=["cash", "exposure", "equity"], index=index)
+
+
+def test_run_equity_matches_brute_force():
+    rng = np.random.default_rng(0)
+    signals = {"A": rng.integers(-1, 3, 100), "B": rng.integers(-2, 2, 100)}
+    engine = get_engine()
+    strat = get_test_signal_strategy(signals, 5000)
+    results = engine.run(strat)
+    equity = results["equity"]
+    assert_frame_equal(equity, brute_force_equity(engine, results, 5000), check_freq=False)
+    assert np.isclose(equity["cash"].iloc[-1], strat.funds)
+    held = {t: p["quantity"].iloc[-1] for t, p in results["positions"].items()}
+    assert held == dict(strat.portfolio)
+
+
+def test_equity_curve_incremental():
+    rng = np.random.default_rng(1)
+    times = np.arange(20, dtype=np.int64) * 1000
+    bars = {"A": (times, rng.uniform(9, 11, 20)), "B": (times[::2], rng.uniform(1, 2, 10))}
+    trades = Trades(
+        np.array([0, 3000, 3000, 10000, 17000]),
+        np.array(["A", "B", "A", "B", "A"], dtype=object),
+        np.array([5, 10, -2, -4, 1]),
+        np.array([10.0, 1.5, 10.5, 1.2, 9.5]),
+    )
+    whole = EquityCurve(1000, {"B": 3})
+    whole.update(times, bars, trades)
+    incremental = EquityCurve(1000, {"B": 3})
+    for chunk in np.array_split(np.arange(20), 6):
+        chunk_times = times[chunk]
+        mask = np.isin(trades.time, chunk_times)
+        incremental.update(chunk_times, bars, Trades(*(a[mask] for a in trades)))
+    assert_frame_equal(whole.to_frame(), incremental.to_frame())
+    frame = whole.to_frame()
+    assert frame["cash"].iloc[-1] == whole.cash
+    # B only has a bar every other time and is marked at its last price in between
+    b_price = bars["B"][1]
+    assert np.isclose(frame["exposure"].iloc[1], 5 * bars["A"][1][1] + 3 * b_price[0])
+    assert whole.holdings == {"A": 4, "B": 9}
+
+
+def test_run_events_equity():
+    engine = Engine()
+    engine.load_ts("A", get_random_df(30, seed=1))
+    b = get_random_df(20, seed=2)
+    b.index = b.index + pd.Timedelta("30min")
+    engine.load_ts("B", b)
+
+    class BuyUpdated(Strategy):
+        tickers = {"A", "B"}
+        funds = np.float64(1e6)
+        columnar = True
+
+        def precalc(self, data: MarketData):
+            pass
+
+        def run(self, data):
+            return [Order(t, "buy", 1) for t in sorted(data.updated)]
+
+    strat = BuyUpdated()
+    results = engine.run_events(strat)
+    equity = results["equity"]
+    assert len(equity) == 50
+    assert equity.index.is_monotonic_increasing
+    assert np.isclose(equity["cash"].iloc[-1], strat.funds)
+    last_b = engine.market_data["B"].iloc[-1]
+    last_a = engine.market_data["A"].iloc[-1]
+    expected = 30 * (last_a["midpoint"] - 0.5 * last_a["spread"]) + 20 * (
+        last_b["midpoint"] - 0.5 * last_b["spread"]
+    )
+    assert np.isclose(equity["exposure"].iloc[-1], expected)
@@ -0,0 +1,156 @@
+import numpy as np
+import pandas as pd
+import pytest
+from tests.test_utils import get_random_df, get_test_signal_strategy
+from tiny_backtester.data_store import TickerData
+from tiny_backtester.engine import Engine
+from tiny_backtester.execution import Commission, ExecutionModel, rolling_volatility
+from tiny_backtester.strategy import Strategy
+from tiny_backtester.utils.backtester_exception import BacktesterException
+from tiny_backtester.utils.backtester_types import MarketData, Order
+from tiny_backtester.utils.math_utils import get_execution_prices, process_df
+
+
+def get_ticker_data(n: int = 100, seed: int = 0) -> TickerData:
+    return TickerData.from_frame(process_df(get_random_df(n, seed)))
+
+
+def run(options: dict, signals: dict[str, np.ndarray], funds: float = 1e6):
+    engine = Engine(options)
+    for i, t in enumerate(signals):
+        engine.load_ts(t, get_random_df(len(signals[t]), seed=i))
+    strat = get_test_signal_strategy(signals, funds)
+    return engine.run(strat), strat
+
+
+@pytest.mark.parametrize("slippage", [False, True])
+def test_default_costs_are_execution_prices(slippage):
+    data = get_ticker_data()
+    costs = ExecutionModel(slippage).costs("A", data)
+    np.testing.assert_array_equal(costs.ask, get_execution_prices("buy", data.columns, slippage))
+    np.testing.assert_array_equal(costs.bid, get_execution_prices("sell", data.columns, slippage))
+    assert costs.impact is None and costs.capacity is None
+    assert costs.fill("buy", 10**9, 5) == (10**9, costs.ask[5])
+
+
+def test_rolling_volatility():
+    close = get_random_df(60)["close"]
+    expected = np.log(close).diff().rolling(20, min_periods=2).std().fillna(0).to_numpy()
+    np.testing.assert_allclose(rolling_volatility(close.to_numpy(), 20), expected, atol=1e-15)
+
+
+def test_square_root_impact():
+    data = get_ticker_data()
+    model = ExecutionModel(impact=0.8, volatility_window=10)
+    costs = model.costs("A", data)
+    volatility = rolling_volatility(data.columns["close"], 10)
+    i, volume = 50, data.columns["volume"][50]
+    _, small = costs.fill("buy", 1, i)
+    _, large = costs.fill("buy", 400, i)
+    assert np.isclose(large, costs.ask[i] * (1 + 0.8 * volatility[i] * np.sqrt(400 / volume)))
+    assert costs.ask[i] < small < large
+    assert costs.fill("sell", 400, i)[1] < costs.bid[i]
+    # the costs of a single bar, as live trading computes them, match the precomputed ones
+    for i in (0, 3, 10, 99):
+        assert model.costs("A", data, i, i + 1).fill("buy", 400, i) == costs.fill("buy", 400, i)
+
+
+def test_participation_caps_fills():
+    signals = {"A": np.tile([5000, -5000], 20)}
+    results, strat = run({"execution": ExecutionModel(participation=0.1)}, signals)
+    orders = results["orders"]
+    volume = get_random_df(40)["volume"].to_numpy()
+    executed = orders[orders["status"] != "cancelled"]
+    np.testing.assert_array_equal(executed["quantity"], volume // 10)
+    assert (orders.groupby("time")["quantity"].sum() == 5000).all()
+    assert (orders["status"] == "cancelled").sum() == 40
+    assert strat.portfolio["A"] == results["positions"]["A"]["quantity"].iloc[-1]
+
+
+def test_commission_schedules():
+    signals = {"A": np.array([10, 0, -10] + [0] * 7), "B": np.array([10] + [0] * 9)}
+    model = ExecutionModel(
+        commission=Commission(minimum=1.0), commissions={"B": Commission(per_share=0.5)}
+    )
+    results, strat = run({"execution": model}, signals, funds=1e4)
+    _, plain = run({}, signals, funds=1e4)
+    orders = results["orders"].set_index(["ticker", "type"])["price"]
+    assert np.isclose(strat.funds, plain.funds - 1.0 - 1.0 - 0.5 * 10)
+    costs = ExecutionModel().costs("B", get_ticker_data(10, seed=1))
+    assert np.isclose(orders["B", "buy"], costs.ask[0] + 0.5)
+
+
+def test_resting_orders_capped_by_participation():
+    class StopBuyer(Strategy):
+        tickers = {"A"}
+        funds = np.float64(1e12)
+
+        def precalc(self, data: MarketData):
+            pass
+
+        def run(self, data):
+            if len(data["A"]) > 1:
+                return None
+            stop = float(data["A"]["close"].iloc[-1]) + 0.01
+            return [Order("A", "buy", 10**6, stop_price=stop, good_for=None)]
+
+    engine = Engine({"execution": ExecutionModel(participation=0.1)})
+    engine.load_ts("A", get_random_df(40))
+    orders = engine.run(StopBuyer())["orders"]
+    filled = orders[orders["status"] == "filled"]
+    (time,) = filled["time"]
+    volume = engine.market_data["A"]["volume"]
+    assert filled["quantity"].iloc[0] == volume[time] // 10
+    cancelled = orders[(orders["status"] == "cancelled") & (orders["time"] == time)]
+    assert cancelled["quantity"].iloc[0] == 10**6 - volume[time] // 10
+
+
+def test_participation_caps_every_order_of_a_bar():
+    class TwoBuys(Strategy):
+        tickers = {"A"}
+        funds = np.float64(1e12)
+
+        def precalc(self, data: MarketData):
+            pass
+
+        def run(self, data):
+            if len(data["A"]) > 1:
+                return None
+            return [Order("A", "buy", 10**6), Order("A", "buy", 10**6)]
+
+    engine = Engine({"execution": ExecutionModel(participation=0.1)})
+    engine.load_ts("A", get_random_df(40))
+    orders = engine.run(TwoBuys())["orders"]
+    time = engine.market_data["A"].index[0]
+    volume = engine.market_data["A"]["volume"].iloc[0]
+    on_bar = orders[orders["time"] == time]
+    assert on_bar.loc[on_bar["status"] == "filled", "quantity"].sum() == volume // 10
+    assert on_bar["status"].tolist() == ["filled", "cancelled", "cancelled"]
+    costs = ExecutionModel(participation=0.1).costs("A", get_ticker_data())
+    assert costs.cap(10**6, 0, int(costs.capacity[0]) - 1) == 1
+    assert costs.cap(10**6, 0, 10**9) == 0
+
+
+def test_commission_never_makes_sells_cost_cash():
+    commission = Commission(minimum=100.0)
+    assert commission.net_price("sell", 2, np.float64(30.0)) == 0.0
+    assert commission.net_price("sell", 10, np.float64(30.0)) == 20.0
+    assert commission.net_price("buy", 2, np.float64(30.0)) == 80.0
+
+
+def test_run_signals_needs_price_per_share():
+    engine = Engine({"execution": ExecutionModel(commission=Commission(rate=0.001))})
+    engine.load_ts("A", get_random_df(10))
+    strat = get_test_signal_strategy({"A": np.ones(10, dtype=np.int64)}, 1e4)
+    with pytest.raises(BacktesterException, match="run_signals needs a price per share"):
+        engine.run_signals(strat)
+
+
+def test_invalid_models():
+    with pytest.raises(BacktesterException, match="participation"):
+        ExecutionModel(participation=1.5)
+    with pytest.raises(BacktesterException, match="no volume"):
+        ExecutionModel(impact=1.0).costs(
+            "A", TickerData(np.arange(2), {"close": np.ones(2), "midpoint": np.ones(2)})
+        )
+    assert pd.isna(ExecutionModel().costs("A", get_ticker_data()).fill("cancel", 1, 0)[1])
@@ -0,0 +1,45 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+import tiny_backtester
+
+SRC = str(Path(tiny_backtester.__file__).parents[1])
+# microseconds the package's own modules may add to importing the engine, on top of numpy and
+# pandas, measured at around 30ms when compiling them without bytecode caches
+IMPORT_BUDGET_US = 100_000
+LAZY = (
+    "pandera",
+    "pandas_market_calendars",
+    "matplotlib",
+    "numba",
+    "importlib.metadata",
+    "concurrent",
+)
+
+
+def python(code: str, *args: str) -> subprocess.CompletedProcess:
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join([SRC, os.environ.get("PYTHONPATH", "")])}
+    return subprocess.run(
+        [sys.executable, *args, "-c", code], env=env, capture_output=True, text=True, check=True
+    )
+
+
+def test_import_is_silent():
+    result = python("import tiny_backtester, tiny_backtester.engine")
+    assert result.stdout == "" and result.stderr == ""
+
+
+def test_heavy_dependencies_load_lazily():
+    code = "import sys, tiny_backtester.engine; print(' '.join(sys.modules))"
+    modules = set(python(code).stdout.split())
+    assert not modules.intersection(LAZY)
+    assert "pandas" not in python("import sys, tiny_backtester; print(*sys.modules)").stdout
+
+
+def test_import_time_budget():
+    # the stdlib modules imported along with numpy and pandas are paid for by them
+    result = python("import numpy, pandas; import tiny_backtester.engine", "-X", "importtime")
+    lines = [line.split("|") for line in result.stderr.splitlines() if "|" in line]
+    cumulative = {name.strip(): int(us) for _, us, name in lines[1:]}
+    assert cumulative["tiny_backtester.engine"] < IMPORT_BUDGET_US
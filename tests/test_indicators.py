@@ -0,0 +1,98 @@
+import numpy as np
+import pandas as pd
+import pytest
+from tests.test_utils import get_random_df
+from tiny_backtester.engine import Engine
+from tiny_backtester.indicators import (
+    ATR,
+    EMA,
+    RSI,
+    SMA,
+    VWAP,
+    RollingMax,
+    RollingMin,
+    RollingStd,
+    Spread,
+    add_indicators,
+)
+from tiny_backtester.strategy import Strategy
+from tiny_backtester.utils.backtester_types import MarketData
+from tiny_backtester.utils.math_utils import calculate_spread
+
+INDICATORS = [
+    SMA(10),
+    EMA(10),
+    RollingStd(10),
+    RollingStd(5, ddof=0),
+    RollingMax(7),
+    RollingMin(7),
+    VWAP(),
+    VWAP(20),
+    ATR(14),
+    RSI(14),
+    Spread(),
+]
+
+
+@pytest.mark.parametrize("indicator", INDICATORS, ids=lambda i: type(i).__name__)
+def test_online_matches_batch(indicator):
+    df = get_random_df(500)
+    expected = indicator.compute(df)
+    indicator.reset()
+    actual = [indicator.push(row) for _, row in df.iterrows()]
+    np.testing.assert_allclose(actual, expected, rtol=1e-9, atol=1e-9, equal_nan=True)
+    assert np.isnan(expected[0]) == np.isnan(actual[0])
+
+
+def test_batch_matches_pandas():
+    close = get_random_df(200)["close"]
+    np.testing.assert_allclose(SMA(10).compute(close.to_frame()), close.rolling(10).mean())
+    np.testing.assert_allclose(RollingStd(10).compute(close.to_frame()), close.rolling(10).std())
+    np.testing.assert_allclose(RollingMax(7).compute(close.to_frame()), close.rolling(7).max())
+    np.testing.assert_allclose(
+        EMA(10).compute(close.to_frame()), close.ewm(span=10, adjust=False).mean()
+    )
+
+
+def test_spread_matches_calculate_spread():
+    df = get_random_df(300)
+    indicator = Spread()
+    for close in df["close"]:
+        indicator.update(close)
+    assert np.isclose(indicator.value, calculate_spread(df.copy())["spread"].iloc[0])
+    assert np.isclose(Spread().compute(df)[-1], indicator.value)
+
+
+def test_rsi_bounds():
+    rsi = RSI(14).compute(get_random_df(300))
+    assert np.isnan(rsi[0])
+    assert np.all((rsi[1:] >= 0) & (rsi[1:] <= 100))
+
+
+def test_engine_advances_indicators():
+    class IndicatorStrategy(Strategy):
+        tickers = {"TEST"}
+        columnar = True
+
+        def __init__(self):
+            super().__init__()
+            self.indicators = {"TEST": {"sma": SMA(5), "atr": ATR(5)}}
+            self.seen: list[tuple[float, float]] = []
+
+        def precalc(self, data: MarketData):
+            add_indicators(data, {"TEST": {"sma_batch": SMA(5), "atr_batch": ATR(5)}})
+
+        def run(self, data):
+            sma, atr = self.indicators["TEST"]["sma"].value, self.indicators["TEST"]["atr"].value
+            expected = data["TEST"].latest("sma_batch"), data["TEST"].latest("atr_batch")
+            self.seen.append(((sma, atr), expected))
+            return None
+
+    engine = Engine()
+    engine.load_ts("TEST", get_random_df(50))
+    strat = IndicatorStrategy()
+    engine.run(strat)
+    engine.run(strat)  # indicators are reset between runs
+    assert len(strat.seen) == 100
+    actual, expected = zip(*strat.seen)
+    np.testing.assert_allclose(actual, expected, equal_nan=True)
@@ -0,0 +1,58 @@
+import numpy as np
+from tests.test_utils import get_random_df, get_test_signal_strategy
+from tiny_backtester.engine import Engine
+from tiny_backtester.instrumentation import Instrumentation, InstrumentationHook
+from tiny_backtester.utils.backtester_types import RunStats
+
+
+class RecordingHook(InstrumentationHook):
+    def __init__(self):
+        self.exported: list[RunStats] = []
+
+    def export(self, stats: RunStats) -> None:
+        self.exported.append(stats)
+
+
+def get_engine(instrumentation=None) -> Engine:
+    engine = Engine(instrumentation=instrumentation)
+    engine.load_ts("A", get_random_df(48))
+    return engine
+
+
+def get_signals():
+    return {"A": np.tile([1, 0, -1, -1], 12)}
+
+
+def test_run_stats():
+    hook = RecordingHook()
+    engine = get_engine(Instrumentation([hook]))
+    results = engine.run(get_test_signal_strategy(get_signals(), 1e9))
+    stats = results["instrumentation"]
+    assert hook.exported == [stats]
+    for timer in ("precalc", "data_view", "strategy_run", "execute_orders", "get_position"):
+        assert stats["timers"][timer] >= 0
+    assert stats["calls"]["strategy_run"] == 48
+    assert stats["counters"]["epochs"] == 48
+    assert stats["counters"]["orders_submitted"] == 36
+    assert stats["counters"]["orders_filled"] == 24
+    assert stats["counters"]["orders_rejected"] == 12
+
+
+def test_run_signals_stats_match_run():
+    engine = get_engine(Instrumentation())
+    expected = engine.run(get_test_signal_strategy(get_signals(), 1e9))["instrumentation"]
+    actual = engine.run_signals(get_test_signal_strategy(get_signals(), 1e9))["instrumentation"]
+    assert actual["counters"] == expected["counters"]
+    assert set(actual["timers"]) == {"precalc", "signals", "fill_orders"}
+
+
+def test_stats_reset_between_runs():
+    engine = get_engine(Instrumentation())
+    engine.run(get_test_signal_strategy(get_signals(), 1e9))
+    results = engine.run(get_test_signal_strategy(get_signals(), 1e9), n_epochs=10)
+    assert results["instrumentation"]["counters"]["epochs"] == 10
+
+
+def test_no_instrumentation():
+    results = get_engine().run(get_test_signal_strategy(get_signals(), 1e9))
+    assert "instrumentation" not in results
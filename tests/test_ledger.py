@@ -0,0 +1,53 @@
+import numpy as np
+import pandas as pd
+import pytest
+from pandas.testing import assert_frame_equal
+from tiny_backtester.ledger import OrderLog, PositionLog
+from tiny_backtester.utils.backtester_types import ExecutedOrder, Position
+
+
+def get_orders(n: int, tz=None) -> list[ExecutedOrder]:
+    times = pd.date_range("1/1/2000", periods=n, freq="h", tz=tz)
+    types = ["buy", "sell", "hold"]
+    statuses = ["filled", "rejected", "unsupported"]
+    return [
+        ExecutedOrder(t, f"T{i % 4}", types[i % 3], i, np.float64(i / 7), statuses[i % 3])
+        for i, t in enumerate(times)
+    ]
+
+
+def get_positions(n: int, tz=None) -> list[Position]:
+    times = pd.date_range("1/1/2000", periods=n, freq="h", tz=tz)
+    return [
+        Position(t, i, np.float64(i / 3), np.float64(i), np.float64(-i), np.float64(0.5))
+        for i, t in enumerate(times)
+    ]
+
+
+@pytest.mark.parametrize("tz", [None, "UTC", "America/New_York"])
+def test_order_log_matches_dataframe(tz):
+    orders = get_orders(100, tz)
+    log = OrderLog(capacity=8)
+    log.extend(orders)
+    assert len(log) == 100
+    assert_frame_equal(log.to_frame(), pd.DataFrame(data=orders))
+
+
+def test_order_log_empty():
+    assert_frame_equal(OrderLog().to_frame(), pd.DataFrame(data=[]))
+
+
+@pytest.mark.parametrize("tz", [None, "UTC"])
+def test_position_log_matches_dataframe(tz):
+    positions = get_positions(50, tz)
+    log = PositionLog(capacity=4)
+    for p in positions:
+        log.append(p)
+    assert log.last == positions[-1]
+    assert_frame_equal(log.to_frame(), pd.DataFrame(data=[Position(), *positions]))
+
+
+def test_position_log_initial():
+    log = PositionLog()
+    assert log.last == Position()
+    assert_frame_equal(log.to_frame(), pd.DataFrame(data=[Position()]))
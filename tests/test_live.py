@@ -0,0 +1,224 @@
+import asyncio
+import numpy as np
+import pandas as pd
+import pytest
+from pandas.testing import assert_frame_equal
+from tests.test_utils import get_random_df
+from tiny_backtester.engine import Engine
+from tiny_backtester.execution import ExecutionModel
+from tiny_backtester.indicators import SMA
+from tiny_backtester.live import Broker, LiveBars, LiveTrader, QueueSource, ReplaySource
+from tiny_backtester.strategy import Strategy
+from tiny_backtester.utils.backtester_exception import BacktesterException
+from tiny_backtester.utils.backtester_types import ExecutedOrder, MarketData, Order
+
+
+class RestingBuyer(Strategy):
+    """Rests limit buys under the close of updated tickers and sells every fifth bar"""
+
+    tickers = {"A", "B"}
+    funds = np.float64(1e5)
+
+    def __init__(self, columnar: bool):
+        super().__init__()
+        self.columnar = columnar
+        self.lookback = None if columnar else 3
+        self.seen: list[int] = []
+
+    def precalc(self, data: MarketData):
+        pass
+
+    def run(self, data):
+        orders = []
+        for t in sorted(data.updated if self.columnar else data):
+            if self.columnar:
+                close, n = data[t].latest("close"), len(data[t])
+            else:
+                close, n = data[t]["close"].iloc[-1], len(data[t])
+                self.seen.append(n)
+            orders.append(Order(t, "buy", 2, limit_price=close - 0.3, good_for=3))
+            if n % 5 == 0 and self.portfolio[t]:
+                orders.append(Order(t, "sell", self.portfolio[t]))
+        return orders
+
+
+def get_engine() -> Engine:
+    engine = Engine()
+    engine.load_ts("A", get_random_df(60, seed=1))
+    b = get_random_df(40, seed=2)
+    b.index = b.index + pd.Timedelta("90min")
+    engine.load_ts("B", b)
+    return engine
+
+
+def assert_results_equal(expected, actual):
+    assert_frame_equal(expected["orders"], actual["orders"])
+    for t in expected["positions"]:
+        assert_frame_equal(expected["positions"][t], actual["positions"][t])
+    assert_frame_equal(expected["equity"], actual["equity"], check_freq=False)
+
+
+def test_replay_matches_run_events():
+    engine = get_engine()
+    strat = RestingBuyer(columnar=True)
+    expected = engine.run_events(strat)
+    live = RestingBuyer(columnar=True)
+    actual = asyncio.run(LiveTrader(live, ReplaySource(engine.market_data)).run())
+    assert_results_equal(expected, actual)
+    assert (expected["orders"]["status"] == "filled").any()
+    assert live.funds == strat.funds and live.portfolio == strat.portfolio
+
+
+def test_replay_frames_bounded_by_lookback():
+    engine = get_engine()
+    strat = RestingBuyer(columnar=False)
+    results = asyncio.run(LiveTrader(strat, ReplaySource(engine.market_data)).run(n_events=20))
+    assert max(strat.seen) == 3
+    assert len(results["equity"]) == 20
+
+
+def test_live_reuses_ticker_data_and_costs():
+    engine = get_engine()
+    trader = LiveTrader(RestingBuyer(columnar=True), ReplaySource(engine.market_data))
+    execution, calls = trader.engine.execution, []
+
+    def counting_costs(*args):
+        calls.append(args[2:])
+        return ExecutionModel.costs(execution, *args)
+
+    execution.costs = counting_costs
+    data = {}
+    for bars in ReplaySource(engine.market_data).events():
+        asyncio.run(trader.on_bars(bars))
+        for t in bars.bars:
+            assert data.setdefault(t, trader.store[t]) is trader.store[t]
+    # one cost computation per new bar, whatever the orders filled on it
+    assert len(calls) == 100 and all(stop == start + 1 for start, stop in calls)
+    assert (trader.results()["orders"]["status"] == "filled").any()
+
+
+def test_live_history_frames_cached():
+    engine = get_engine()
+    frames = []
+
+    class Recorder(Strategy):
+        tickers = {"A", "B"}
+
+        def precalc(self, data: MarketData):
+            pass
+
+        def run(self, data):
+            if "A" in data:
+                frames.append(data["A"])
+                assert_frame_equal(data.history("A"), data["A"])
+
+    asyncio.run(LiveTrader(Recorder(), ReplaySource(engine.market_data)).run(n_events=6))
+    # A gets a bar every hour and B on the half hour, B's events reuse A's last frame
+    assert [len(f) for f in frames] == [1, 2, 2, 3, 3, 4]
+    assert frames[1] is frames[2] and frames[3] is frames[4]
+    assert_frame_equal(frames[-1], engine.market_data["A"].iloc[:4], check_freq=False)
+    with pytest.raises(ValueError):
+        frames[-1]["close"].to_numpy()[0] = 1.0
+
+
+def test_raw_bars_from_file(tmp_path):
+    df = get_random_df(30)
+    df.to_csv(tmp_path / "A.csv")
+    source = ReplaySource.from_files({"A": tmp_path / "A.csv"})
+
+    class Averaging(Strategy):
+        tickers = {"A"}
+        columnar = True
+        indicators = {"A": {"sma": SMA(5)}}
+
+        def precalc(self, data: MarketData):
+            pass
+
+        def run(self, data):
+            return None
+
+    strat = Averaging()
+    trader = LiveTrader(strat, source)
+    asyncio.run(trader.run())
+    columns = trader.store["A"].columns
+    np.testing.assert_allclose(columns["midpoint"], (df["high"] + df["low"]) / 2)
+    np.testing.assert_allclose(columns["slippage"], 0.5 / df["volume"])
+    assert np.isclose(strat.indicators["A"]["sma"].value, df["close"].iloc[-5:].mean())
+
+
+class RecordingBroker(Broker):
+    """Fills every order at the close and remembers what it was sent"""
+
+    def __init__(self):
+        self.sent: list[Order] = []
+
+    async def submit(self, strat, orders, data):
+        executed = []
+        for o in orders:
+            await asyncio.sleep(0)
+            self.sent.append(o)
+            bar = data[o.ticker].bar()
+            q = o.quantity if o.type == "buy" else -o.quantity
+            strat.funds -= q * bar["close"]
+            strat.portfolio[o.ticker] += q
+            executed.append(
+                ExecutedOrder(bar.name, o.ticker, o.type, o.quantity, bar["close"], "filled")
+            )
+        return executed
+
+
+def test_queue_source_with_broker():
+    engine = get_engine()
+    frames = {"A": engine.market_data["A"].iloc[:10]}
+    broker = RecordingBroker()
+
+    class BuyEveryBar(Strategy):
+        tickers = {"A"}
+        columnar = True
+
+        def precalc(self, data: MarketData):
+            pass
+
+        def run(self, data):
+            return [Order("A", "buy", 1)]
+
+    async def main():
+        source = QueueSource()
+        trader = LiveTrader(BuyEveryBar(), source, broker)
+        task = asyncio.create_task(trader.run())
+        for bars in ReplaySource(frames).events():
+            await source.put(bars)
+        await source.close()
+        return await task
+
+    results = asyncio.run(main())
+    assert len(broker.sent) == 10
+    close = frames["A"]["close"].to_numpy()
+    assert np.allclose(results["orders"]["price"], close)
+    assert results["positions"]["A"]["quantity"].iloc[-1] == 10
+    assert np.isclose(results["equity"]["cash"].iloc[-1], 10000 - close.sum())
+
+
+def test_live_bars_ignore_other_tickers():
+    engine = get_engine()
+    strat = RestingBuyer(columnar=True)
+    strat.tickers = {"A"}
+    trader = LiveTrader(strat, ReplaySource(engine.market_data))
+    time = engine.market_data["B"].index[0]
+    assert trader.push(LiveBars(time, {"B": {"close": 1.0}})) == []
+
+
+def test_live_trader_validates_strategy():
+    source = ReplaySource(get_engine().market_data)
+    strat = RestingBuyer(columnar=True)
+    strat.funds = np.float64(0)
+    with pytest.raises(BacktesterException, match="funds must be greater than 0"):
+        LiveTrader(strat, source)
+    strat = RestingBuyer(columnar=False)
+    strat.lookback = 0
+    with pytest.raises(BacktesterException, match="lookback must be at least 1 bar"):
+        LiveTrader(strat, source)
+    strat = RestingBuyer(columnar=True)
+    strat.tickers = set()
+    with pytest.raises(BacktesterException, match="must have tickers"):
+        LiveTrader(strat, source)
@@ -74,7 +74,7 @@ def test_process_df_resample():
 def test_process_df_invalid_calendar():
     test_df = get_df_input()
     with pytest.raises(BacktesterException, match="Unsupported resampling operation"):
-        process_df(test_df, cal="exchange_hours", resample_freq="1D")
+        process_df(test_df, cal="exchange_hours", resample_freq="ME")
 
 
 def test_process_df_invalid_args_sampling():
@@ -0,0 +1,162 @@
+import numpy as np
+import pandas as pd
+from tests.test_utils import get_test_signal_strategy
+from tiny_backtester.engine import Engine
+from tiny_backtester.order_book import OrderBook
+from tiny_backtester.strategy import Strategy
+from tiny_backtester.utils.backtester_types import MarketData, Order
+
+
+def get_bars() -> pd.DataFrame:
+    # execution prices equal the midpoint as the spread is fixed at 0
+    return pd.DataFrame(
+        data={
+            "open": [10.0, 10.0, 9.0, 7.0, 10.0, 12.0],
+            "high": [10.5, 10.2, 9.5, 8.0, 11.0, 13.0],
+            "low": [9.5, 9.8, 8.5, 6.0, 9.0, 11.5],
+            "close": [10.0, 9.9, 8.8, 7.5, 10.5, 12.5],
+            "volume": [100, 100, 100, 100, 100, 100],
+            "spread": [0.0] * 6,
+        },
+        index=pd.date_range("1/1/2000", periods=6, freq="h", name="datetime"),
+    )
+
+
+def run_orders(orders: dict[int, list[Order]], funds: float = 1000, portfolio=None):
+    class OrderStrategy(Strategy):
+        tickers = {"TEST"}
+
+        def precalc(self, data: MarketData):
+            pass
+
+        def run(self, data):
+            return orders.get(len(data["TEST"]) - 1)
+
+    engine = Engine()
+    engine.load_ts("TEST", get_bars())
+    strat = OrderStrategy()
+    strat.funds = np.float64(funds)
+    if portfolio:
+        strat.portfolio.update(portfolio)
+    results = engine.run(strat)
+    return results["orders"][["time", "type", "quantity", "price", "status"]], strat
+
+
+def test_order_book_match():
+    book = OrderBook()
+    for price in [9.0, 8.0, 7.0]:
+        book.add(Order("A", "buy", 1, limit_price=price, good_for=None))
+    book.add(Order("A", "sell", 1, stop_price=8.5, good_for=None))
+    book.add(Order("A", "buy", 1, stop_price=11.0, good_for=None))
+    assert len(book) == 5
+    assert [r.seq for r in book.match("A", high=10.0, low=8.6)] == [0]
+    assert [r.seq for r in book.match("A", high=10.0, low=7.5)] == [1, 3]
+    assert book.match("B", high=100.0, low=0.0) == []
+    assert [r.seq for r in book.match("A", high=11.0, low=7.5)] == [4]
+    assert [r.seq for r in book.cancel("A")] == [2]
+    assert len(book) == 0 and book.tickers() == []
+
+
+def test_order_book_expire():
+    book = OrderBook()
+    book.add(Order("A", "buy", 1, limit_price=1.0, good_for=2))
+    book.add(Order("A", "buy", 1, limit_price=1.0, good_for=1))
+    book.add(Order("A", "buy", 1, limit_price=1.0, good_for=None))
+    book.epoch = 1
+    assert [r.seq for r in book.expire()] == [1]
+    book.epoch = 2
+    assert [r.seq for r in book.expire()] == [0]
+    assert len(book) == 1
+
+
+def test_resting_limit_buy():
+    # not marketable at 10 on bar 0, filled on bar 2 whose low is 8.5
+    orders, strat = run_orders({0: [Order("TEST", "buy", 10, limit_price=9.0, good_for=None)]})
+    assert orders["status"].tolist() == ["pending", "filled"]
+    assert orders["price"].tolist() == [10.0, 9.0]
+    assert orders["time"].iloc[1] == get_bars().index[2]
+    assert strat.funds == 910.0 and strat.portfolio["TEST"] == 10
+
+
+def test_resting_limit_gap_fills_at_open():
+    # bar 3 opens at 7, below the limit
+    orders, _ = run_orders({2: [Order("TEST", "buy", 1, limit_price=8.0, good_for=None)]})
+    assert orders["price"].tolist() == [9.0, 7.0]
+
+
+def test_resting_limit_sell():
+    orders, strat = run_orders(
+        {0: [Order("TEST", "sell", 5, limit_price=12.0, good_for=None)]}, portfolio={"TEST": 5}
+    )
+    assert orders["status"].tolist() == ["pending", "filled"]
+    assert orders["price"].tolist() == [10.0, 12.0]
+    assert orders["time"].iloc[1] == get_bars().index[5]
+    assert strat.funds == 1060.0
+
+
+def test_stop_orders():
+    # sell stop triggers on bar 2 (low 8.5), buy stop gaps through on bar 5 (open 12)
+    orders, _ = run_orders(
+        {
+            0: [Order("TEST", "buy", 1), Order("TEST", "sell", 1, stop_price=9.0, good_for=None)],
+            3: [Order("TEST", "buy", 1, stop_price=11.5, good_for=None)],
+        }
+    )
+    assert orders["status"].tolist() == ["filled", "pending", "filled", "pending", "filled"]
+    assert orders["price"].tolist() == [10.0, 10.0, 9.0, 7.0, 12.0]
+
+
+def test_stop_limit_order():
+    # the stop triggers on bar 5, which opens at 12, over the first order's limit
+    orders, _ = run_orders(
+        {3: [Order("TEST", "buy", 1, limit_price=11.8, stop_price=11.5, good_for=None)]}
+    )
+    assert orders["status"].tolist() == ["pending"]
+    orders, _ = run_orders(
+        {3: [Order("TEST", "buy", 1, limit_price=12.2, stop_price=11.5, good_for=None)]}
+    )
+    assert orders["status"].tolist() == ["pending", "filled"]
+    assert orders["price"].tolist() == [7.0, 12.0]
+
+
+def test_stop_marketable_on_submission():
+    orders, _ = run_orders({1: [Order("TEST", "buy", 1, stop_price=9.0)]})
+    assert orders["status"].tolist() == ["filled"]
+    orders, _ = run_orders({1: [Order("TEST", "buy", 1, stop_price=11.0)]})
+    assert orders["status"].tolist() == ["rejected"]
+
+
+def test_resting_order_expires():
+    orders, _ = run_orders({0: [Order("TEST", "buy", 1, limit_price=8.0, good_for=2)]})
+    assert orders["status"].tolist() == ["pending", "expired"]
+    assert orders["time"].iloc[1] == get_bars().index[2]
+    assert orders["price"].iloc[1] == 8.0
+
+
+def test_resting_order_cancelled():
+    orders, _ = run_orders(
+        {
+            0: [Order("TEST", "buy", 1, limit_price=5.0, good_for=None)],
+            1: [Order("TEST", "cancel", 0)],
+        }
+    )
+    assert orders["status"].tolist() == ["pending", "cancelled"]
+    assert orders["type"].tolist() == ["buy", "buy"]
+
+
+def test_resting_order_rejected_without_funds():
+    orders, strat = run_orders(
+        {0: [Order("TEST", "buy", 10, limit_price=9.0, good_for=None)]}, funds=50
+    )
+    assert orders["status"].tolist() == ["pending", "rejected"]
+    assert strat.funds == 50
+
+
+def test_cancel_on_frames():
+    engine = Engine()
+    engine.book.add(Order("TEST", "buy", 1, limit_price=5.0, good_for=None))
+    bars = get_bars()
+    cancel = Order("TEST", "cancel", 0)
+    strat = get_test_signal_strategy({"TEST": np.zeros(6, dtype=np.int64)}, 100)
+    [executed] = engine.execute_orders(strat, [cancel], {"TEST": bars})
+    assert executed.time == bars.index[-1] and executed.status == "cancelled"
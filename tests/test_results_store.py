@@ -0,0 +1,100 @@
+import os
+from pathlib import Path
+import numpy as np
+import pandas as pd
+import pytest
+from pandas.testing import assert_frame_equal
+from tests.test_utils import get_random_df, get_test_signal_strategy
+from tiny_backtester.engine import Engine
+from tiny_backtester.instrumentation import Instrumentation
+from tiny_backtester.results_store import ResultsStore
+from tiny_backtester.utils import storage
+from tiny_backtester.utils.backtester_exception import BacktesterException
+
+
+def get_results(seed: int, tz=None, signals: bool = False, n: int = 80):
+    engine = Engine({"validation": "once"}, instrumentation=Instrumentation())
+    for i, t in enumerate(("A", "B")):
+        df = get_random_df(n, seed=i)
+        df.index = df.index.tz_localize(tz) if tz else df.index
+        engine.load_ts(t, df)
+    rng = np.random.default_rng(seed)
+    strat = get_test_signal_strategy(
+        {"A": rng.integers(-1, 3, n), "B": rng.integers(-2, 2, n)}, 5000
+    )
+    return engine.run_signals(strat) if signals else engine.run(strat)
+
+
+def assert_results_equal(expected, actual):
+    assert_frame_equal(expected["orders"], actual["orders"])
+    assert expected["positions"].keys() == actual["positions"].keys()
+    for t in expected["positions"]:
+        assert_frame_equal(expected["positions"][t], actual["positions"][t])
+    assert_frame_equal(expected["equity"], actual["equity"], check_freq=False)
+    assert expected.get("instrumentation") == actual.get("instrumentation")
+
+
+@pytest.mark.parametrize("compress", [False, True])
+@pytest.mark.parametrize("tz, signals", [(None, False), ("UTC", False), ("America/New_York", True)])
+def test_round_trip(tmp_path, compress, tz, signals):
+    store = ResultsStore(tmp_path, compress=compress)
+    expected = get_results(0, tz, signals)
+    store.put("run", expected)
+    assert_results_equal(expected, store["run"].to_results())
+
+
+def test_columns_memory_mapped_and_encoded(tmp_path):
+    store = ResultsStore(tmp_path)
+    store.put("run", get_results(0))
+    stored = store["run"]
+    price = stored.column("orders.price")
+    assert isinstance(price.base, np.memmap)
+    assert stored.column("orders.ticker").dtype == np.uint8
+    assert stored.manifest["categories"]["ticker"] == ["A", "B"]
+    assert sorted(stored.tickers) == ["A", "B"]
+
+
+def test_query_many_runs(tmp_path):
+    store = ResultsStore(tmp_path, compress=True)
+    runs = {f"run-{i:03}": get_results(i, n=40) for i in range(12)}
+    for key, results in runs.items():
+        store.put(key, results)
+    assert store.keys() == sorted(runs) and len(store) == 12 and "run-003" in store
+    final = {key: store[key].column("equity.equity")[-1] for key in store}
+    assert final == {key: r["equity"]["equity"].iloc[-1] for key, r in runs.items()}
+    assert_frame_equal(store["run-005"].position("B"), runs["run-005"]["positions"]["B"])
+
+
+def test_empty_and_missing(tmp_path):
+    store = ResultsStore(tmp_path)
+    engine = Engine()
+    engine.load_ts("A", get_random_df(10))
+    expected = engine.run(get_test_signal_strategy({"A": np.zeros(10, dtype=np.int64)}, 100))
+    store.put("empty", expected)
+    assert_results_equal(expected, store["empty"].to_results())
+    store.put("no-equity", {"orders": pd.DataFrame(), "positions": {}})
+    with pytest.raises(BacktesterException, match="no equity curve"):
+        store["no-equity"].equity
+    with pytest.raises(KeyError):
+        store["missing"]
+
+
+def test_replace_keeps_old_run_on_failure(tmp_path, monkeypatch):
+    store = ResultsStore(tmp_path)
+    first, second = get_results(0), get_results(1)
+    store.put("run", first)
+    replace = os.replace
+
+    def failing_swap(src, dst):
+        if Path(src).name.startswith(".tmp-"):
+            raise OSError("crashed while swapping")
+        replace(src, dst)
+
+    monkeypatch.setattr(storage.os, "replace", failing_swap)
+    with pytest.raises(OSError, match="crashed"):
+        store.put("run", second)
+    assert_results_equal(first, store["run"].to_results())
+    monkeypatch.undo()
+    store.put("run", second)
+    assert_results_equal(second, store["run"].to_results())
+    assert [p.name for p in tmp_path.iterdir()] == ["run"]
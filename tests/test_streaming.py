@@ -0,0 +1,114 @@
+import numpy as np
+import pandas as pd
+import pytest
+from pandas.testing import assert_frame_equal
+from tests.test_utils import get_random_df
+from tiny_backtester.engine import Engine
+from tiny_backtester.strategy import Strategy
+from tiny_backtester.streaming import (
+    process_chunks,
+    read_chunks,
+    rechunk,
+    stream_spread,
+    stream_ts,
+)
+from tiny_backtester.utils.backtester_exception import BacktesterException
+from tiny_backtester.utils.backtester_types import MarketData, Order
+from tiny_backtester.utils.math_utils import RollSpread, calculate_spread
+
+VALID_DATASET_PATH = "tests/integration/static/TEST_valid.csv"
+
+
+class RollingStrategy(Strategy):
+    tickers = {"TEST"}
+    lookback = 5
+
+    def precalc(self, data: MarketData):
+        df = data["TEST"]
+        df["mean"] = df["close"].rolling(5).mean()
+
+    def run(self, data):
+        latest = data["TEST"].iloc[-1]
+        if latest["close"] > latest["mean"]:
+            return [Order("TEST", "sell", 1)]
+        return [Order("TEST", "buy", 1)]
+
+
+@pytest.mark.parametrize("chunksize", [1, 2, 7, 1000])
+def test_roll_spread_matches_full_sample(chunksize):
+    df = get_random_df(500)
+    spread = RollSpread()
+    for i in range(0, len(df), chunksize):
+        spread.update(df["close"].to_numpy()[i : i + chunksize])
+    expected = calculate_spread(df.copy())["spread"].iloc[0]
+    assert np.isclose(spread.value, expected)
+    assert spread.n == len(df) - 2
+
+
+def test_rechunk():
+    df = get_random_df(23)
+    chunks = list(rechunk([df.iloc[:3], df.iloc[3:4], df.iloc[4:]], 5))
+    assert [len(c) for c in chunks] == [5, 5, 5, 5, 3]
+    assert_frame_equal(pd.concat(chunks), df)
+    chunks = list(rechunk([df.iloc[:20], df.iloc[20:]], 5))
+    assert [len(c) for c in chunks] == [5, 5, 5, 5, 3]
+    assert all(np.shares_memory(c["close"].to_numpy(), df["close"].to_numpy()) for c in chunks[:4])
+
+
+def test_stream_unsorted_across_chunks():
+    df = get_random_df(20)
+    chunks = [df.iloc[10:], df.iloc[:10]]
+    spread = stream_spread(chunks)
+    with pytest.raises(BacktesterException, match="sorted in increasing order across chunks"):
+        list(process_chunks(chunks, spread))
+    assert len(list(process_chunks(chunks, spread, "off"))) == 2
+
+
+def test_stream_ts_matches_load_ts():
+    engine = Engine()
+    df = pd.read_csv(VALID_DATASET_PATH, index_col="datetime", parse_dates=True)
+    engine.load_ts("TEST", df)
+    streamed = pd.concat(stream_ts(VALID_DATASET_PATH, chunksize=9))
+    assert_frame_equal(streamed, engine.market_data["TEST"])
+    assert np.isclose(stream_spread(read_chunks(VALID_DATASET_PATH, 9)), streamed["spread"].iloc[0])
+
+
+def test_stream_ts_reads_once(monkeypatch):
+    reads = []
+
+    def counted(*args, **kwargs):
+        reads.append(args)
+        return read_chunks(*args, **kwargs)
+
+    monkeypatch.setattr("tiny_backtester.streaming.read_chunks", counted)
+    streamed = pd.concat(stream_ts(VALID_DATASET_PATH, chunksize=9))
+    assert len(reads) == 1
+    spread = stream_spread(read_chunks(VALID_DATASET_PATH, 9))
+    assert_frame_equal(streamed, pd.concat(stream_ts(VALID_DATASET_PATH, 9, spread)))
+
+
+def test_run_stream_matches_run():
+    engine = Engine()
+    engine.load_ts("TEST", pd.read_csv(VALID_DATASET_PATH, index_col="datetime", parse_dates=True))
+    expected = engine.run(RollingStrategy())
+    for window in (7, 50, 1000):
+        actual = Engine().run_stream(
+            RollingStrategy(), {"TEST": stream_ts(VALID_DATASET_PATH, chunksize=9)}, window
+        )
+        assert_frame_equal(expected["orders"], actual["orders"])
+        assert_frame_equal(expected["positions"]["TEST"], actual["positions"]["TEST"])
+        assert_frame_equal(expected["equity"], actual["equity"])
+
+
+def test_run_stream_n_epochs():
+    streams = {"TEST": stream_ts(VALID_DATASET_PATH, chunksize=9)}
+    results = Engine().run_stream(RollingStrategy(), streams, window=10, n_epochs=25)
+    assert len(results["orders"]) == 25
+    assert len(results["equity"]) == 25
+
+
+def test_run_stream_requires_lookback():
+    strat = RollingStrategy()
+    strat.lookback = None
+    with pytest.raises(BacktesterException, match="strategy must declare a lookback"):
+        Engine().run_stream(strat, {"TEST": stream_ts(VALID_DATASET_PATH)})
@@ -0,0 +1,105 @@
+import numpy as np
+import pandas as pd
+import pytest
+from tests.test_utils import get_random_df, get_test_signal_strategy
+from tiny_backtester.engine import Engine
+from tiny_backtester.strategy import SignalStrategy, Strategy
+from tiny_backtester.sweep import SharedMarketData, attach, parameter_grid, summarise, sweep
+from tiny_backtester.utils.backtester_exception import BacktesterException
+from tiny_backtester.utils.backtester_types import MarketData
+
+
+class MovingAverageSignal(SignalStrategy):
+    tickers = {"TEST"}
+
+    def __init__(self, fast: int, slow: int):
+        super().__init__()
+        self.fast = fast
+        self.slow = slow
+
+    def precalc(self, data: MarketData):
+        df = data["TEST"]
+        df["fast"] = df["close"].rolling(self.fast).mean()
+        df["slow"] = df["close"].rolling(self.slow).mean()
+
+    def signals(self, data):
+        diff = data["TEST"].columns["fast"] - data["TEST"].columns["slow"]
+        return {"TEST": np.sign(np.nan_to_num(diff)).astype(np.int64)}
+
+
+def get_engine() -> Engine:
+    engine = Engine()
+    engine.load_ts("TEST", get_random_df(300))
+    return engine
+
+
+def test_parameter_grid():
+    assert parameter_grid({"a": [1, 2], "b": [3]}) == [{"a": 1, "b": 3}, {"a": 2, "b": 3}]
+
+
+def test_shared_market_data_round_trip():
+    engine = get_engine()
+    with SharedMarketData(engine.market_data) as shared:
+        shm, market_data = attach(shared.manifest)
+        pd.testing.assert_frame_equal(
+            market_data["TEST"], engine.market_data["TEST"], check_freq=False
+        )
+        with pytest.raises(ValueError):
+            market_data["TEST"]["close"].to_numpy()[0] = 1.0
+        del market_data
+        shm.close()
+
+
+def test_shared_market_data_non_numeric():
+    df = get_random_df(10).assign(label="x")
+    with pytest.raises(BacktesterException, match="column label of TEST can't be shared"):
+        SharedMarketData({"TEST": df})
+
+
+def test_sweep_matches_sequential_runs():
+    engine = get_engine()
+    grid = {"fast": [5, 10], "slow": [20, 40]}
+    expected = sorted(sweep(engine, MovingAverageSignal, grid, processes=0), key=lambda r: r["run"])
+    actual = sorted(sweep(engine, MovingAverageSignal, grid, processes=2), key=lambda r: r["run"])
+    assert expected == actual
+    assert [(r["fast"], r["slow"]) for r in actual] == [(5, 20), (5, 40), (10, 20), (10, 40)]
+    assert len({r["funds"] for r in actual}) > 1
+    # precalc columns stay private to each run
+    assert "fast" not in engine.market_data["TEST"]
+
+
+def test_sweep_event_loop_matches_signals():
+    engine = get_engine()
+    grid = {"fast": [5], "slow": [20]}
+    (expected,) = sweep(engine, MovingAverageSignal, grid, processes=0, signals=True)
+    (actual,) = sweep(engine, MovingAverageSignal, grid, processes=0)
+    assert expected == actual
+
+
+def test_summary_marks_equity_at_last_bar():
+    engine = get_engine()
+    strat = get_test_signal_strategy({"TEST": np.array([1] + [0] * 299)}, 1e4)
+    results = engine.run(strat)
+    summary = summarise(results, strat)
+    last_bar = engine.market_data["TEST"].iloc[-1]
+    assert summary["equity"] == results["equity"]["equity"].iloc[-1]
+    assert summary["unrealised_pnl"] == engine.execution.price("sell", last_bar)
+    assert summary["unrealised_pnl"] != results["positions"]["TEST"]["unrealised_pnl"].iloc[-1]
+
+
+def test_strategy_state_isolated():
+    class TestStrategy(Strategy):
+        tickers = {"TEST"}
+
+        def precalc(self, data: MarketData):
+            pass
+
+        def run(self, data):
+            return None
+
+    a, b = TestStrategy(), TestStrategy()
+    a.portfolio["TEST"] += 1
+    a.funds -= 1
+    assert b.portfolio["TEST"] == 0
+    assert b.funds == 10000
+    assert Strategy.portfolio["TEST"] == 0
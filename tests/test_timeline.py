@@ -0,0 +1,80 @@
+import numpy as np
+import pandas as pd
+from pandas.testing import assert_frame_equal
+from tests.test_utils import get_random_df
+from tiny_backtester.engine import Engine
+from tiny_backtester.strategy import Strategy
+from tiny_backtester.timeline import build_timeline
+from tiny_backtester.utils.backtester_types import MarketData, Order
+
+
+class RecordingStrategy(Strategy):
+    columnar = True
+
+    def __init__(self, tickers: set[str]):
+        super().__init__()
+        self.tickers = tickers
+        self.seen: list[tuple[pd.Timestamp, list[str], dict[str, float]]] = []
+
+    def precalc(self, data: MarketData):
+        pass
+
+    def run(self, data):
+        self.seen.append(
+            (data.time, list(data.updated), {t: data[t].latest("close") for t in data})
+        )
+        return [Order(t, "buy", 1) for t in data.updated]
+
+
+def get_misaligned_engine() -> Engine:
+    engine = Engine()
+    a = get_random_df(10, seed=0)
+    b = get_random_df(6, seed=1)
+    b.index = pd.date_range("1/1/2000 03:00", periods=6, freq="2h", name="datetime")
+    engine.load_ts("A", a)
+    engine.load_ts("B", b)
+    return engine
+
+
+def test_build_timeline():
+    timeline = build_timeline([np.array([1, 3, 5]), np.array([2, 3, 8]), np.array([], dtype=int)])
+    np.testing.assert_array_equal(timeline.times, [1, 2, 3, 5, 8])
+    np.testing.assert_array_equal(timeline.starts, [0, 1, 2, 4, 5, 6])
+    np.testing.assert_array_equal(timeline.codes, [0, 1, 0, 1, 0, 1])
+    np.testing.assert_array_equal(timeline.positions, [0, 0, 1, 1, 2, 2])
+
+
+def test_run_events_misaligned():
+    engine = get_misaligned_engine()
+    strat = RecordingStrategy({"A", "B"})
+    results = engine.run_events(strat)
+    a, b = engine.market_data["A"], engine.market_data["B"]
+    union = a.index.union(b.index)
+    assert [time for time, _, _ in strat.seen] == list(union)
+    for time, updated, closes in strat.seen:
+        assert set(updated) == {t for t, df in (("A", a), ("B", b)) if time in df.index}
+        for t, df in (("A", a), ("B", b)):
+            known = df[df.index <= time]
+            assert closes.get(t) == (known["close"].iloc[-1] if len(known) else None)
+    # orders are only placed for updated tickers, so every bar is bought exactly once
+    assert len(results["orders"]) == len(a) + len(b)
+
+
+def test_run_events_aligned_matches_run():
+    class BuySell(Strategy):
+        tickers = {"A", "B"}
+
+        def precalc(self, data: MarketData):
+            pass
+
+        def run(self, data):
+            side = "buy" if len(data["A"]) % 3 else "sell"
+            return [Order("A", side, 2), Order("B", "buy", 1)]
+
+    engine = Engine()
+    engine.load_ts("A", get_random_df(30, seed=0))
+    engine.load_ts("B", get_random_df(30, seed=1))
+    expected, actual = engine.run(BuySell()), engine.run_events(BuySell())
+    assert_frame_equal(expected["orders"], actual["orders"])
+    for t in ("A", "B"):
+        assert_frame_equal(expected["positions"][t], actual["positions"][t])
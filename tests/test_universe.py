@@ -0,0 +1,129 @@
+import numpy as np
+import pandas as pd
+import pytest
+from pandas.testing import assert_frame_equal
+from tests.test_utils import get_random_df
+from tiny_backtester.engine import Engine
+from tiny_backtester.universe import Universe, find_files, load_universe
+from tiny_backtester.utils.backtester_exception import BacktesterException
+from tiny_backtester.utils.validation import is_trusted
+
+TICKERS = ["AAA", "BBB", "CCC"]
+
+
+def get_frames() -> dict[str, pd.DataFrame]:
+    return {t: get_random_df(50 + 10 * i, seed=i) for i, t in enumerate(TICKERS)}
+
+
+def write_files(tmp_path, frames: dict[str, pd.DataFrame]):
+    for t, df in frames.items():
+        df.to_csv(tmp_path / f"{t}.csv")
+    (tmp_path / "notes.txt").write_text("not bars")
+
+
+def expected_frames(frames: dict[str, pd.DataFrame]) -> dict[str, pd.DataFrame]:
+    engine = Engine()
+    for t, df in frames.items():
+        engine.load_ts(t, df)
+    return engine.market_data
+
+
+@pytest.mark.parametrize("processes", [0, 2])
+def test_load_directory(tmp_path, processes):
+    frames = get_frames()
+    write_files(tmp_path, frames)
+    universe, failures = load_universe(tmp_path, processes=processes)
+    assert failures == {} and list(universe) == TICKERS
+    expected = expected_frames(frames)
+    for t in TICKERS:
+        assert_frame_equal(universe.frame(t), expected[t], check_freq=False)
+    np.testing.assert_array_equal(universe.offsets, [0, 50, 110, 180])
+
+
+def test_load_glob_and_long_format(tmp_path):
+    frames = get_frames()
+    write_files(tmp_path, frames)
+    from_glob, _ = load_universe(tmp_path / "[AB]*.csv", processes=0)
+    assert list(from_glob) == ["AAA", "BBB"]
+    expected = expected_frames(frames)
+    long = pd.concat([df.assign(symbol=t) for t, df in frames.items()]).sort_index()
+    long.to_csv(tmp_path / "long.csv")
+    for source in (long, tmp_path / "long.csv"):
+        universe, failures = load_universe(source, ticker_column="symbol", processes=0)
+        assert failures == {} and list(universe) == TICKERS
+        for t in TICKERS:
+            assert_frame_equal(universe.frame(t), expected[t], check_freq=False)
+
+
+def test_failures_are_reported(tmp_path):
+    frames = get_frames()
+    frames["BBB"].loc[frames["BBB"].index[3], "close"] = np.nan
+    frames["DDD"] = get_random_df(20).assign(vwap=100.0)  # valid, but unlike the others
+    write_files(tmp_path, frames)
+    (tmp_path / "EEE.csv").write_text("datetime,close\nnot a date,x\n")
+    universe, failures = load_universe(tmp_path, processes=2)
+    assert list(universe) == ["AAA", "CCC"]
+    assert set(failures) == {"BBB", "DDD", "EEE"}
+    assert "differ from the universe" in failures["DDD"]
+    assert all(isinstance(reason, str) and reason for reason in failures.values())
+
+
+def test_schema_is_the_most_common(tmp_path):
+    frames = get_frames()
+    frames["AAA"] = frames["AAA"].assign(vwap=100.0)  # the odd one out sorts first
+    write_files(tmp_path, frames)
+    universe, failures = load_universe(tmp_path, processes=0)
+    assert list(universe) == ["BBB", "CCC"] and list(failures) == ["AAA"]
+    assert "differ from the universe" in failures["AAA"]
+    columns = list(universe.columns) + ["vwap"]
+    universe, failures = load_universe(tmp_path, processes=0, columns=columns)
+    assert list(universe) == ["AAA"] and list(failures) == ["BBB", "CCC"]
+
+
+def test_universe_shares_columns(tmp_path):
+    frames = get_frames()
+    write_files(tmp_path, frames)
+    universe, _ = load_universe(tmp_path, processes=0)
+    data = universe["BBB"]
+    assert np.shares_memory(data.columns["close"], universe.columns["close"])
+    assert not data.columns["close"].flags.writeable
+    store = universe.to_store()
+    assert list(store) == TICKERS and len(store["CCC"]) == 70
+    assert universe.codes == {"AAA": 0, "BBB": 1, "CCC": 2}
+    assert len(Universe.from_ticker_data({})) == 0
+
+
+def test_engine_load_universe(tmp_path):
+    frames = get_frames()
+    write_files(tmp_path, frames)
+    universe, _ = load_universe(tmp_path, processes=0)
+    engine = Engine({"validation": "once"})
+    engine.load_universe(universe)
+    expected = expected_frames(frames)
+    for t in TICKERS:
+        assert_frame_equal(engine.market_data[t], expected[t], check_freq=False)
+        assert is_trusted(engine.market_data[t])
+
+
+def test_engine_validates_unvalidated_universe(tmp_path):
+    frames = get_frames()
+    frames["BBB"].loc[frames["BBB"].index[3], "close"] = np.nan
+    write_files(tmp_path, frames)
+    universe, failures = load_universe(tmp_path, processes=0, validation="off")
+    assert failures == {} and universe.validation == "off"
+    Engine({"validation": "off"}).load_universe(universe)
+    with pytest.raises(BacktesterException):
+        Engine({"validation": "once"}).load_universe(universe)
+    assert load_universe(tmp_path, processes=0, validation="full").universe.validation == "full"
+
+
+def test_invalid_sources(tmp_path):
+    with pytest.raises(BacktesterException, match="ticker_column"):
+        load_universe(get_random_df(10), processes=0)
+    with pytest.raises(BacktesterException, match="no symbol column"):
+        load_universe(get_random_df(10), ticker_column="symbol", processes=0)
+    (tmp_path / "a").mkdir()
+    get_random_df(10).to_csv(tmp_path / "AAA.csv")
+    get_random_df(10).to_csv(tmp_path / "a" / "AAA.csv")
+    with pytest.raises(BacktesterException, match="ticker AAA found in"):
+        find_files(tmp_path / "**" / "*.csv")
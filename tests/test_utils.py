@@ -1,5 +1,6 @@
-from tiny_backtester.strategy import Strategy
-from tiny_backtester.utils.backtester_types import MarketData
+from collections import defaultdict
+from tiny_backtester.strategy import SignalStrategy, Strategy
+from tiny_backtester.utils.backtester_types import MarketData, SignalType
 import numpy as np
 import pandas as pd
 
@@ -67,3 +68,39 @@ def get_df_input() -> pd.DataFrame:
         },
         index=pd.date_range("1/1/2000", periods=4, freq="h"),
     )
+
+
+def get_random_df(n: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(0, 1, n))
+    spread = np.abs(rng.normal(0, 0.5, n))
+    return pd.DataFrame(
+        data={
+            "open": close + rng.normal(0, 0.1, n),
+            "high": close + spread,
+            "low": close - spread,
+            "close": close,
+            "volume": rng.integers(100, 1000, n),
+        },
+        index=pd.date_range("1/1/2000", periods=n, freq="h", name="datetime"),
+    )
+
+
+def get_test_signal_strategy(
+    signals: dict[str, np.ndarray], funds: float, signal_type: SignalType = "order"
+) -> SignalStrategy:
+    class TestSignalStrategy(SignalStrategy):
+        def __init__(self):
+            super().__init__()
+            self.tickers = set(signals)
+            self.funds = np.float64(funds)
+            self.portfolio = defaultdict(int)
+            self.signal_type = signal_type
+
+        def precalc(self, data: MarketData):
+            pass
+
+        def signals(self, data):
+            return signals
+
+    return TestSignalStrategy()
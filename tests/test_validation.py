@@ -0,0 +1,106 @@
+import subprocess
+import sys
+import numpy as np
+import pandas as pd
+import pytest
+from pandas.testing import assert_frame_equal
+from tests.test_utils import get_df_input
+from tiny_backtester.engine import Engine
+from tiny_backtester.utils.backtester_exception import BacktesterException
+from tiny_backtester.utils.math_utils import process_df
+from tiny_backtester.utils.validation import (
+    check_types,
+    is_trusted,
+    time_series_schema,
+    validate_ts,
+)
+
+
+def test_validate_ts_valid():
+    df = get_df_input()
+    assert validate_ts(df, "once") is df
+    assert is_trusted(df)
+    assert not is_trusted(df.copy())
+
+
+@pytest.mark.parametrize(
+    "change, match, schema_rejects",
+    [
+        (lambda df: df.reset_index(drop=True), "expected a DatetimeIndex", True),
+        (lambda df: df.iloc[::-1], "index must be sorted", False),
+        (lambda df: df.drop(columns="open"), r"columns not found: \['open'\]", True),
+        (lambda df: df.rename(columns=str.upper), "columns not found", True),
+        (lambda df: df.assign(close=[1, 2, 3, 4]), "column close must be float64", True),
+        (lambda df: df.assign(low=[1.0, np.nan, 3.0, 4.0]), "column low contains NaN", True),
+        (lambda df: df.assign(spread=np.nan), "column spread contains NaN", True),
+        (lambda df: df.astype({"volume": np.int32}), "column volume must be int64", True),
+    ],
+)
+def test_validate_ts_invalid(change, match, schema_rejects):
+    df = change(get_df_input())
+    with pytest.raises(BacktesterException, match=match):
+        validate_ts(df, "once")
+    assert not is_trusted(df)
+    if schema_rejects:
+        with pytest.raises(Exception):
+            validate_ts(df, "full")
+    assert validate_ts(df, "off") is df
+
+
+def test_validate_ts_trusted_skipped():
+    df = get_df_input()
+    validate_ts(df, "once")
+    df.loc[df.index[0], "close"] = np.nan
+    validate_ts(df, "once")
+    with pytest.raises(Exception):
+        validate_ts(df, "full")
+
+
+def test_validate_ts_invalid_mode():
+    with pytest.raises(BacktesterException, match="unsupported validation mode: test"):
+        validate_ts(get_df_input(), "test")  # type: ignore[arg-type]
+
+
+@pytest.mark.parametrize("validation", ["full", "once", "off"])
+def test_process_df_modes_match(validation):
+    expected = process_df(get_df_input(), "continuous_24_7", "30min", validation="full")
+    actual = process_df(get_df_input(), "continuous_24_7", "30min", validation=validation)
+    assert_frame_equal(expected, actual)
+    assert is_trusted(actual) == (validation == "once")
+
+
+@pytest.mark.parametrize("validation", ["full", "once"])
+def test_check_types_validates_output(validation):
+    @check_types
+    def add_gap(df: pd.DataFrame, *, validation="full") -> pd.DataFrame:
+        return df.assign(close=[1.0, np.nan, 3.0, 4.0])
+
+    with pytest.raises(Exception):
+        add_gap(get_df_input(), validation=validation)
+    assert add_gap(get_df_input(), validation="off")["close"].isna().any()
+
+
+def test_load_ts_validation_option():
+    df = get_df_input().assign(spread=np.nan)
+    with pytest.raises(BacktesterException, match="column spread contains NaN"):
+        Engine({"validation": "once"}).load_ts("TEST", df)
+    with pytest.raises(Exception):
+        Engine({"validation": "full"}).load_ts("TEST", df)
+    engine = Engine({"validation": "off"})
+    engine.load_ts("TEST", df)
+    assert engine.market_data["TEST"]["spread"].isna().all()
+    engine = Engine({"validation": "once"})
+    engine.load_ts("TEST", get_df_input())
+    assert is_trusted(engine.market_data["TEST"])
+
+
+def test_time_series_schema():
+    from tiny_backtester.utils.backtester_types import TimeSeries
+
+    assert TimeSeries is time_series_schema()
+    TimeSeries.validate(get_df_input())
+
+
+def test_pandera_imported_lazily():
+    code = "import sys, tiny_backtester.engine; assert 'pandera' not in sys.modules"
+    subprocess.run([sys.executable, "-c", code], check=True, env={"PYTHONPATH": "src"})
@@ -0,0 +1,153 @@
+from multiprocessing.shared_memory import SharedMemory
+import numpy as np
+import pandas as pd
+import pytest
+from pandas.testing import assert_frame_equal
+from tests.test_utils import get_random_df
+from tiny_backtester import walk_forward as walk_forward_module
+from tiny_backtester.data_store import overlay
+from tiny_backtester.engine import Engine
+from tiny_backtester.strategy import SignalStrategy
+from tiny_backtester.sweep import SharedMarketData
+from tiny_backtester.utils.backtester_exception import BacktesterException
+from tiny_backtester.utils.backtester_types import MarketData
+from tiny_backtester.walk_forward import (
+    Fold,
+    make_folds,
+    precalc_columns,
+    walk_forward,
+    window,
+    with_columns,
+)
+
+
+class MovingAverageSignal(SignalStrategy):
+    tickers = {"TEST"}
+
+    def __init__(self, fast: int, slow: int, shared: bool = False):
+        super().__init__()
+        self.fast = fast
+        self.slow = slow
+        self.shared = shared
+
+    def precalc(self, data: MarketData):
+        df = data["TEST"]
+        df["fast"] = df["close"].rolling(self.fast).mean()
+        df["slow"] = df["close"].rolling(self.slow).mean()
+
+    def precalc_key(self):
+        return (self.fast, self.slow) if self.shared else None
+
+    def signals(self, data):
+        diff = data["TEST"].columns["fast"] - data["TEST"].columns["slow"]
+        return {"TEST": np.sign(np.nan_to_num(diff)).astype(np.int64)}
+
+
+def get_engine() -> Engine:
+    engine = Engine()
+    engine.load_ts("TEST", get_random_df(300))
+    return engine
+
+
+def test_make_folds():
+    assert make_folds(10, 4, 3) == [Fold(0, 4, 7), Fold(3, 7, 10)]
+    assert make_folds(10, 4, 2, step=3, anchored=True) == [Fold(0, 4, 6), Fold(0, 7, 9)]
+    assert make_folds(5, 5, 1) == []
+
+
+def test_window_zero_copy():
+    engine = get_engine()
+    frames = window(engine.market_data, 10, 20)
+    assert np.shares_memory(frames["TEST"]["close"].to_numpy(), engine.market_data["TEST"]["close"])
+    frames["TEST"]["new"] = 1.0
+    assert "new" not in engine.market_data["TEST"]
+
+
+def test_run_start():
+    engine = get_engine()
+    strat = MovingAverageSignal(5, 20)
+    results = engine.run(strat, n_epochs=150, start=100)
+    index = engine.market_data["TEST"].index
+    assert results["equity"].index.equals(index[100:150])
+    assert (results["orders"]["time"] >= index[100]).all()
+
+
+def test_walk_forward_matches_runs():
+    engine = get_engine()
+    folds = make_folds(300, 60, 40, step=30)
+    runs = walk_forward(engine, lambda train: MovingAverageSignal(5, 20), folds, processes=0)
+    assert len(runs.results) == len(folds) == 8
+    for fold, actual in zip(folds, runs.results):
+        expected = get_engine().run(MovingAverageSignal(5, 20), fold.test_stop, fold.test_start)
+        assert_frame_equal(actual["orders"], expected["orders"])
+        assert_frame_equal(actual["equity"], expected["equity"])
+    assert "fast" not in engine.market_data["TEST"]
+
+    equity = runs.equity
+    assert equity.index.is_unique and equity.index.is_monotonic_increasing
+    assert equity.index.equals(engine.market_data["TEST"].index[60:])
+    # each fold continues from the last equity of the one before
+    first = runs.results[1]["equity"]["equity"]
+    stitched = equity.loc[equity["fold"] == 1, "equity"]
+    last = equity.loc[equity["fold"] == 0, "equity"].iloc[-1]
+    assert np.allclose(stitched, first.iloc[: len(stitched)] * last / 10000)
+
+
+def test_walk_forward_shared_precalc_and_pool():
+    engine = get_engine()
+    folds = make_folds(300, 60, 60, anchored=True)
+    calls = []
+
+    def factory(train: MarketData) -> MovingAverageSignal:
+        calls.append(len(train["TEST"]))
+        return MovingAverageSignal(5, 20, shared=True)
+
+    shared = walk_forward(engine, factory, folds, processes=0)
+    assert calls == [60, 120, 180, 240]
+    separate = walk_forward(engine, lambda train: MovingAverageSignal(5, 20), folds, processes=0)
+    pooled = walk_forward(engine, factory, folds, processes=2)
+    for a, b, c in zip(shared.results, separate.results, pooled.results):
+        assert_frame_equal(a["orders"], b["orders"])
+        assert_frame_equal(a["orders"], c["orders"])
+        assert_frame_equal(a["equity"], c["equity"])
+    assert_frame_equal(shared.equity, pooled.equity)
+    assert list(engine.market_data["TEST"].columns) == list(get_engine().market_data["TEST"])
+    pd.testing.assert_index_equal(shared.equity.index, engine.market_data["TEST"].index[60:])
+
+
+def test_precalc_shares_only_new_columns():
+    engine = get_engine()
+    frames = overlay(engine.market_data)
+    MovingAverageSignal(5, 20).precalc(frames)
+    columns = precalc_columns(engine.market_data, frames)
+    assert list(columns["TEST"]) == ["fast", "slow"]
+    merged = with_columns(engine.market_data, columns)
+    assert_frame_equal(merged["TEST"], frames["TEST"])
+    base = engine.market_data["TEST"]["close"].to_numpy()
+    assert np.shares_memory(merged["TEST"]["close"].to_numpy(), base)
+
+
+def test_shared_blocks_released_on_failure(monkeypatch):
+    class Labelled(MovingAverageSignal):
+        def precalc(self, data: MarketData):
+            super().precalc(data)
+            if self.fast > 5:
+                data["TEST"]["label"] = "a"  # can't be shared
+
+    created = []
+
+    class Recorded(SharedMarketData):
+        def __init__(self, market_data: MarketData):
+            super().__init__(market_data)
+            created.append(self.shm.name)
+
+    monkeypatch.setattr(walk_forward_module, "SharedMarketData", Recorded)
+    engine = get_engine()
+    folds = make_folds(300, 60, 60)
+    strats = iter([Labelled(5, 20, True), Labelled(10, 20, True), Labelled(5, 20, True)])
+    with pytest.raises(BacktesterException, match="column label of TEST can't be shared"):
+        walk_forward(engine, lambda train: next(strats), folds[:3], processes=2)
+    assert len(created) == 2
+    for name in created:
+        with pytest.raises(FileNotFoundError):
+            SharedMemory(name=name)